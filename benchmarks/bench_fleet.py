@@ -0,0 +1,230 @@
+"""Fleet-scale benchmark for ChargeAmpsApi and the data update coordinator.
+
+Runs refresh cycles against the local mock eAPI for several fleet sizes:
+
+    python -m benchmarks.bench_fleet --sizes 1 10 100 1000 --cycles 10
+
+For every size it reports requests per cycle, cycle latency, entity
+updates per cycle and how long the event loop was blocked per cycle.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.chargeamps.api import ChargeAmpsApi
+from custom_components.chargeamps.const import CONF_MAX_CONCURRENT_REQUESTS
+from custom_components.chargeamps.coordinator import ChargeAmpsDataUpdateCoordinator
+from custom_components.chargeamps.transport import create_session
+
+from .mock_eapi import MockConfig, MockEApi
+
+DEFAULT_SIZES = (1, 10, 100, 1000)
+
+
+@dataclass(slots=True)
+class BenchEntry:
+    """Just enough of a ConfigEntry for the coordinator."""
+
+    entry_id: str = "benchmark"
+    options: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class BenchResult:
+    chargepoints: int
+    cycles: int
+    requests_per_cycle: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    entity_updates_per_cycle: float
+    entities: int
+    loop_blocked_ms_per_cycle: float
+    loop_max_lag_ms: float
+
+
+class LoopMonitor:
+    """Measure event-loop blocking as the overshoot of short sleeps."""
+
+    def __init__(self, interval: float = 0.005, threshold: float = 0.002) -> None:
+        self._interval = interval
+        self._threshold = threshold
+        self._task: asyncio.Task[None] | None = None
+        self.blocked = 0.0
+        self.max_lag = 0.0
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self._interval)
+            lag = loop.time() - start - self._interval
+            if lag > self._threshold:
+                self.blocked += lag
+                self.max_lag = max(self.max_lag, lag)
+
+    def reset(self) -> None:
+        self.blocked = 0.0
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))
+    return ordered[index]
+
+
+async def run_size(
+    size: int, cycles: int, mock_config: MockConfig, options: dict[str, Any]
+) -> BenchResult:
+    """Benchmark refresh cycles for one fleet size."""
+    mock = MockEApi(MockConfig(**{**asdict(mock_config), "chargepoints": size}))
+    url = await mock.start()
+    monitor = LoopMonitor()
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = HomeAssistant(config_dir)
+        try:
+            async with create_session() as session:
+                api = ChargeAmpsApi(
+                    session,
+                    "bench@example.com",
+                    "secret",
+                    base_url=url,
+                    # Measure the integration, not the client-side quota
+                    request_rate=1_000_000.0,
+                    request_burst=1_000_000,
+                    # Back-to-back cycles would otherwise be served from the cache
+                    read_cache_ttl=0,
+                )
+                coordinator = ChargeAmpsDataUpdateCoordinator(
+                    hass, api, BenchEntry(options=options)
+                )
+                await coordinator.async_refresh()
+
+                # One listener per entity-visible value, like the real platforms
+                updates = 0
+
+                def _on_update() -> None:
+                    nonlocal updates
+                    updates += 1
+
+                entity_keys = list(coordinator._values)  # noqa: SLF001
+                unsubscribers = [
+                    coordinator.async_add_listener(_on_update, key) for key in entity_keys
+                ]
+
+                latencies: list[float] = []
+                requests: list[int] = []
+                update_counts: list[int] = []
+                blocked: list[float] = []
+                max_lag = 0.0
+                monitor.start()
+                for _ in range(cycles):
+                    mock.tick()
+                    updates = 0
+                    monitor.reset()
+                    before = sum(mock.requests.values())
+                    start = time.perf_counter()
+                    await coordinator.async_refresh()
+                    latencies.append(time.perf_counter() - start)
+                    requests.append(sum(mock.requests.values()) - before)
+                    update_counts.append(updates)
+                    blocked.append(monitor.blocked)
+                    max_lag = max(max_lag, monitor.max_lag)
+                await monitor.stop()
+
+                for unsubscribe in unsubscribers:
+                    unsubscribe()
+                api.cancel_renewal()
+        finally:
+            await mock.stop()
+            await hass.async_stop(force=True)
+
+    return BenchResult(
+        chargepoints=size,
+        cycles=cycles,
+        requests_per_cycle=statistics.fmean(requests),
+        latency_p50_ms=_percentile(latencies, 50) * 1000,
+        latency_p95_ms=_percentile(latencies, 95) * 1000,
+        entity_updates_per_cycle=statistics.fmean(update_counts),
+        entities=len(entity_keys),
+        loop_blocked_ms_per_cycle=statistics.fmean(blocked) * 1000,
+        loop_max_lag_ms=max_lag * 1000,
+    )
+
+
+def _print_table(results: list[BenchResult]) -> None:
+    header = (
+        f"{'cps':>6} {'req/cycle':>10} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'updates':>9} {'entities':>9} {'blocked ms':>11} {'max lag ms':>11}"
+    )
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        print(
+            f"{r.chargepoints:>6} {r.requests_per_cycle:>10.1f} "
+            f"{r.latency_p50_ms:>9.1f} {r.latency_p95_ms:>9.1f} "
+            f"{r.entity_updates_per_cycle:>9.1f} {r.entities:>9} "
+            f"{r.loop_blocked_ms_per_cycle:>11.2f} {r.loop_max_lag_ms:>11.2f}"
+        )
+
+
+async def _main(args: argparse.Namespace) -> list[BenchResult]:
+    mock_config = MockConfig(
+        connectors_per_chargepoint=args.connectors,
+        charging_ratio=args.charging_ratio,
+        latency=args.latency,
+        token_ttl=args.token_ttl,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        etags=not args.no_etags,
+    )
+    options = {CONF_MAX_CONCURRENT_REQUESTS: args.concurrency}
+    return [
+        await run_size(size, args.cycles, mock_config, options) for size in args.sizes
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--cycles", type=int, default=10)
+    parser.add_argument("--connectors", type=int, default=2)
+    parser.add_argument("--charging-ratio", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--token-ttl", type=float, default=3600.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--no-etags", action="store_true", help="mock answers every GET in full"
+    )
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(_main(args))
+    if args.json:
+        print(json.dumps([asdict(r) for r in results], indent=2))
+    else:
+        _print_table(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""Local stand-in for the Charge Amps eAPI.
+
+Serves the subset of /api/v5 the integration uses, for a synthetic fleet:
+
+    python -m benchmarks.mock_eapi --chargepoints 100 --port 8080
+
+Point ChargeAmpsApi at it with base_url="http://127.0.0.1:8080/api/v5".
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass
+
+from aiohttp import web
+
+API_PREFIX = "/api/v5"
+
+
+@dataclass(slots=True)
+class MockConfig:
+    """Knobs for the simulated account and server behaviour."""
+
+    chargepoints: int = 10
+    connectors_per_chargepoint: int = 2
+    # Share of connectors that are charging at any time
+    charging_ratio: float = 0.2
+    latency: float = 0.0  # seconds added to every response
+    token_ttl: float = 3600.0  # seconds until an access token expires
+    error_rate: float = 0.0  # share of requests answered with 500
+    throttle_rate: float = 0.0  # share of requests answered with 429
+    retry_after: int = 1  # seconds, sent with 429
+    etags: bool = True  # answer conditional GETs with ETag/304
+    seed: int = 0
+
+
+def _b64(data: dict) -> str:
+    raw = json.dumps(data, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+class MockEApi:
+    """Synthetic fleet plus the aiohttp application that serves it."""
+
+    def __init__(self, config: MockConfig | None = None) -> None:
+        self.config = config or MockConfig()
+        self.requests: Counter[str] = Counter()
+        self._random = random.Random(self.config.seed)
+        self._tokens: dict[str, float] = {}
+        self._refresh_tokens: set[str] = set()
+        self._chargepoints: dict[str, dict] = {}
+        self._statuses: dict[str, dict] = {}
+        self._cp_settings: dict[str, dict] = {}
+        self._build_fleet()
+        self.app = self._build_app()
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    # ------------------------------------------------------------------
+    # Fleet
+    # ------------------------------------------------------------------
+
+    def _build_fleet(self) -> None:
+        cfg = self.config
+        for index in range(cfg.chargepoints):
+            cp_id = f"CP{index:05d}"
+            connectors = []
+            connector_statuses = []
+            for connector_id in range(1, cfg.connectors_per_chargepoint + 1):
+                charging = self._random.random() < cfg.charging_ratio
+                connectors.append(
+                    {
+                        "chargePointId": cp_id,
+                        "connectorId": connector_id,
+                        "type": "Type2",
+                        "connectorUserId": None,
+                        "settings": {
+                            "chargePointId": cp_id,
+                            "connectorId": connector_id,
+                            "mode": "On",
+                            "rfidLock": False,
+                            "cableLock": False,
+                            "maxCurrent": 16,
+                        },
+                    }
+                )
+                connector_statuses.append(
+                    {
+                        "chargePointId": cp_id,
+                        "connectorId": connector_id,
+                        "totalConsumptionKwh": round(self._random.uniform(0, 5000), 3),
+                        "status": "Charging" if charging else "Available",
+                        "measurements": [
+                            {
+                                "phase": phase,
+                                "current": 16.0 if charging else 0.0,
+                                "voltage": 230.0,
+                            }
+                            for phase in ("L1", "L2", "L3")
+                        ],
+                        "startTime": None,
+                        "endTime": None,
+                        "sessionId": index * 100 + connector_id if charging else None,
+                    }
+                )
+            self._chargepoints[cp_id] = {
+                "id": cp_id,
+                "name": f"Charger {index}",
+                "type": "Luna",
+                "firmwareVersion": "1.0.0",
+                "hardwareVersion": "1",
+                "isLoadbalanced": False,
+                "ownerReadOnly": False,
+                "ocppVersion": "1.6",
+                "settings": {},
+                "connectors": connectors,
+            }
+            self._statuses[cp_id] = {
+                "id": cp_id,
+                "status": "Online",
+                "connectorStatuses": connector_statuses,
+            }
+            self._cp_settings[cp_id] = {"id": cp_id, "dimmer": "Low", "downLight": False}
+
+    def tick(self, seconds: float = 30.0) -> None:
+        """Advance energy meters of charging connectors."""
+        for status in self._statuses.values():
+            for connector in status["connectorStatuses"]:
+                if connector["status"] != "Charging":
+                    continue
+                power = sum(m["current"] * m["voltage"] for m in connector["measurements"])
+                connector["totalConsumptionKwh"] = round(
+                    connector["totalConsumptionKwh"] + power * seconds / 3_600_000, 3
+                )
+
+    # ------------------------------------------------------------------
+    # HTTP plumbing
+    # ------------------------------------------------------------------
+
+    def _build_app(self) -> web.Application:
+        app = web.Application(middlewares=[self._middleware])
+        app.router.add_post(f"{API_PREFIX}/auth/login", self._login)
+        app.router.add_post(f"{API_PREFIX}/auth/refreshtoken", self._refresh)
+        app.router.add_get(f"{API_PREFIX}/chargepoints/owned", self._owned)
+        app.router.add_get(f"{API_PREFIX}/chargepoints/{{cp_id}}", self._chargepoint)
+        app.router.add_get(f"{API_PREFIX}/chargepoints/{{cp_id}}/status", self._status)
+        app.router.add_get(
+            f"{API_PREFIX}/chargepoints/{{cp_id}}/settings", self._get_cp_settings
+        )
+        app.router.add_put(
+            f"{API_PREFIX}/chargepoints/{{cp_id}}/settings", self._put_cp_settings
+        )
+        app.router.add_put(
+            f"{API_PREFIX}/chargepoints/{{cp_id}}/connectors/{{connector_id}}/settings",
+            self._put_connector_settings,
+        )
+        return app
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        route = request.match_info.route.resource
+        self.requests[f"{request.method} {route.canonical if route else request.path}"] += 1
+        if self.config.latency:
+            await asyncio.sleep(self.config.latency)
+        roll = self._random.random()
+        if roll < self.config.throttle_rate:
+            return web.json_response(
+                {"message": "Too many requests"},
+                status=429,
+                headers={"Retry-After": str(self.config.retry_after)},
+            )
+        if roll < self.config.throttle_rate + self.config.error_rate:
+            return web.json_response({"message": "Injected failure"}, status=500)
+        if not request.path.startswith(f"{API_PREFIX}/auth/"):
+            auth = request.headers.get("Authorization", "")
+            expires = self._tokens.get(auth.removeprefix("Bearer "))
+            if expires is None or expires < time.time():
+                return web.json_response({"message": "Unauthorized"}, status=401)
+        return await handler(request)
+
+    def _issue_tokens(self) -> dict[str, str]:
+        expires = time.time() + self.config.token_ttl
+        header = _b64({"alg": "none", "typ": "JWT"})
+        payload = _b64({"exp": int(expires), "jti": self._random.getrandbits(64)})
+        token = f"{header}.{payload}.sig"
+        refresh = f"refresh-{self._random.getrandbits(64):x}"
+        self._tokens[token] = expires
+        self._refresh_tokens.add(refresh)
+        return {"token": token, "refreshToken": refresh}
+
+    def _conditional(self, request: web.Request, body: object) -> web.Response:
+        raw = json.dumps(body, separators=(",", ":")).encode()
+        if not self.config.etags:
+            return web.Response(body=raw, content_type="application/json")
+        etag = f'"{hashlib.sha1(raw).hexdigest()}"'
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=raw, content_type="application/json", headers={"ETag": etag}
+        )
+
+    # ------------------------------------------------------------------
+    # Handlers
+    # ------------------------------------------------------------------
+
+    async def _login(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        if not body.get("email") or not body.get("password"):
+            return web.json_response({"message": "Invalid credentials"}, status=401)
+        return web.json_response(self._issue_tokens())
+
+    async def _refresh(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        refresh = body.get("refreshToken")
+        if refresh not in self._refresh_tokens:
+            return web.json_response({"message": "Invalid refresh token"}, status=401)
+        self._refresh_tokens.discard(refresh)
+        return web.json_response(self._issue_tokens())
+
+    async def _owned(self, request: web.Request) -> web.Response:
+        return self._conditional(request, list(self._chargepoints.values()))
+
+    def _lookup(self, table: dict[str, dict], request: web.Request) -> dict:
+        try:
+            return table[request.match_info["cp_id"]]
+        except KeyError:
+            raise web.HTTPNotFound() from None
+
+    async def _chargepoint(self, request: web.Request) -> web.Response:
+        return self._conditional(request, self._lookup(self._chargepoints, request))
+
+    async def _status(self, request: web.Request) -> web.Response:
+        return web.json_response(self._lookup(self._statuses, request))
+
+    async def _get_cp_settings(self, request: web.Request) -> web.Response:
+        return web.json_response(self._lookup(self._cp_settings, request))
+
+    async def _put_cp_settings(self, request: web.Request) -> web.Response:
+        settings = self._lookup(self._cp_settings, request)
+        settings.update(await request.json())
+        return web.json_response(settings)
+
+    async def _put_connector_settings(self, request: web.Request) -> web.Response:
+        chargepoint = self._lookup(self._chargepoints, request)
+        connector_id = int(request.match_info["connector_id"])
+        for connector in chargepoint["connectors"]:
+            if connector["connectorId"] == connector_id:
+                connector["settings"].update(await request.json())
+                return web.json_response(connector["settings"])
+        raise web.HTTPNotFound()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the API base URL."""
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = site._server.sockets[0].getsockname()[1]  # noqa: SLF001
+        self.url = f"http://{host}:{bound_port}{API_PREFIX}"
+        return self.url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--chargepoints", type=int, default=10)
+    parser.add_argument("--connectors", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=float, default=3600.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--no-etags", action="store_true", help="never answer 304")
+    parser.add_argument("--port", type=int, default=8080)
+    args = parser.parse_args()
+
+    mock = MockEApi(
+        MockConfig(
+            chargepoints=args.chargepoints,
+            connectors_per_chargepoint=args.connectors,
+            latency=args.latency,
+            token_ttl=args.token_ttl,
+            error_rate=args.error_rate,
+            throttle_rate=args.throttle_rate,
+            etags=not args.no_etags,
+        )
+    )
+
+    async def serve() -> None:
+        url = await mock.start(port=args.port)
+        print(f"Mock eAPI listening on {url}")
+        try:
+            while True:
+                await asyncio.sleep(30)
+                mock.tick()
+        finally:
+            await mock.stop()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
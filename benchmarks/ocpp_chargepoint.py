@@ -0,0 +1,210 @@
+"""Simulated OCPP 1.6J charge point for the local central system.
+
+Connects one or more chargers to the integration's OCPP port, boots them,
+reports connector status and, while charging, meter values. Remote start,
+remote stop and charging profiles sent by Home Assistant are obeyed and
+their round-trip to the resulting StatusNotification is printed:
+
+    python -m benchmarks.ocpp_chargepoint --url ws://127.0.0.1:9000 --ids 2001234567
+
+The ids must be chargepoints known to a loaded entry (e.g. from the mock
+eAPI), or the central system rejects the connection.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+
+from aiohttp import ClientSession, WSMsgType
+
+CALL, CALLRESULT, CALLERROR = 2, 3, 4
+
+VOLTAGE = 230.0
+PHASES = 3
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass(slots=True)
+class SimConnector:
+    connector_id: int
+    limit: float = 32.0
+    transaction_id: int | None = None
+    meter_wh: float = 0.0
+    # Monotonic time the last remote command arrived, for round-trip timing
+    commanded_at: float | None = None
+
+
+@dataclass(slots=True)
+class SimChargePoint:
+    """One simulated charger and its websocket."""
+
+    chargepoint_id: str
+    connectors: dict[int, SimConnector]
+    meter_interval: float
+    ws: object = None
+    _pending: dict[str, asyncio.Future] = field(default_factory=dict)
+
+    async def call(self, action: str, payload: dict) -> dict:
+        unique_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self._pending[unique_id] = future
+        await self.ws.send_str(json.dumps([CALL, unique_id, action, payload]))
+        try:
+            return await asyncio.wait_for(future, 30)
+        finally:
+            self._pending.pop(unique_id, None)
+
+    async def status(self, connector: SimConnector, status: str) -> None:
+        await self.call(
+            "StatusNotification",
+            {"connectorId": connector.connector_id, "errorCode": "NoError", "status": status},
+        )
+        if connector.commanded_at is not None:
+            elapsed = (time.monotonic() - connector.commanded_at) * 1000
+            print(f"{self.chargepoint_id}/{connector.connector_id} {status} after {elapsed:.1f} ms")
+            connector.commanded_at = None
+
+    async def start(self, connector: SimConnector) -> None:
+        result = await self.call(
+            "StartTransaction",
+            {
+                "connectorId": connector.connector_id,
+                "idTag": "HomeAssistant",
+                "meterStart": int(connector.meter_wh),
+                "timestamp": _now(),
+            },
+        )
+        connector.transaction_id = result["transactionId"]
+        await self.status(connector, "Charging")
+
+    async def stop(self, connector: SimConnector) -> None:
+        transaction_id, connector.transaction_id = connector.transaction_id, None
+        await self.call(
+            "StopTransaction",
+            {
+                "transactionId": transaction_id,
+                "meterStop": int(connector.meter_wh),
+                "timestamp": _now(),
+                "reason": "Remote",
+            },
+        )
+        await self.status(connector, "Available")
+
+    def _handle_call(self, action: str, payload: dict) -> tuple[dict, asyncio.Future | None]:
+        """Answer a CALL from the central system; return any follow-up work."""
+        connector = self.connectors.get(payload.get("connectorId", 1))
+        if action == "RemoteStartTransaction" and connector is not None:
+            connector.commanded_at = time.monotonic()
+            return {"status": "Accepted"}, self.start(connector)
+        if action == "RemoteStopTransaction":
+            for connector in self.connectors.values():
+                if connector.transaction_id == payload.get("transactionId"):
+                    connector.commanded_at = time.monotonic()
+                    return {"status": "Accepted"}, self.stop(connector)
+            return {"status": "Rejected"}, None
+        if action == "SetChargingProfile" and connector is not None:
+            periods = payload["csChargingProfiles"]["chargingSchedule"]["chargingSchedulePeriod"]
+            connector.limit = periods[0]["limit"]
+            print(f"{self.chargepoint_id}/{connector.connector_id} limit {connector.limit} A")
+            return {"status": "Accepted"}, None
+        return {"status": "Rejected"}, None
+
+    async def _receive(self) -> None:
+        async for msg in self.ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            message = json.loads(msg.data)
+            if message[0] == CALL:
+                result, follow_up = self._handle_call(message[2], message[3])
+                await self.ws.send_str(json.dumps([CALLRESULT, message[1], result]))
+                if follow_up is not None:
+                    asyncio.ensure_future(follow_up)
+            elif (future := self._pending.get(message[1])) is not None:
+                if message[0] == CALLRESULT:
+                    future.set_result(message[2])
+                else:
+                    future.set_exception(RuntimeError(f"{message[2]}: {message[3]}"))
+
+    async def _meter(self) -> None:
+        while True:
+            await asyncio.sleep(self.meter_interval)
+            for connector in self.connectors.values():
+                if connector.transaction_id is None:
+                    continue
+                power = connector.limit * VOLTAGE * PHASES
+                connector.meter_wh += power * self.meter_interval / 3600
+                sampled = [
+                    {"value": f"{connector.meter_wh:.0f}", "measurand": "Energy.Active.Import.Register", "unit": "Wh"},
+                    {"value": f"{power:.0f}", "measurand": "Power.Active.Import", "unit": "W"},
+                ] + [
+                    {"value": f"{connector.limit:.1f}", "measurand": "Current.Import", "phase": f"L{phase}", "unit": "A"}
+                    for phase in range(1, PHASES + 1)
+                ]
+                await self.call(
+                    "MeterValues",
+                    {
+                        "connectorId": connector.connector_id,
+                        "transactionId": connector.transaction_id,
+                        "meterValue": [{"timestamp": _now(), "sampledValue": sampled}],
+                    },
+                )
+
+    async def run(self, session: ClientSession, url: str) -> None:
+        async with session.ws_connect(f"{url.rstrip('/')}/{self.chargepoint_id}", protocols=("ocpp1.6",)) as ws:
+            self.ws = ws
+            receiver = asyncio.ensure_future(self._receive())
+            boot = await self.call(
+                "BootNotification",
+                {"chargePointVendor": "Simulated", "chargePointModel": "Halo"},
+            )
+            print(f"{self.chargepoint_id} boot {boot['status']}")
+            for connector in self.connectors.values():
+                await self.status(connector, "Available")
+            meter = asyncio.ensure_future(self._meter())
+            try:
+                while not receiver.done():
+                    await asyncio.wait([receiver], timeout=boot.get("interval", 300))
+                    if not receiver.done():
+                        await self.call("Heartbeat", {})
+            finally:
+                meter.cancel()
+                receiver.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="ws://127.0.0.1:9000")
+    parser.add_argument("--ids", nargs="+", required=True)
+    parser.add_argument("--connectors", type=int, default=2)
+    parser.add_argument("--meter-interval", type=float, default=10.0)
+    args = parser.parse_args()
+
+    async def run() -> None:
+        async with ClientSession() as session:
+            await asyncio.gather(
+                *(
+                    SimChargePoint(
+                        chargepoint_id,
+                        {i: SimConnector(i) for i in range(1, args.connectors + 1)},
+                        args.meter_interval,
+                    ).run(session, args.url)
+                    for chargepoint_id in args.ids
+                )
+            )
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
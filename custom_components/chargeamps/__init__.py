@@ -1,33 +1,117 @@
+import logging
+from datetime import timedelta
+
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .account import (
+    async_acquire_account_api,
+    async_release_account_api,
+    async_remove_account_tokens,
+)
+from .coordinator import (
+    SNAPSHOT_STORAGE_VERSION,
+    ChargeAmpsDataUpdateCoordinator,
+    snapshot_store_key,
+)
+from .const import CONF_OCPP_PORT, DEFAULT_OCPP_PORT, DOMAIN, PLATFORMS, SESSION_SYNC_INTERVAL
+from .energy_statistics import async_import_energy_statistics
+from .ocpp import async_acquire_ocpp_server, async_release_ocpp_server
+from .schedule import async_remove_schedules
+from .services import async_setup_services
+from .sessions import async_remove_history
+
+_LOGGER = logging.getLogger(__name__)
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
 
-from .api import ChargeAmpsApi
-from .coordinator import ChargeAmpsDataUpdateCoordinator
-from .const import DOMAIN, PLATFORMS
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Register services once for all entries."""
+    async_setup_services(hass)
+    return True
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Charge Amps from a config entry."""
-    email = entry.data.get("email")
-    password = entry.data.get("password")
-
-    api = ChargeAmpsApi(
-        session=hass.helpers.aiohttp_client.async_get_clientsession(),
-        email=email,
-        password=password
-    )
-    coordinator = ChargeAmpsDataUpdateCoordinator(hass, api)
-    await coordinator.async_config_entry_first_refresh()
+    # Entries på samma konto delar klient, token och pollning
+    api = await async_acquire_account_api(hass, entry)
+    coordinator = ChargeAmpsDataUpdateCoordinator(hass, api, entry)
+    if await coordinator.async_restore_snapshot():
+        # Varmstart: skapa entiteter från sparat läge och stäm av i bakgrunden
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), "chargeamps_reconcile"
+        )
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except Exception:
+            async_release_account_api(hass, entry)
+            raise
 
     # Spara coordinator för entiteter
     hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     # Initiera plattformar
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    entry.async_on_unload(coordinator.async_cancel_verify)
+
+    # Lokal OCPP-server; eAPI finns kvar som reserv
+    if port := entry.options.get(CONF_OCPP_PORT, DEFAULT_OCPP_PORT):
+        try:
+            await async_acquire_ocpp_server(hass, port, coordinator)
+        except OSError as err:
+            _LOGGER.error(
+                "Could not start the local OCPP central system on port %d, "
+                "using the eAPI only: %s",
+                port,
+                err,
+            )
+
+    # Prisstyrd laddning fortsätter efter omstart
+    await coordinator.scheduler.async_load()
+    entry.async_on_unload(coordinator.scheduler.async_stop)
+
+    # Synka laddsessioner inkrementellt i bakgrunden och importera energistatistik
+    await coordinator.sessions.async_load()
+
+    async def _async_sync_sessions(*_) -> None:
+        if not coordinator.api.available:
+            return
+        await coordinator.sessions.async_sync(list(coordinator.data))
+        await async_import_energy_statistics(hass, coordinator.data, coordinator.sessions)
+
+    entry.async_create_background_task(
+        hass, _async_sync_sessions(), "chargeamps_session_sync"
+    )
+    entry.async_on_unload(
+        async_track_time_interval(
+            hass, _async_sync_sessions, timedelta(seconds=SESSION_SYNC_INTERVAL)
+        )
+    )
     return True
 
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
     if unload_ok:
-        hass.data[DOMAIN].pop(entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        if port := entry.options.get(CONF_OCPP_PORT, DEFAULT_OCPP_PORT):
+            await async_release_ocpp_server(hass, port, coordinator)
+        async_release_account_api(hass, entry)
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove stored state and charging history when the entry is deleted."""
+    await Store(
+        hass, SNAPSHOT_STORAGE_VERSION, snapshot_store_key(entry.entry_id)
+    ).async_remove()
+    await async_remove_history(hass, entry.entry_id)
+    await async_remove_schedules(hass, entry.entry_id)
+    await async_remove_account_tokens(hass, entry)
@@ -0,0 +1,119 @@
+"""Charge Amps API clients shared per account.
+
+Config entries, and the config flow, that use the same credentials share
+one ChargeAmpsApi. One login and one token renewal then serve all of them,
+and so do the conditional-GET cache, the request quota, the settings write
+queue, the read cache and a dedicated connection pool (see transport.py).
+Each entry picks the chargepoints it cares about with the CONF_CHARGEPOINTS
+option.
+
+A new client starts from the account's persisted tokens (see tokens.py), so
+neither a restart nor a reload logs in with the password again.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import partial
+
+from aiohttp import ClientSession
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant, callback
+
+from .api import ChargeAmpsApi
+from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
+from .tokens import async_get_token_store
+from .transport import create_session
+
+# Key in hass.data[DOMAIN], next to the per-entry coordinators
+DATA_ACCOUNTS = "accounts"
+
+AccountKey = tuple[str, str]
+
+
+@dataclass(slots=True)
+class ChargeAmpsAccount:
+    """A shared client and the config entries using it."""
+
+    api: ChargeAmpsApi
+    session: ClientSession
+    entry_ids: set[str] = field(default_factory=set)
+
+
+def _account_key(email: str, password: str) -> AccountKey:
+    return email.strip().lower(), password
+
+
+@callback
+def _accounts(hass: HomeAssistant) -> dict[AccountKey, ChargeAmpsAccount]:
+    data = hass.data.setdefault(DOMAIN, {})
+    if DATA_ACCOUNTS not in data:
+        data[DATA_ACCOUNTS] = {}
+
+        async def _async_close_sessions(_: Event) -> None:
+            for account in data.pop(DATA_ACCOUNTS, {}).values():
+                account.api.cancel_renewal()
+                await account.session.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_sessions)
+    return data[DATA_ACCOUNTS]
+
+
+async def async_get_account_api(hass: HomeAssistant, email: str, password: str) -> ChargeAmpsApi:
+    """Return the shared client for these credentials, creating it if needed."""
+    accounts = _accounts(hass)
+    key = _account_key(email, password)
+    if (account := accounts.get(key)) is None:
+        tokens = await async_get_token_store(hass)
+        if (account := accounts.get(key)) is None:
+            session = create_session()
+            api = ChargeAmpsApi(session=session, email=email, password=password)
+            if stored := tokens.get(email):
+                api.restore_tokens(*stored)
+            api.token_listener = partial(tokens.async_set, email)
+            account = accounts[key] = ChargeAmpsAccount(api, session)
+    return account.api
+
+
+@callback
+def async_discard_unused_account(hass: HomeAssistant, email: str, password: str) -> None:
+    """Drop the client for these credentials if no entry is using it."""
+    accounts = _accounts(hass)
+    key = _account_key(email, password)
+    if (account := accounts.get(key)) is not None and not account.entry_ids:
+        del accounts[key]
+        account.api.cancel_renewal()
+        hass.async_create_task(account.session.close())
+
+
+async def async_acquire_account_api(hass: HomeAssistant, entry: ConfigEntry) -> ChargeAmpsApi:
+    """Return the shared client for an entry and register the entry as a user."""
+    email, password = entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD]
+    api = await async_get_account_api(hass, email, password)
+    _accounts(hass)[_account_key(email, password)].entry_ids.add(entry.entry_id)
+    return api
+
+
+@callback
+def async_release_account_api(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Unregister an entry; the client goes away with its last user.
+
+    The client is looked up by entry rather than by credentials, which a
+    reauth may have changed since the entry was set up.
+    """
+    accounts = _accounts(hass)
+    for key, account in list(accounts.items()):
+        if entry.entry_id in account.entry_ids:
+            account.entry_ids.discard(entry.entry_id)
+            async_discard_unused_account(hass, *key)
+
+
+async def async_remove_account_tokens(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Forget the persisted tokens once no other entry uses the account."""
+    email = entry.data[CONF_EMAIL]
+    if not any(
+        other.data[CONF_EMAIL].strip().lower() == email.strip().lower()
+        for other in hass.config_entries.async_entries(DOMAIN)
+        if other.entry_id != entry.entry_id
+    ):
+        (await async_get_token_store(hass)).async_remove(email)
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
 import asyncio
+import base64
+import json as jsonlib
 import logging
+import time
+from collections.abc import Callable
+from functools import partial
 from typing import Any
 
 import async_timeout
-from aiohttp import ClientSession, ClientResponseError
+from aiohttp import ClientError, ClientSession, ClientResponseError
 
 from .const import (
     API_BASE_URL,
@@ -13,8 +18,31 @@ from .const import (
     API_REFRESH_PATH,
     API_CHARGEPOINTS_OWNED_PATH,
     API_CHARGEPOINT_PATH,
+    API_CHARGEPOINT_STATUS_PATH,
+    API_CHARGEPOINT_SETTINGS_PATH,
+    API_CHARGING_SESSIONS_PATH,
+    API_CONNECTOR_SETTINGS_PATH,
+    API_REQUEST_BURST,
+    API_REQUEST_RATE,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_PROBE_BASE,
+    CIRCUIT_PROBE_MAX,
+    READ_CACHE_TTL,
     REQUEST_TIMEOUT,
+    SETTINGS_WRITE_DEBOUNCE,
+    SETTINGS_WRITE_MAX_DELAY,
+    TOKEN_REFRESH_MARGIN,
 )
+from .metrics import ApiMetrics, endpoint_label
+from .ratelimit import (
+    READ_POLICY,
+    WRITE_POLICY,
+    CircuitBreaker,
+    TokenBucket,
+    parse_retry_after,
+)
+from .transport import read_json
+from .write_queue import CoalescingWriteQueue
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -27,42 +55,119 @@ class ChargeAmpsAuthError(ChargeAmpsApiError):
     """Authentication failed."""
 
 
+class ChargeAmpsTransientError(ChargeAmpsApiError):
+    """Temporary failure (5xx, timeout, connection) that may succeed on retry."""
+
+    def __init__(self, message: str, retry_after: float | None = None) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class ChargeAmpsRateLimitError(ChargeAmpsTransientError):
+    """The eAPI throttled the request (429)."""
+
+
+class ChargeAmpsUnavailableError(ChargeAmpsApiError):
+    """The circuit breaker is open; the request was not sent."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"Charge Amps eAPI unavailable, next probe in {retry_in:.0f} s")
+        self.retry_in = retry_in
+
+
+# (path, sorted query parameters) of a GET
+ReadKey = tuple[str, tuple[tuple[str, Any], ...]]
+
+# Statuses worth retrying besides 429
+TRANSIENT_STATUSES = frozenset({500, 502, 503, 504})
+
+
 class ChargeAmpsApi:
     def __init__(
         self,
         session: ClientSession,
         email: str,
         password: str,
+        *,
+        base_url: str = API_BASE_URL,
+        request_rate: float = API_REQUEST_RATE,
+        request_burst: int = API_REQUEST_BURST,
+        read_cache_ttl: float = READ_CACHE_TTL,
     ) -> None:
         self._session = session
         self._email = email
         self._password = password
+        self._base_url = base_url
 
         self._access_token: str | None = None
         self._refresh_token: str | None = None
-        self._auth_lock = asyncio.Lock()
+        self._token_expires_at: float | None = None
+        self._renew_task: asyncio.Task[str] | None = None
+        self._renew_timer: asyncio.TimerHandle | None = None
+        self._auth_headers: tuple[str, dict[str, str]] | None = None
+        # Called with (access, refresh) whenever new tokens are obtained
+        self.token_listener: Callable[[str, str | None], None] | None = None
+        # path -> (ETag, Last-Modified, body) for conditional GETs
+        self._validators: dict[str, tuple[str | None, str | None, Any]] = {}
+        self._bucket = TokenBucket(request_rate, request_burst)
+        self.breaker = CircuitBreaker(
+            CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_PROBE_BASE, CIRCUIT_PROBE_MAX
+        )
+        self._settings_writes = CoalescingWriteQueue(
+            self._put_settings, SETTINGS_WRITE_DEBOUNCE, SETTINGS_WRITE_MAX_DELAY
+        )
+        self.metrics = ApiMetrics()
+        # Single-flight GETs, shared by every coordinator using this client:
+        # in-flight requests and the last responses, per path and params
+        self._read_cache_ttl = read_cache_ttl
+        self._reads: dict[ReadKey, asyncio.Task[Any]] = {}
+        self._read_cache: dict[ReadKey, tuple[float, Any]] = {}
+        # Bumped by every write, so reads sent before it are not cached
+        self._write_generation = 0
 
     # ---------------------------------------------------------------------
     # Authentication
     # ---------------------------------------------------------------------
 
+    @staticmethod
+    def _token_expiry(token: str) -> float | None:
+        """Return the exp claim of a JWT access token, if it has one."""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            claims = jsonlib.loads(base64.urlsafe_b64decode(payload))
+            return float(claims["exp"])
+        except (IndexError, KeyError, TypeError, ValueError):
+            return None
+
+    def _set_tokens(self, access_token: str, refresh_token: str | None) -> None:
+        self._access_token = access_token
+        self._refresh_token = refresh_token
+        self._token_expires_at = self._token_expiry(access_token)
+        self._schedule_renewal()
+        if self.token_listener is not None:
+            self.token_listener(access_token, refresh_token)
+
     async def _login(self) -> None:
         _LOGGER.debug("Charge Amps: logging in")
+        self.metrics.logins += 1
         try:
-            async with async_timeout.timeout(REQUEST_TIMEOUT):
-                resp = await self._session.post(
-                    f"{API_BASE_URL}{API_LOGIN_PATH}",
-                    json={"email": self._email, "password": self._password},
-                )
+            async with async_timeout.timeout(REQUEST_TIMEOUT), self._session.post(
+                f"{self._base_url}{API_LOGIN_PATH}",
+                json={"email": self._email, "password": self._password},
+            ) as resp:
                 resp.raise_for_status()
-                data = await resp.json()
+                data = await read_json(resp)
         except ClientResponseError as err:
+            if err.status in TRANSIENT_STATUSES:
+                raise ChargeAmpsTransientError(f"Login failed ({err.status})") from err
             raise ChargeAmpsAuthError(f"Login failed ({err.status})") from err
+        except (asyncio.TimeoutError, ClientError) as err:
+            raise ChargeAmpsTransientError(f"Login request failed: {err!r}") from err
         except Exception as err:
             raise ChargeAmpsAuthError("Login request failed") from err
 
-        self._access_token = data["token"]
-        self._refresh_token = data.get("refreshToken")
+        self._set_tokens(data["token"], data.get("refreshToken"))
         _LOGGER.debug("Charge Amps: login successful")
 
     async def _refresh(self) -> None:
@@ -70,38 +175,152 @@ class ChargeAmpsApi:
             await self._login()
             return
         _LOGGER.debug("Charge Amps: refreshing token")
+        self.metrics.token_refreshes += 1
         try:
-            async with async_timeout.timeout(REQUEST_TIMEOUT):
-                resp = await self._session.post(
-                    f"{API_BASE_URL}{API_REFRESH_PATH}",
-                    json={"refreshToken": self._refresh_token},
-                )
+            async with async_timeout.timeout(REQUEST_TIMEOUT), self._session.post(
+                f"{self._base_url}{API_REFRESH_PATH}",
+                json={"refreshToken": self._refresh_token},
+            ) as resp:
                 resp.raise_for_status()
-                data = await resp.json()
+                data = await read_json(resp)
         except ClientResponseError:
             _LOGGER.warning("Charge Amps: refresh failed, re-authenticating")
             await self._login()
             return
+        except (asyncio.TimeoutError, ClientError) as err:
+            raise ChargeAmpsTransientError(f"Token refresh failed: {err!r}") from err
         except Exception as err:
             raise ChargeAmpsAuthError("Token refresh failed") from err
 
-        self._access_token = data["token"]
-        self._refresh_token = data.get("refreshToken", self._refresh_token)
+        self._set_tokens(data["token"], data.get("refreshToken", self._refresh_token))
         _LOGGER.debug("Charge Amps: token refreshed")
 
-    async def _headers(self) -> dict[str, str]:
-        async with self._auth_lock:
-            if not self._access_token:
-                await self._login()
-        return {
-            "Authorization": f"Bearer {self._access_token}",
-            "Content-Type": "application/json",
-        }
+    @property
+    def refresh_token(self) -> str | None:
+        return self._refresh_token
+
+    @property
+    def has_tokens(self) -> bool:
+        return self._access_token is not None or self._refresh_token is not None
+
+    def restore_tokens(self, access_token: str | None, refresh_token: str) -> None:
+        """Use persisted tokens instead of logging in on the first request.
+
+        An expired access token is refreshed first; a password login only
+        happens if the refresh token is rejected too.
+        """
+        if self.has_tokens:
+            return
+        self._refresh_token = refresh_token
+        if access_token is not None:
+            self._access_token = access_token
+            self._token_expires_at = self._token_expiry(access_token)
+            self._schedule_renewal()
+
+    def _schedule_renewal(self) -> None:
+        """Renew the access token TOKEN_REFRESH_MARGIN before it expires.
+
+        _ensure_token still checks the expiry on every request, in case the
+        timer fires late or the renewal it started fails.
+        """
+        self.cancel_renewal()
+        if self._token_expires_at is None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        delay = self._token_expires_at - TOKEN_REFRESH_MARGIN - time.time()
+        self._renew_timer = loop.call_later(max(delay, 0.0), self._renewal_due)
+
+    def _renewal_due(self) -> None:
+        self._renew_timer = None
+        if self.has_tokens:
+            self._start_renew()
+
+    def cancel_renewal(self) -> None:
+        """Cancel the scheduled token renewal, for a client that is discarded."""
+        if self._renew_timer is not None:
+            self._renew_timer.cancel()
+            self._renew_timer = None
+
+    async def _renew(self) -> str:
+        if self._access_token is None and not self._refresh_token:
+            await self._login()
+        else:
+            await self._refresh()
+        return self._access_token
+
+    def _renew_done(self, task: asyncio.Task[str]) -> None:
+        self._renew_task = None
+        if not task.cancelled() and task.exception() is not None:
+            _LOGGER.debug("Charge Amps: token renewal failed: %s", task.exception())
+
+    def _start_renew(self) -> asyncio.Task[str]:
+        """Return the in-flight renewal, starting one if none is running."""
+        if self._renew_task is None:
+            self._renew_task = asyncio.create_task(self._renew())
+            self._renew_task.add_done_callback(self._renew_done)
+        return self._renew_task
+
+    async def _renew_token(self, stale_token: str | None) -> str:
+        """Replace stale_token, sharing one refresh between concurrent callers."""
+        if self._access_token is not None and self._access_token != stale_token:
+            # Someone else already renewed it while we were waiting
+            return self._access_token
+        return await asyncio.shield(self._start_renew())
+
+    async def _ensure_token(self) -> str:
+        """Return a usable access token, refreshing ahead of its expiry."""
+        token = self._access_token
+        if token is None:
+            return await self._renew_token(None)
+        if self._token_expires_at is not None:
+            remaining = self._token_expires_at - time.time()
+            if remaining <= 0:
+                return await self._renew_token(token)
+            if remaining <= TOKEN_REFRESH_MARGIN:
+                # The renewal timer should have done this; renew in the
+                # background and keep using the still valid token
+                self._start_renew()
+        return token
+
+    async def authenticate(self, *, verify_password: bool = False) -> None:
+        """Make sure the client holds a token, logging in only if it has none.
+
+        With verify_password the password is checked by logging in even if
+        there are tokens, as the config flow does before storing it.
+        """
+        if verify_password:
+            await self._login()
+            return
+        await self._ensure_token()
+
+    def _headers(self, token: str) -> dict[str, str]:
+        """Return the request headers for token, built once per token.
+
+        The dict is shared between requests; copy it before adding to it.
+        """
+        if self._auth_headers is None or self._auth_headers[0] != token:
+            self._auth_headers = (
+                token,
+                {"Authorization": f"Bearer {token}", "Content-Type": "application/json"},
+            )
+        return self._auth_headers[1]
 
     # ---------------------------------------------------------------------
     # Generic request helper
     # ---------------------------------------------------------------------
 
+    def _remember_validators(self, path: str, headers: Any, body: Any) -> None:
+        """Keep ETag/Last-Modified so the next GET of path can be conditional."""
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if etag or last_modified:
+            self._validators[path] = (etag, last_modified, body)
+        else:
+            self._validators.pop(path, None)
+
     async def _request(
         self,
         method: str,
@@ -109,53 +328,245 @@ class ChargeAmpsApi:
         *,
         json: dict[str, Any] | None = None,
         params: dict[str, Any] | None = None,
+    ) -> Any:
+        policy = READ_POLICY if method == "GET" else WRITE_POLICY
+        endpoint = endpoint_label(method, path)
+        attempt = 1
+        while True:
+            if not self.breaker.allow():
+                self.metrics.short_circuited += 1
+                raise ChargeAmpsUnavailableError(self.breaker.retry_in)
+            await self._bucket.acquire()
+            self.metrics.requests += 1
+            start = time.perf_counter()
+            try:
+                result = await self._send(method, path, json=json, params=params)
+            except ChargeAmpsRateLimitError as err:
+                # Throttled means reachable
+                self.breaker.record_success()
+                error = err
+            except ChargeAmpsTransientError as err:
+                # Counted by the breaker once the retries are used up
+                error = err
+            except ChargeAmpsApiError:
+                self.breaker.record_success()
+                self.metrics.errors += 1
+                raise
+            else:
+                if self.breaker.opened_at is not None:
+                    _LOGGER.info("Charge Amps: eAPI reachable again")
+                self.breaker.record_success()
+                return result
+            finally:
+                self.metrics.observe(endpoint, time.perf_counter() - start)
+
+            if isinstance(error, ChargeAmpsRateLimitError):
+                self.metrics.rate_limited += 1
+            if error.retry_after:
+                # The server asked everyone to back off, not just this call
+                self._bucket.block_for(error.retry_after)
+            delay = policy.retry_delay(attempt, error.retry_after)
+            if delay is None or self.breaker.is_open:
+                # One failure per call, not per attempt
+                if not isinstance(
+                    error, ChargeAmpsRateLimitError
+                ) and self.breaker.record_failure():
+                    _LOGGER.warning(
+                        "Charge Amps: eAPI unreachable, pausing requests for %.0f s",
+                        self.breaker.retry_in,
+                    )
+                self.metrics.errors += 1
+                _LOGGER.log(
+                    logging.DEBUG if self.breaker.is_open else logging.ERROR,
+                    "Charge Amps: %s %s failed: %s", method, path, error,
+                )
+                raise error
+            self.metrics.retries += 1
+            _LOGGER.debug(
+                "Charge Amps: %s %s failed (%s), retry %d in %.1f s",
+                method, path, error, attempt, delay,
+            )
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @property
+    def available(self) -> bool:
+        """Return False while the circuit breaker holds requests back."""
+        return not self.breaker.is_open
+
+    async def _send(
+        self,
+        method: str,
+        path: str,
+        *,
+        json: dict[str, Any] | None = None,
+        params: dict[str, Any] | None = None,
         retry: bool = True,
     ) -> Any:
-        url = f"{API_BASE_URL}{path}"
+        """Send one request, renewing the token once on 401."""
+        url = f"{self._base_url}{path}"
+        token = await self._ensure_token()
+        headers = self._headers(token)
+        cached = self._validators.get(path) if method == "GET" and not params else None
+        if cached is not None:
+            etag, last_modified, _ = cached
+            headers = dict(headers)
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
         try:
-            async with async_timeout.timeout(REQUEST_TIMEOUT):
-                resp = await self._session.request(
-                    method, url, headers=await self._headers(), json=json, params=params
-                )
-                if resp.status == 401 and retry:
-                    _LOGGER.debug("Charge Amps: 401 received, refreshing token")
-                    async with self._auth_lock:
-                        await self._refresh()
-                    return await self._request(method, path, json=json, params=params, retry=False)
-                resp.raise_for_status()
-                return await resp.json()
+            async with async_timeout.timeout(REQUEST_TIMEOUT), self._session.request(
+                method, url, headers=headers, json=json, params=params
+            ) as resp:
+                if resp.status == 304 and cached is not None:
+                    # Hand back the very same object so callers can skip work
+                    return cached[2]
+                if resp.status == 429:
+                    raise ChargeAmpsRateLimitError(
+                        f"Rate limited on {method} {path}",
+                        parse_retry_after(resp.headers.get("Retry-After")),
+                    )
+                if resp.status in TRANSIENT_STATUSES:
+                    raise ChargeAmpsTransientError(
+                        f"Server error {resp.status} on {method} {path}",
+                        parse_retry_after(resp.headers.get("Retry-After")),
+                    )
+                if resp.status != 401 or not retry:
+                    resp.raise_for_status()
+                    body = await read_json(resp)
+                    if method == "GET" and not params:
+                        self._remember_validators(path, resp.headers, body)
+                    return body
+        except ChargeAmpsApiError:
+            raise
         except ClientResponseError as err:
             _LOGGER.error("Charge Amps API error %s on %s %s", err.status, method, path)
             raise ChargeAmpsApiError(err) from err
+        except (asyncio.TimeoutError, ClientError) as err:
+            raise ChargeAmpsTransientError(f"Request failed: {err!r}") from err
         except Exception as err:
             raise ChargeAmpsApiError("Request failed") from err
 
+        _LOGGER.debug("Charge Amps: 401 received, refreshing token")
+        self.metrics.unauthorized += 1
+        if await self._renew_token(token) == token:
+            raise ChargeAmpsAuthError("Access token rejected and could not be renewed")
+        return await self._send(method, path, json=json, params=params, retry=False)
+
     # ---------------------------------------------------------------------
     # Public GET endpoints
     # ---------------------------------------------------------------------
 
+    def _read_done(self, key: ReadKey, generation: int, task: asyncio.Task[Any]) -> None:
+        if self._reads.get(key) is task:
+            del self._reads[key]
+        # Retrieving the exception also keeps asyncio from logging it
+        if task.cancelled() or task.exception() is not None:
+            return
+        # Only resources read every cycle are cached; parametrised reads such
+        # as session windows differ per call and would only pile up
+        if self._read_cache_ttl > 0 and not key[1] and generation == self._write_generation:
+            now = time.monotonic()
+            for stale in [
+                stale
+                for stale, (stored, _) in self._read_cache.items()
+                if now - stored >= self._read_cache_ttl
+            ]:
+                del self._read_cache[stale]
+            self._read_cache[key] = (now, task.result())
+
+    async def _get(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        """GET path; concurrent identical GETs share one request and its result.
+
+        A GET without params within read_cache_ttl of the last response for
+        the same path gets that response without a request. Callers being
+        cancelled does not cancel the shared request.
+        """
+        key: ReadKey = (path, tuple(sorted(params.items())) if params else ())
+        cached = self._read_cache.get(key)
+        if cached is not None:
+            if time.monotonic() - cached[0] < self._read_cache_ttl:
+                self.metrics.coalesced += 1
+                return cached[1]
+            del self._read_cache[key]
+        task = self._reads.get(key)
+        if task is None:
+            task = self._reads[key] = asyncio.create_task(
+                self._request("GET", path, params=params)
+            )
+            task.add_done_callback(partial(self._read_done, key, self._write_generation))
+        else:
+            self.metrics.coalesced += 1
+        return await asyncio.shield(task)
+
     async def get_chargepoints(self) -> list[dict[str, Any]]:
-        return await self._request("GET", API_CHARGEPOINTS_OWNED_PATH)
+        """Get owned chargepoints."""
+        return await self._get(API_CHARGEPOINTS_OWNED_PATH)
 
     async def get_chargepoint(self, chargepoint_id: str) -> dict[str, Any]:
-        return await self._request("GET", API_CHARGEPOINT_PATH.format(chargepoint_id=chargepoint_id))
+        return await self._get(API_CHARGEPOINT_PATH.format(chargepoint_id=chargepoint_id))
+
+    async def get_chargepoint_status(self, chargepoint_id: str) -> dict[str, Any]:
+        """Get live status and measurements for a chargepoint and its connectors."""
+        return await self._get(API_CHARGEPOINT_STATUS_PATH.format(chargepoint_id=chargepoint_id))
+
+    async def get_chargepoint_settings(self, chargepoint_id: str) -> dict[str, Any]:
+        """Get chargepoint-level settings (dimmer, downLight)."""
+        return await self._get(
+            API_CHARGEPOINT_SETTINGS_PATH.format(chargepoint_id=chargepoint_id)
+        )
+
+    async def get_charging_sessions(
+        self, chargepoint_id: str, start_time: str, end_time: str
+    ) -> list[dict[str, Any]]:
+        """Get charging sessions of a chargepoint between two ISO 8601 times."""
+        return await self._get(
+            API_CHARGING_SESSIONS_PATH.format(chargepoint_id=chargepoint_id),
+            {"startTime": start_time, "endTime": end_time},
+        )
 
     # ---------------------------------------------------------------------
     # Public PUT endpoints (styrning)
     # ---------------------------------------------------------------------
 
+    async def _put_settings(self, path: str, payload: dict[str, Any]) -> Any:
+        try:
+            return await self._request("PUT", path, json=payload)
+        finally:
+            # Reads from before the write, cached or in flight, are stale now
+            self._write_generation += 1
+            self._read_cache.clear()
+            self._reads.clear()
+
+    async def set_connector_settings(
+        self, chargepoint_id: str, connector_id: int, settings: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Write connector settings, merged with other writes in the debounce window."""
+        path = API_CONNECTOR_SETTINGS_PATH.format(
+            chargepoint_id=chargepoint_id, connector_id=connector_id
+        )
+        return await self._settings_writes.async_write(path, settings)
+
+    async def set_chargepoint_settings(
+        self, chargepoint_id: str, settings: dict[str, Any]
+    ) -> dict[str, Any]:
+        """Write chargepoint settings, merged with other writes in the debounce window."""
+        path = API_CHARGEPOINT_SETTINGS_PATH.format(chargepoint_id=chargepoint_id)
+        return await self._settings_writes.async_write(path, settings)
+
     async def set_connector_mode(
         self, chargepoint_id: str, connector_id: int, mode: str
     ) -> dict[str, Any]:
         """Set mode of a connector (Off, Charging, etc)."""
-        path = f"/chargepoints/{chargepoint_id}/connectors/{connector_id}/settings"
-        payload = {"mode": mode}
-        return await self._request("PUT", path, json=payload)
+        return await self.set_connector_settings(
+            chargepoint_id, connector_id, {"mode": mode}
+        )
 
     async def set_connector_max_current(
         self, chargepoint_id: str, connector_id: int, max_current: int
     ) -> dict[str, Any]:
         """Set max current on a connector."""
-        path = f"/chargepoints/{chargepoint_id}/connectors/{connector_id}/settings"
-        payload = {"maxCurrent": max_current}
-        return await self._request("PUT", path, json=payload)
+        return await self.set_connector_settings(
+            chargepoint_id, connector_id, {"maxCurrent": max_current}
+        )
@@ -0,0 +1,141 @@
+"""Share a site current budget fairly between charging connectors.
+
+Charging connectors get an equal share of the budget in whole amps, capped
+at the maximum current. If the budget cannot give every charging connector
+the minimum current, as many as fit get the minimum and the rest get 0 A.
+Only connectors whose maxCurrent changes are written, concurrently but at
+most max_concurrent at a time. Writes go through the owning coordinator, so
+they use the local OCPP connection when there is one and are rolled back
+or confirmed like any other setting.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Hashable, Sequence
+from dataclasses import asdict, dataclass
+from typing import Any, TypeVar
+
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import STATUS_CHARGING
+from .coordinator import ChargeAmpsDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+
+RESULT_UNCHANGED = "unchanged"
+RESULT_UPDATED = "updated"
+RESULT_FAILED = "failed"
+
+
+def allocate_current(
+    budget: float, connectors: Sequence[K], min_current: int, max_current: int
+) -> dict[K, int]:
+    """Split budget amps over connectors, in their given order of priority."""
+    remaining = max(int(budget), 0)
+    fits = len(connectors) if min_current <= 0 else remaining // min_current
+    served = list(connectors[:fits])
+    allocation = dict.fromkeys(connectors[fits:], 0)
+    if not served:
+        return allocation
+
+    share = min(max_current, remaining // len(served))
+    # Whole amps left after the equal split go one each to the first connectors
+    extra = remaining - share * len(served) if share < max_current else 0
+    for index, key in enumerate(served):
+        allocation[key] = share + (1 if index < extra else 0)
+    return allocation
+
+
+@dataclass(slots=True)
+class ConnectorBudgetResult:
+    chargepoint_id: str
+    connector_id: int
+    charging: bool
+    previous: int | None
+    allocated: int
+    result: str = RESULT_UNCHANGED
+    error: str | None = None
+
+
+async def async_apply_current_budget(
+    coordinators: list[ChargeAmpsDataUpdateCoordinator],
+    budget: float,
+    *,
+    min_current: int,
+    max_current: int,
+    idle_current: int | None = None,
+    chargepoint_ids: set[str] | None = None,
+    max_concurrent: int,
+) -> dict[str, Any]:
+    """Compute and write the allocation; return a per-connector report."""
+    # Each connector once, even if several entries follow its chargepoint
+    owners: dict[tuple[str, int], ChargeAmpsDataUpdateCoordinator] = {}
+    results: dict[tuple[str, int], ConnectorBudgetResult] = {}
+    charging: list[tuple[str, int]] = []
+    for coordinator in coordinators:
+        for cp_id, chargepoint in coordinator.data.items():
+            if chargepoint_ids and cp_id not in chargepoint_ids:
+                continue
+            for connector_id, connector in chargepoint.connectors.items():
+                key = (cp_id, connector_id)
+                if key in owners:
+                    continue
+                owners[key] = coordinator
+                is_charging = connector.status.status == STATUS_CHARGING
+                if is_charging:
+                    charging.append(key)
+                elif idle_current is None:
+                    continue
+                results[key] = ConnectorBudgetResult(
+                    cp_id,
+                    connector_id,
+                    is_charging,
+                    connector.settings.max_current,
+                    0 if is_charging else idle_current,
+                )
+
+    charging.sort()
+    for key, amps in allocate_current(budget, charging, min_current, max_current).items():
+        results[key].allocated = amps
+
+    limit = asyncio.Semaphore(max_concurrent)
+
+    async def _write(result: ConnectorBudgetResult) -> None:
+        async with limit:
+            try:
+                await owners[
+                    (result.chargepoint_id, result.connector_id)
+                ].async_write_setting(
+                    result.chargepoint_id, result.connector_id, "maxCurrent", result.allocated
+                )
+            except HomeAssistantError as err:
+                result.result = RESULT_FAILED
+                result.error = str(err)
+                _LOGGER.warning(
+                    "Failed to set maxCurrent for connector %s/%s: %s",
+                    result.chargepoint_id,
+                    result.connector_id,
+                    err,
+                )
+            else:
+                result.result = RESULT_UPDATED
+
+    changed = [result for result in results.values() if result.allocated != result.previous]
+    await asyncio.gather(*(_write(result) for result in changed))
+
+    _LOGGER.debug(
+        "Current budget %s A: %d connectors charging, %d written",
+        budget, len(charging), len(changed),
+    )
+    ordered = [results[key] for key in sorted(results)]
+    return {
+        "budget": budget,
+        "allocated": sum(result.allocated for result in ordered if result.charging),
+        "charging": len(charging),
+        "updated": sum(result.result == RESULT_UPDATED for result in ordered),
+        "failed": sum(result.result == RESULT_FAILED for result in ordered),
+        "connectors": [asdict(result) for result in ordered],
+    }
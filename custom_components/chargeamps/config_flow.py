@@ -1,12 +1,33 @@
 from __future__ import annotations
 
+from collections.abc import Mapping
+from typing import Any
+
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN, CONF_EMAIL, CONF_PASSWORD
-from .api import ChargeAmpsApi, ChargeAmpsAuthError
+from .const import (
+    DOMAIN,
+    CONF_CHARGEPOINTS,
+    CONF_EMAIL,
+    CONF_PASSWORD,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_SLOW_SCAN_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_OCPP_PORT,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_OCPP_PORT,
+    DEFAULT_SLOW_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
+    MAX_SCAN_INTERVAL,
+    MAX_CONCURRENT_REQUESTS,
+)
+from .account import async_discard_unused_account, async_get_account_api
+from .api import ChargeAmpsApiError, ChargeAmpsAuthError
 
 class ChargeAmpsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Charge Amps."""
@@ -14,6 +35,12 @@ class ChargeAmpsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Return the options flow handler."""
+        return ChargeAmpsOptionsFlow()
+
     async def async_step_user(self, user_input=None):
         """Handle the initial step initiated by the user."""
         errors = {}
@@ -22,16 +49,18 @@ class ChargeAmpsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             email = user_input[CONF_EMAIL]
             password = user_input[CONF_PASSWORD]
 
-            # Test API login using HA session
-            session = self.hass.helpers.aiohttp_client.async_get_clientsession()
-            api = ChargeAmpsApi(session=session, email=email, password=password)
+            # Logga in med den delade klienten; entryt tar över klienten och
+            # dess token, som också sparas krypterat till nästa omstart
+            api = await async_get_account_api(self.hass, email, password)
 
             try:
-                await api._login()
+                await api.authenticate(verify_password=True)
             except ChargeAmpsAuthError:
                 errors["base"] = "invalid_auth"
             except Exception:
                 errors["base"] = "cannot_connect"
+            if errors:
+                async_discard_unused_account(self.hass, email, password)
 
             if not errors:
                 # All good, create entry
@@ -55,3 +84,109 @@ class ChargeAmpsConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             data_schema=data_schema,
             errors=errors
         )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]):
+        """Start reauth when both the refresh token and the password were rejected."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        """Ask for the account's password again."""
+        errors = {}
+        entry = self._get_reauth_entry()
+        email = entry.data[CONF_EMAIL]
+
+        if user_input:
+            password = user_input[CONF_PASSWORD]
+            api = await async_get_account_api(self.hass, email, password)
+            try:
+                await api.authenticate(verify_password=True)
+            except ChargeAmpsAuthError:
+                errors["base"] = "invalid_auth"
+            except Exception:
+                errors["base"] = "cannot_connect"
+            if errors:
+                async_discard_unused_account(self.hass, email, password)
+            else:
+                return self.async_update_reload_and_abort(
+                    entry, data_updates={CONF_PASSWORD: password}
+                )
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_PASSWORD): str}),
+            description_placeholders={"email": email},
+            errors=errors,
+        )
+
+
+class ChargeAmpsOptionsFlow(config_entries.OptionsFlow):
+    """Handle Charge Amps options."""
+
+    async def _async_chargepoint_choices(self) -> dict[str, str]:
+        """Return id -> name of the account's chargepoints, for subscribing."""
+        entry = self.config_entry
+        choices = {cp_id: cp_id for cp_id in entry.options.get(CONF_CHARGEPOINTS, [])}
+        api = await async_get_account_api(
+            self.hass, entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD]
+        )
+        try:
+            raw_chargepoints = await api.get_chargepoints()
+        except ChargeAmpsApiError:
+            return choices
+        finally:
+            # Kept if the loaded entry uses it, otherwise closed again
+            async_discard_unused_account(
+                self.hass, entry.data[CONF_EMAIL], entry.data[CONF_PASSWORD]
+            )
+        for cp in raw_chargepoints:
+            if cp_id := cp.get("id"):
+                choices[cp_id] = cp.get("name") or cp_id
+        return choices
+
+    async def async_step_init(self, user_input=None):
+        """Manage polling bounds, request concurrency and chargepoints."""
+        errors = {}
+
+        if user_input:
+            if user_input[CONF_FAST_SCAN_INTERVAL] > user_input[CONF_SLOW_SCAN_INTERVAL]:
+                errors["base"] = "fast_above_slow"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        interval = vol.All(
+            vol.Coerce(int), vol.Range(min=MIN_SCAN_INTERVAL, max=MAX_SCAN_INTERVAL)
+        )
+        data_schema = vol.Schema(
+            {
+                vol.Required(
+                    CONF_FAST_SCAN_INTERVAL,
+                    default=options.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL),
+                ): interval,
+                vol.Required(
+                    CONF_SLOW_SCAN_INTERVAL,
+                    default=options.get(CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL),
+                ): interval,
+                vol.Required(
+                    CONF_MAX_CONCURRENT_REQUESTS,
+                    default=options.get(
+                        CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1, max=MAX_CONCURRENT_REQUESTS)),
+                # Tomt val betyder alla laddpunkter på kontot
+                vol.Optional(
+                    CONF_CHARGEPOINTS,
+                    default=options.get(CONF_CHARGEPOINTS, []),
+                ): cv.multi_select(await self._async_chargepoint_choices()),
+                # Port för lokal OCPP-server, 0 = av
+                vol.Optional(
+                    CONF_OCPP_PORT,
+                    default=options.get(CONF_OCPP_PORT, DEFAULT_OCPP_PORT),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=65535)),
+            }
+        )
+        return self.async_show_form(
+            step_id="init",
+            data_schema=data_schema,
+            errors=errors
+        )
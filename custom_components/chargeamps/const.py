@@ -9,6 +9,15 @@ DOMAIN = "chargeamps"
 CONF_EMAIL = "email"
 CONF_PASSWORD = "password"
 
+# Options
+CONF_FAST_SCAN_INTERVAL = "fast_scan_interval"
+CONF_SLOW_SCAN_INTERVAL = "slow_scan_interval"
+CONF_MAX_CONCURRENT_REQUESTS = "max_concurrent_requests"
+# Chargepoint ids an entry subscribes to; empty means all owned chargepoints
+CONF_CHARGEPOINTS = "chargepoints"
+# Port of the local OCPP central system; 0 turns it off
+CONF_OCPP_PORT = "ocpp_port"
+
 # ---------------------------------------------------------------------
 # API
 # ---------------------------------------------------------------------
@@ -20,6 +29,25 @@ API_REFRESH_PATH = "/auth/refreshtoken"
 
 API_CHARGEPOINTS_OWNED_PATH = "/chargepoints/owned"
 API_CHARGEPOINT_PATH = "/chargepoints/{chargepoint_id}"
+API_CHARGEPOINT_STATUS_PATH = "/chargepoints/{chargepoint_id}/status"
+API_CHARGEPOINT_SETTINGS_PATH = "/chargepoints/{chargepoint_id}/settings"
+API_CHARGING_SESSIONS_PATH = "/chargepoints/{chargepoint_id}/chargingsessions"
+API_CONNECTOR_SETTINGS_PATH = (
+    "/chargepoints/{chargepoint_id}/connectors/{connector_id}/settings"
+)
+
+# ---------------------------------------------------------------------
+# Local OCPP 1.6J central system
+# ---------------------------------------------------------------------
+
+DEFAULT_OCPP_PORT = 0  # off
+OCPP_SUBPROTOCOL = "ocpp1.6"
+OCPP_HEARTBEAT_INTERVAL = 300  # seconds
+OCPP_CALL_TIMEOUT = 30  # seconds
+# idTag used for remote starts from Home Assistant
+OCPP_ID_TAG = "HomeAssistant"
+# chargingProfileId of the TxDefaultProfile carrying maxCurrent
+OCPP_CHARGING_PROFILE_ID = 1
 
 # ---------------------------------------------------------------------
 # HTTP / Networking
@@ -27,6 +55,42 @@ API_CHARGEPOINT_PATH = "/chargepoints/{chargepoint_id}"
 
 REQUEST_TIMEOUT = 10
 
+# Dedicated connection pool for the eAPI host
+TRANSPORT_POOL_SIZE = 16
+TRANSPORT_DNS_CACHE_TTL = 300  # seconds
+TRANSPORT_KEEPALIVE_TIMEOUT = 60  # seconds
+
+# Decode response bodies at least this large in an executor
+JSON_EXECUTOR_THRESHOLD = 64 * 1024  # bytes
+
+# Client-side request budget (token bucket) for the eAPI quota
+API_REQUEST_RATE = 5.0  # requests per second
+API_REQUEST_BURST = 20
+
+# Parallel per-chargepoint requests during a refresh
+DEFAULT_MAX_CONCURRENT_REQUESTS = 8
+MAX_CONCURRENT_REQUESTS = 32
+
+# Settings writes to the same resource within this window share one PUT
+SETTINGS_WRITE_DEBOUNCE = 0.5  # seconds
+SETTINGS_WRITE_MAX_DELAY = 2.0  # seconds
+
+# Re-read only the written chargepoint this long after a write to confirm it
+WRITE_VERIFY_DELAY = 3.0  # seconds
+
+# Identical GETs share one in-flight request, and a GET this soon after a
+# response gets that response; keep it at or below MIN_SCAN_INTERVAL
+READ_CACHE_TTL = 2.0  # seconds
+
+# Circuit breaker: stop requesting after this many consecutive failed calls,
+# then probe the eAPI with a doubling delay between the two bounds
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_PROBE_BASE = 30  # seconds
+CIRCUIT_PROBE_MAX = 900  # seconds
+
+# Refresh the access token this many seconds before its exp claim
+TOKEN_REFRESH_MARGIN = 60
+
 # ---------------------------------------------------------------------
 # Home Assistant
 # ---------------------------------------------------------------------
@@ -35,16 +99,80 @@ PLATFORMS: list[str] = [
     "sensor",
     "switch",
     "number",
+    "select",
+    "light",
 ]
 
 DEFAULT_SCAN_INTERVAL = 30  # seconds
 
+# Chargepoint settings (lights) rarely change; re-read them this often
+CHARGEPOINT_SETTINGS_INTERVAL = 900  # seconds
+
+# Dimmer levels of the chargepoint lights
+DIMMER_OPTIONS = ["Off", "Low", "Medium", "High"]
+
+# Samples kept per connector for derived sensors (1 h at the fast interval)
+MEASUREMENT_BUFFER_SIZE = 720
+
+# Persist renewed tokens after this delay, batching rapid renewals
+TOKEN_SAVE_DELAY = 10  # seconds
+
+# Persist the last known state at most this often, for warm starts
+SNAPSHOT_SAVE_DELAY = 300  # seconds
+
+# Keep serving the last good data this long while the eAPI is unreachable
+STALE_DATA_MAX_AGE = 6 * 3600  # seconds
+
+# Charging session history
+SESSION_SYNC_INTERVAL = 3600  # seconds
+# How far back the first sync goes on a new account
+SESSION_HISTORY_START = "2015-01-01T00:00:00"
+
+# Adaptive polling: fast while charging or right after a write,
+# slow once every connector has been idle for IDLE_BACKOFF_AFTER
+DEFAULT_FAST_SCAN_INTERVAL = 5  # seconds
+DEFAULT_SLOW_SCAN_INTERVAL = 300  # seconds
+MIN_SCAN_INTERVAL = 2  # seconds
+MAX_SCAN_INTERVAL = 3600  # seconds
+IDLE_BACKOFF_AFTER = 600  # seconds
+WRITE_ACTIVITY_WINDOW = 60  # seconds
+
+# Connector current limits; cars do not charge below 6 A (IEC 61851)
+CONNECTOR_MIN_CURRENT = 6  # A
+CONNECTOR_MAX_CURRENT = 32  # A
+
+# ---------------------------------------------------------------------
+# Services
+# ---------------------------------------------------------------------
+
+SERVICE_SET_SITE_CURRENT_BUDGET = "set_site_current_budget"
+SERVICE_SET_CHARGING_SCHEDULE = "set_charging_schedule"
+SERVICE_CLEAR_CHARGING_SCHEDULE = "clear_charging_schedule"
+
+ATTR_BUDGET = "budget"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_CHARGEPOINT_IDS = "chargepoint_ids"
+ATTR_MIN_CURRENT = "min_current"
+ATTR_MAX_CURRENT = "max_current"
+ATTR_IDLE_CURRENT = "idle_current"
+ATTR_PRICE_ENTITY = "price_entity"
+ATTR_PRICE_ATTRIBUTE = "price_attribute"
+ATTR_DEPARTURE = "departure"
+ATTR_ENERGY = "energy"
+ATTR_PHASES = "phases"
+ATTR_VOLTAGE = "voltage"
+
+DEFAULT_PHASES = 3
+DEFAULT_VOLTAGE = 230  # V
+
 # ---------------------------------------------------------------------
 # Device / attributes (för senare användning)
 # ---------------------------------------------------------------------
 
 ATTR_CHARGEPOINT_ID = "chargepoint_id"
 ATTR_CONNECTOR_ID = "connector_id"
+# Set while the eAPI is unreachable and entities show the last known data
+ATTR_STALE_SINCE = "stale_since"
 
 # Vanliga statusvärden (bekräftas mot payload senare)
 STATUS_CHARGING = "Charging"
@@ -1,84 +1,715 @@
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from collections.abc import Awaitable, Callable
 from datetime import timedelta
 from typing import Any
 
-from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.update_coordinator import (
     DataUpdateCoordinator,
     UpdateFailed,
 )
 
-from .api import ChargeAmpsApi, ChargeAmpsApiError
-from .const import DEFAULT_SCAN_INTERVAL
+from .api import (
+    ChargeAmpsApi,
+    ChargeAmpsApiError,
+    ChargeAmpsAuthError,
+    ChargeAmpsTransientError,
+    ChargeAmpsUnavailableError,
+)
+from .const import (
+    CHARGEPOINT_SETTINGS_INTERVAL,
+    CONF_CHARGEPOINTS,
+    CONF_FAST_SCAN_INTERVAL,
+    CONF_MAX_CONCURRENT_REQUESTS,
+    CONF_SLOW_SCAN_INTERVAL,
+    DEFAULT_FAST_SCAN_INTERVAL,
+    DEFAULT_MAX_CONCURRENT_REQUESTS,
+    DEFAULT_SCAN_INTERVAL,
+    DEFAULT_SLOW_SCAN_INTERVAL,
+    DOMAIN,
+    IDLE_BACKOFF_AFTER,
+    MEASUREMENT_BUFFER_SIZE,
+    SNAPSHOT_SAVE_DELAY,
+    STALE_DATA_MAX_AGE,
+    STATUS_CHARGING,
+    WRITE_ACTIVITY_WINDOW,
+    WRITE_VERIFY_DELAY,
+)
+from .measurements import MEASUREMENTS_KEY, MeasurementBuffer
+from .metrics import CoordinatorMetrics
+from .models import (
+    ChargePoint,
+    ChargePointSettings,
+    Connector,
+    ConnectorSettings,
+    ConnectorStatus,
+)
+from .ocpp import OcppConnection
+from .schedule import ChargeScheduler
+from .sessions import ChargingSessionSync
 
 _LOGGER = logging.getLogger(__name__)
 
+_MISSING = object()
+
+SNAPSHOT_STORAGE_VERSION = 1
+
+
+def snapshot_store_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.snapshot"
+
+
+# (chargepoint_id, connector_id or None for the chargepoint, field)
+ChangeKey = tuple[str, int | None, str]
+
+# (chargepoint_id, connector_id or None for the chargepoint itself)
+StructureKey = tuple[str, int | None]
+
+# Called with newly discovered chargepoints and connectors
+DiscoveryListener = Callable[
+    [list[ChargePoint], list[tuple[ChargePoint, Connector]]], None
+]
+
 
 class ChargeAmpsDataUpdateCoordinator(DataUpdateCoordinator):
     """Coordinator for Charge Amps data."""
 
-    def __init__(self, hass: HomeAssistant, api: ChargeAmpsApi) -> None:
+    def __init__(
+        self, hass: HomeAssistant, api: ChargeAmpsApi, entry: ConfigEntry
+    ) -> None:
         """Initialize the coordinator."""
         self.api = api
+        self.entry_id = entry.entry_id
+        self.fast_interval = timedelta(
+            seconds=entry.options.get(CONF_FAST_SCAN_INTERVAL, DEFAULT_FAST_SCAN_INTERVAL)
+        )
+        self.slow_interval = timedelta(
+            seconds=entry.options.get(CONF_SLOW_SCAN_INTERVAL, DEFAULT_SLOW_SCAN_INTERVAL)
+        )
+        self.normal_interval = min(
+            max(timedelta(seconds=DEFAULT_SCAN_INTERVAL), self.fast_interval),
+            self.slow_interval,
+        )
+        self.max_concurrent_requests: int = entry.options.get(
+            CONF_MAX_CONCURRENT_REQUESTS, DEFAULT_MAX_CONCURRENT_REQUESTS
+        )
+        self._request_limit = asyncio.Semaphore(self.max_concurrent_requests)
+        self._last_active = time.monotonic()
+        self._last_write = 0.0
+        self.metrics = CoordinatorMetrics()
+        # Wall-clock time of the last good data, and since when it is being
+        # served stale because the eAPI is unreachable
+        self._last_success: float | None = None
+        self.stale_since: float | None = None
+        # Chargepoints this entry follows on a shared account; empty means all
+        self._subscribed = frozenset(entry.options.get(CONF_CHARGEPOINTS) or ())
+        self.sessions = ChargingSessionSync(hass, api, entry.entry_id)
+        self.scheduler = ChargeScheduler(hass, self, entry.entry_id)
+        self._snapshot_store: Store[dict[str, Any]] = Store(
+            hass, SNAPSHOT_STORAGE_VERSION, snapshot_store_key(entry.entry_id)
+        )
 
         super().__init__(
             hass,
             _LOGGER,
+            config_entry=entry,
             name="Charge Amps",
-            update_interval=timedelta(seconds=DEFAULT_SCAN_INTERVAL),
+            update_interval=self.normal_interval,
         )
 
-        # Internal cache: chargepoint_id -> dict
-        self.data: dict[str, Any] = {}
+        # Internal cache: chargepoint_id -> ChargePoint
+        self.data: dict[str, ChargePoint] = {}
+
+        # Flattened view of self.data used to compute what changed per refresh
+        self._values: dict[ChangeKey, Any] = {}
+        self._pending_changes: set[ChangeKey] | None = None
+        self._notified_success = True
+
+        # Last owned-chargepoints payload and each chargepoint's part of it
+        self._raw_chargepoints: list[dict[str, Any]] | None = None
+        self._last_raw: dict[str, dict[str, Any]] = {}
+
+        # Chargepoints/connectors that entities exist for, and who adds new ones
+        self._known: set[StructureKey] = set()
+        self._discovery_listeners: list[DiscoveryListener] = []
+
+        # When each chargepoint's settings were last read
+        self._settings_fetched: dict[str, float] = {}
+
+        # Written values not yet confirmed, and pending per-chargepoint re-reads
+        self._unconfirmed: dict[ChangeKey, Any] = {}
+        self._verify_timers: dict[str, CALLBACK_TYPE] = {}
+
+        # Chargepoints connected to the local OCPP central system, and the
+        # connector settings written to them, which the eAPI doesn't know about
+        self._local: dict[str, OcppConnection] = {}
+        self._local_settings: dict[ChangeKey, Any] = {}
+
+        # Recent samples per connector, and the connectors sampled this cycle
+        self.measurements: dict[StructureKey, MeasurementBuffer] = {}
+        self._sampled: set[ChangeKey] = set()
 
-    async def _async_update_data(self) -> dict[str, Any]:
-        """Fetch data from API and normalize it."""
+    async def _async_update_data(self) -> dict[str, ChargePoint]:
+        """Fetch data from API and update the chargepoint model."""
+        start = time.perf_counter()
         try:
             raw_chargepoints = await self.api.get_chargepoints()
+        except ChargeAmpsAuthError as err:
+            # Both the refresh token and the password were rejected
+            raise ConfigEntryAuthFailed(f"Charge Amps login failed: {err}") from err
         except ChargeAmpsApiError as err:
+            self.metrics.failed_cycles += 1
+            if (stale := self._stale_data(err)) is not None:
+                return stale
             raise UpdateFailed(f"Error fetching Charge Amps data: {err}") from err
+        fetched = time.perf_counter()
 
-        chargepoints: dict[str, Any] = {}
+        chargepoints: dict[str, ChargePoint] = {}
+        last_raw: dict[str, dict[str, Any]] = {}
 
-        for cp in raw_chargepoints:
-            cp_id = cp.get("id")
-            if not cp_id:
-                _LOGGER.warning("Found chargepoint without id: %s", cp)
-                continue
+        if raw_chargepoints is self._raw_chargepoints:
+            # 304 Not Modified: the API handed back the cached payload
+            chargepoints.update(self.data)
+            last_raw = self._last_raw
+        else:
+            for cp in raw_chargepoints:
+                cp_id = cp.get("id")
+                if not cp_id:
+                    _LOGGER.warning("Found chargepoint without id: %s", cp)
+                    continue
+                if not self.is_subscribed(cp_id):
+                    continue
 
-            # Map chargepoint info
-            chargepoints[cp_id] = {
-                "id": cp_id,
-                "name": cp.get("name"),
-                "type": cp.get("type"),
-                "firmwareVersion": cp.get("firmwareVersion"),
-                "hardwareVersion": cp.get("hardwareVersion"),
-                "isLoadbalanced": cp.get("isLoadbalanced", False),
-                "ownerReadOnly": cp.get("ownerReadOnly", True),
-                "ocppVersion": cp.get("ocppVersion"),
-                "settings": cp.get("settings", {}),
-                "connectors": {},
-            }
-
-            # Map connectors
-            for connector in cp.get("connectors", []):
-                connector_id = connector.get("connectorId")
-                if connector_id is None:
+                chargepoint = self.data.get(cp_id) or ChargePoint(cp_id)
+                chargepoints[cp_id] = chargepoint
+
+                # Skip re-mapping the chargepoint if its payload is unchanged
+                last_raw[cp_id] = cp
+                if cp == self._last_raw.get(cp_id) and cp_id in self.data:
+                    continue
+                for connector in chargepoint.update_from_api(cp):
                     _LOGGER.warning(
                         "Chargepoint %s has connector without id: %s", cp_id, connector
                     )
-                    continue
 
-                chargepoints[cp_id]["connectors"][connector_id] = {
-                    "chargePointId": connector.get("chargePointId"),
-                    "connectorId": connector_id,
-                    "type": connector.get("type"),
-                    "connectorUserId": connector.get("connectorUserId"),
-                    "settings": connector.get("settings", {}),
-                }
+        self._raw_chargepoints = raw_chargepoints
+        self._last_raw = last_raw
+        for (cp_id, connector_id, key), value in self._local_settings.items():
+            if (settings := self._settings(cp_id, connector_id)) is not None:
+                setattr(settings, settings.API_FIELDS[key], value)
+        normalized = time.perf_counter()
+
+        await self._async_update_statuses(chargepoints)
+        updated = time.perf_counter()
 
         # Update internal cache
+        self._pending_changes = self._diff(chargepoints) | self._sampled
+        self._sampled = set()
         self.data = chargepoints
+        self._last_success = time.time()
+        if self.stale_since is not None:
+            _LOGGER.info("Charge Amps data is current again")
+            self.stale_since = None
+            # Every entity drops its staleness attribute
+            self._pending_changes = None
+        self.update_interval = self._next_interval()
+        self._snapshot_store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
+        self._async_discover()
+        # Normalisering räknas som modellmappning plus diff och discovery
+        self.metrics.record_cycle(
+            fetch=fetched - start,
+            normalize=normalized - fetched + time.perf_counter() - updated,
+            status=updated - normalized,
+            total=time.perf_counter() - start,
+        )
+        return self.data
+
+    def _stale_data(self, err: ChargeAmpsApiError) -> dict[str, ChargePoint] | None:
+        """Return the last good data while the eAPI is unreachable.
+
+        Returns None, so the update fails, for other errors, without data, or
+        once the data is older than STALE_DATA_MAX_AGE.
+        """
+        if (
+            not isinstance(err, (ChargeAmpsTransientError, ChargeAmpsUnavailableError))
+            or not self.data
+            or self._last_success is None
+            or time.time() - self._last_success > STALE_DATA_MAX_AGE
+        ):
+            return None
+        if self.stale_since is None:
+            _LOGGER.warning("Charge Amps eAPI unreachable, serving last known data: %s", err)
+            self.stale_since = self._last_success
+            # Every entity gets its staleness attribute
+            self._pending_changes = None
+        else:
+            self._pending_changes = set()
+        if not self.api.available:
+            # Don't poll again before the circuit breaker lets the next probe through
+            self.update_interval = max(
+                self.fast_interval, timedelta(seconds=self.api.breaker.retry_in)
+            )
         return self.data
+
+    def is_subscribed(self, cp_id: str) -> bool:
+        """Return True if this entry follows the chargepoint."""
+        return not self._subscribed or cp_id in self._subscribed
+
+    # ---------------------------------------------------------------------
+    # Warm start
+    # ---------------------------------------------------------------------
+
+    @callback
+    def _snapshot(self) -> dict[str, Any]:
+        return {
+            "updated_at": self._last_success,
+            "chargepoints": [chargepoint.as_snapshot() for chargepoint in self.data.values()],
+        }
+
+    async def async_restore_snapshot(self) -> bool:
+        """Load the last persisted state; return True if there was one."""
+        snapshot = await self._snapshot_store.async_load()
+        if not snapshot or not snapshot.get("chargepoints"):
+            return False
+        self.data = {
+            raw["id"]: ChargePoint.from_snapshot(raw)
+            for raw in snapshot["chargepoints"]
+            if self.is_subscribed(raw["id"])
+        }
+        if not self.data:
+            return False
+        # Varmstartad data är gammal tills första lyckade uppdateringen
+        self._last_success = snapshot.get("updated_at")
+        self.stale_since = self._last_success
+        self._values = self._flatten(self.data)
+        self._known = self._structure(self.data)
+        _LOGGER.debug("Restored %d chargepoints from snapshot", len(self.data))
+        return True
+
+    # ---------------------------------------------------------------------
+    # Discovery
+    # ---------------------------------------------------------------------
+
+    @staticmethod
+    def _structure(chargepoints: dict[str, ChargePoint]) -> set[StructureKey]:
+        keys: set[StructureKey] = set()
+        for cp_id, chargepoint in chargepoints.items():
+            keys.add((cp_id, None))
+            keys.update((cp_id, connector_id) for connector_id in chargepoint.connectors)
+        return keys
+
+    @callback
+    def async_add_discovery_listener(self, listener: DiscoveryListener) -> CALLBACK_TYPE:
+        """Call listener with chargepoints and connectors added by later refreshes."""
+        self._discovery_listeners.append(listener)
+
+        @callback
+        def _remove() -> None:
+            self._discovery_listeners.remove(listener)
+
+        return _remove
+
+    @callback
+    def _async_discover(self) -> None:
+        """Add entities for new chargepoints/connectors and retire removed ones."""
+        current = self._structure(self.data)
+        added = current - self._known
+        removed = self._known - current
+        self._known = current
+
+        if removed:
+            self._async_retire(removed)
+        if not added:
+            return
+        chargepoints = [self.data[cp_id] for cp_id, connector_id in added if connector_id is None]
+        connectors = [
+            (self.data[cp_id], self.data[cp_id].connectors[connector_id])
+            for cp_id, connector_id in added
+            if connector_id is not None
+        ]
+        _LOGGER.debug(
+            "Discovered %d chargepoints and %d connectors", len(chargepoints), len(connectors)
+        )
+        for listener in list(self._discovery_listeners):
+            listener(chargepoints, connectors)
+
+    @callback
+    def _async_retire(self, removed: set[StructureKey]) -> None:
+        """Remove entities and devices of chargepoints/connectors that are gone."""
+        for key in [key for key in self.measurements if key in removed or (key[0], None) in removed]:
+            del self.measurements[key]
+        prefixes = tuple(
+            f"{cp_id}_" if connector_id is None else f"{cp_id}_{connector_id}_"
+            for cp_id, connector_id in removed
+        )
+        entity_registry = er.async_get(self.hass)
+        for entity in er.async_entries_for_config_entry(entity_registry, self.entry_id):
+            if entity.unique_id.startswith(prefixes):
+                entity_registry.async_remove(entity.entity_id)
+
+        device_registry = dr.async_get(self.hass)
+        for cp_id, connector_id in removed:
+            if connector_id is not None:
+                continue
+            device = device_registry.async_get_device(identifiers={(DOMAIN, cp_id)})
+            if device is not None:
+                device_registry.async_update_device(
+                    device.id, remove_config_entry_id=self.entry_id
+                )
+            _LOGGER.info("Chargepoint %s is gone, removed its entities", cp_id)
+
+    # ---------------------------------------------------------------------
+    # Change tracking
+    # ---------------------------------------------------------------------
+
+    @staticmethod
+    def _flatten(chargepoints: dict[str, ChargePoint]) -> dict[ChangeKey, Any]:
+        """Flatten the model into one value per (chargepoint, connector, field)."""
+        return {
+            (cp_id, connector_id, key): value
+            for cp_id, chargepoint in chargepoints.items()
+            for connector_id, key, value in chargepoint.values()
+        }
+
+    def _diff(self, chargepoints: dict[str, ChargePoint]) -> set[ChangeKey]:
+        """Return the keys whose value differs from the previous snapshot."""
+        old = self._values
+        new = self._flatten(chargepoints)
+        self._values = new
+        changes = {key for key, value in new.items() if old.get(key, _MISSING) != value}
+        changes.update(old.keys() - new.keys())
+        return changes
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Notify only the entities whose values changed in this update.
+
+        Entities subscribe with their ChangeKey as coordinator context. Failed
+        updates, availability changes and listeners without a context still
+        notify everyone.
+        """
+        changes, self._pending_changes = self._pending_changes, None
+        if changes is None or self._notified_success != self.last_update_success:
+            self._notified_success = self.last_update_success
+            self.metrics.record_notified(len(self._listeners))
+            super().async_update_listeners()
+            return
+        notified = 0
+        for update_callback, context in list(self._listeners.values()):
+            if context is None or context in changes:
+                update_callback()
+                notified += 1
+        self.metrics.record_notified(notified)
+
+    def _settings(
+        self, cp_id: str, connector_id: int | None
+    ) -> ChargePointSettings | ConnectorSettings | None:
+        """Return the chargepoint's settings, or a connector's, if still present."""
+        chargepoint = self.data.get(cp_id)
+        if chargepoint is None:
+            return None
+        if connector_id is None:
+            return chargepoint.settings
+        connector = chargepoint.connectors.get(connector_id)
+        return connector.settings if connector is not None else None
+
+    @callback
+    def _async_store_settings(self, updates: list[tuple[ChangeKey, Any]]) -> None:
+        """Put settings in the model and notify just their entities.
+
+        Settings of chargepoints or connectors that are gone are skipped.
+        """
+        stored: set[ChangeKey] = set()
+        for (cp_id, connector_id, key), value in updates:
+            if (settings := self._settings(cp_id, connector_id)) is None:
+                continue
+            stored.add((cp_id, connector_id, key))
+            setattr(settings, settings.API_FIELDS[key], value)
+            # Force a re-normalization so the next payload can overwrite this value
+            self._last_raw.pop(cp_id, None)
+            self._values[(cp_id, connector_id, key)] = value
+        self._raw_chargepoints = None
+        self._pending_changes = stored
+        self.async_set_updated_data(self.data)
+
+    async def async_write_setting(
+        self, cp_id: str, connector_id: int | None, key: str, value: Any
+    ) -> None:
+        """Write a chargepoint (connector_id None) or connector setting.
+
+        The value is shown right away. The old value is put back and
+        HomeAssistantError raised if the write fails; otherwise the
+        chargepoint is re-read shortly to confirm it.
+        """
+        change: ChangeKey = (cp_id, connector_id, key)
+        settings = self._settings(cp_id, connector_id)
+        target = cp_id if connector_id is None else f"connector {cp_id}/{connector_id}"
+        if settings is None:
+            raise HomeAssistantError(f"Could not set {key} on {target}: not found")
+        previous = getattr(settings, settings.API_FIELDS[key])
+        local = self._local.get(cp_id) if connector_id is not None else None
+        if local is not None and not local.handles(connector_id, key, value):
+            local = None
+        if local is None:
+            # Before storing, whose notification reschedules the next poll
+            self.async_note_write()
+        self._async_store_settings([(change, value)])
+        try:
+            if local is not None:
+                # Direkt till laddaren via OCPP; den bekräftar själv
+                await local.async_set_connector_setting(connector_id, key, value)
+            elif connector_id is None:
+                # Hela objektet skickas; skrivningar inom debounce-fönstret blir en PUT.
+                # Fields never read are left out rather than sent as null
+                await self.api.set_chargepoint_settings(
+                    cp_id,
+                    {
+                        "id": cp_id,
+                        **{
+                            field: current
+                            for field, current in settings.as_api().items()
+                            if current is not None
+                        },
+                    },
+                )
+            else:
+                await self.api.set_connector_settings(cp_id, connector_id, {key: value})
+        except ChargeAmpsApiError as err:
+            if self._settings(cp_id, connector_id) is settings:
+                self._async_store_settings([(change, previous)])
+            raise HomeAssistantError(f"Could not set {key} on {target}: {err}") from err
+        if local is not None:
+            self._local_settings[change] = value
+            return
+        self._unconfirmed[change] = value
+        self._async_schedule_verify(cp_id)
+
+    @callback
+    def _async_schedule_verify(self, cp_id: str) -> None:
+        """(Re)start the delayed re-read of one chargepoint."""
+        if cancel := self._verify_timers.pop(cp_id, None):
+            cancel()
+
+        @callback
+        def _verify(_now: Any) -> None:
+            self._verify_timers.pop(cp_id, None)
+            self.hass.async_create_background_task(
+                self._async_verify_chargepoint(cp_id), f"chargeamps_verify_{cp_id}"
+            )
+
+        self._verify_timers[cp_id] = async_call_later(self.hass, WRITE_VERIFY_DELAY, _verify)
+
+    @callback
+    def async_cancel_verify(self) -> None:
+        """Cancel pending re-reads, on unload."""
+        for cancel in self._verify_timers.values():
+            cancel()
+        self._verify_timers.clear()
+
+    async def _async_verify_chargepoint(self, cp_id: str) -> None:
+        """Re-read one chargepoint and let the eAPI's values win.
+
+        Written values the eAPI does not report back are thereby rolled back.
+        Only the resources that were written to are read.
+        """
+        changes = [change for change in self._unconfirmed if change[0] == cp_id]
+        try:
+            raw = (
+                await self.api.get_chargepoint(cp_id)
+                if any(connector_id is not None for _, connector_id, _ in changes)
+                else None
+            )
+            raw_settings = (
+                await self.api.get_chargepoint_settings(cp_id)
+                if any(connector_id is None for _, connector_id, _ in changes)
+                else None
+            )
+        except ChargeAmpsApiError as err:
+            # Nästa hela uppdatering bekräftar i stället
+            _LOGGER.debug("Could not re-read chargepoint %s after write: %s", cp_id, err)
+            # A write made meanwhile has its own re-read coming, which checks these too
+            if cp_id not in self._verify_timers:
+                for change in changes:
+                    self._unconfirmed.pop(change, None)
+            return
+        chargepoint = self.data.get(cp_id)
+        if chargepoint is None:
+            return
+        if raw:
+            chargepoint.update_from_api(raw)
+        if raw_settings:
+            chargepoint.settings = ChargePointSettings.from_api(raw_settings)
+
+        for change in changes:
+            written = self._unconfirmed.pop(change, None)
+            settings = self._settings(cp_id, change[1])
+            actual = getattr(settings, settings.API_FIELDS[change[2]]) if settings else None
+            if actual != written:
+                _LOGGER.warning(
+                    "Chargepoint %s (connector %s) reports %s=%s after writing %s, rolled back",
+                    cp_id, change[1], change[2], actual, written,
+                )
+
+        self._pending_changes = self._diff(self.data)
+        self.async_update_listeners()
+        self._async_discover()
+
+    # ---------------------------------------------------------------------
+    # Live status and chargepoint settings
+    # ---------------------------------------------------------------------
+
+    async def _async_fetch(
+        self, fetch: Callable[[str], Awaitable[dict[str, Any]]], cp_id: str, what: str
+    ) -> dict[str, Any] | None:
+        """Fetch one resource of one chargepoint, isolating its failures."""
+        async with self._request_limit:
+            try:
+                return await fetch(cp_id)
+            except ChargeAmpsUnavailableError:
+                return None
+            except ChargeAmpsApiError as err:
+                _LOGGER.warning("Could not fetch %s for chargepoint %s: %s", what, cp_id, err)
+                return None
+
+    async def _async_update_statuses(self, chargepoints: dict[str, ChargePoint]) -> None:
+        """Fetch status for all chargepoints concurrently and merge it in.
+
+        Chargepoint settings are fetched alongside, but only for chargepoints
+        whose settings are older than CHARGEPOINT_SETTINGS_INTERVAL.
+        Chargepoints connected over local OCPP push their status instead. A
+        chargepoint whose call failed keeps its last known values.
+        """
+        now = time.monotonic()
+        # Status of locally connected chargepoints is pushed over OCPP
+        cp_ids = [cp_id for cp_id in chargepoints if cp_id not in self._local]
+        settings_due = [
+            cp_id
+            for cp_id in chargepoints
+            if now - self._settings_fetched.get(cp_id, -CHARGEPOINT_SETTINGS_INTERVAL)
+            >= CHARGEPOINT_SETTINGS_INTERVAL
+        ]
+        results = await asyncio.gather(
+            *(
+                self._async_fetch(self.api.get_chargepoint_status, cp_id, "status")
+                for cp_id in cp_ids
+            ),
+            *(
+                self._async_fetch(self.api.get_chargepoint_settings, cp_id, "settings")
+                for cp_id in settings_due
+            ),
+        )
+        for cp_id, raw_status in zip(cp_ids, results):
+            if raw_status is None:
+                continue
+            chargepoint = chargepoints[cp_id]
+            chargepoint.status = raw_status.get("status")
+            for raw in raw_status.get("connectorStatuses", []):
+                connector = chargepoint.connectors.get(raw.get("connectorId"))
+                if connector is not None:
+                    connector.status = ConnectorStatus.from_api(raw)
+                    self._record_sample(cp_id, connector)
+        for cp_id, raw_settings in zip(settings_due, results[len(cp_ids):]):
+            if raw_settings is None:
+                continue
+            chargepoints[cp_id].settings = ChargePointSettings.from_api(raw_settings)
+            self._settings_fetched[cp_id] = now
+
+    # ---------------------------------------------------------------------
+    # Local OCPP
+    # ---------------------------------------------------------------------
+
+    def is_local(self, cp_id: str) -> bool:
+        """Return True if the chargepoint is connected to the local central system."""
+        return cp_id in self._local
+
+    @callback
+    def async_local_connected(self, cp_id: str, connection: OcppConnection) -> None:
+        self._local[cp_id] = connection
+        self.update_interval = self._next_interval()
+
+    @callback
+    def async_local_disconnected(self, cp_id: str) -> None:
+        """Fall back to the eAPI for a chargepoint that left the central system."""
+        self._local.pop(cp_id, None)
+        for change in [change for change in self._local_settings if change[0] == cp_id]:
+            del self._local_settings[change]
+        self._last_raw.pop(cp_id, None)
+        self._raw_chargepoints = None
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def async_apply_local_status(
+        self, cp_id: str, connector_id: int, values: dict[str, Any]
+    ) -> None:
+        """Merge status pushed over OCPP and notify just the entities that changed."""
+        chargepoint = self.data.get(cp_id)
+        connector = chargepoint.connectors.get(connector_id) if chargepoint else None
+        if connector is None:
+            return
+        # values is shared by every entry following the chargepoint; read only
+        if (phase_currents := values.get("phaseCurrents")) is not None:
+            connector.status.phase_currents = tuple(phase_currents)
+        changes: set[ChangeKey] = set()
+        for key, value in values.items():
+            if key == "phaseCurrents":
+                continue
+            setattr(connector.status, ConnectorStatus.API_FIELDS[key], value)
+            change = (cp_id, connector_id, key)
+            if self._values.get(change, _MISSING) != value:
+                self._values[change] = value
+                changes.add(change)
+        self._record_sample(cp_id, connector)
+        changes |= self._sampled
+        self._sampled = set()
+        self._pending_changes = changes
+        self.async_update_listeners()
+
+    def _record_sample(self, cp_id: str, connector: Connector) -> None:
+        """Add a connector's current status to its measurement buffer."""
+        key = (cp_id, connector.connector_id)
+        if (buffer := self.measurements.get(key)) is None:
+            buffer = self.measurements[key] = MeasurementBuffer(MEASUREMENT_BUFFER_SIZE)
+        buffer.append(time.time(), connector.status)
+        self._sampled.add((cp_id, connector.connector_id, MEASUREMENTS_KEY))
+
+    # ---------------------------------------------------------------------
+    # Adaptive polling
+    # ---------------------------------------------------------------------
+
+    def _is_active(self) -> bool:
+        """Return True if any connector is charging or was just written to."""
+        if time.monotonic() - self._last_write < WRITE_ACTIVITY_WINDOW:
+            return True
+        return any(
+            connector.status.status == STATUS_CHARGING
+            for chargepoint in self.data.values()
+            for connector in chargepoint.connectors.values()
+        )
+
+    def _next_interval(self) -> timedelta:
+        """Pick the poll interval from how recently anything was active."""
+        if self.data and self._local.keys() >= self.data.keys():
+            # Allt kommer lokalt; eAPI behövs bara för listan och inställningar
+            return self.slow_interval
+        now = time.monotonic()
+        if self._is_active():
+            self._last_active = now
+            return self.fast_interval
+        if now - self._last_active >= IDLE_BACKOFF_AFTER:
+            return self.slow_interval
+        return self.normal_interval
+
+    @callback
+    def async_note_write(self) -> None:
+        """Switch to fast polling after a write so the result is confirmed soon."""
+        self._last_write = self._last_active = time.monotonic()
+        self.update_interval = self.fast_interval
@@ -0,0 +1,39 @@
+"""Diagnostics for Charge Amps: request and refresh-cycle instrumentation."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EMAIL, CONF_PASSWORD, DOMAIN
+from .coordinator import ChargeAmpsDataUpdateCoordinator
+
+# The entry's title and unique_id are the account email
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, "connectorUserId", "title", "unique_id"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    API metrics belong to the client, which entries on the same account
+    share, so they cover all of those entries.
+    """
+    coordinator: ChargeAmpsDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "update_interval": coordinator.update_interval.total_seconds(),
+        "last_update_success": coordinator.last_update_success,
+        "stale_since": coordinator.stale_since,
+        "circuit_breaker": coordinator.api.breaker.as_dict(),
+        "ocpp_connected": [cp_id for cp_id in coordinator.data if coordinator.is_local(cp_id)],
+        "coordinator": coordinator.metrics.as_dict(),
+        "api": coordinator.api.metrics.as_dict(),
+        "chargepoints": async_redact_data(
+            [chargepoint.as_snapshot() for chargepoint in coordinator.data.values()],
+            TO_REDACT,
+        ),
+    }
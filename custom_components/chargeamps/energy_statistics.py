@@ -0,0 +1,140 @@
+"""Hourly per-connector energy statistics imported from charging sessions.
+
+Session energy is spread evenly over the hours a session covered. Only
+hours that are complete, and not covered by a still-open session, are
+imported, and only hours after the last imported one. A connector without
+any sessions gets a zero row once its chargepoint has been synced, so it
+has a last imported hour too. Each
+connector's hours go to the recorder in a single
+async_add_external_statistics call.
+"""
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import (
+    StatisticData,
+    StatisticMeanType,
+    StatisticMetaData,
+)
+from homeassistant.components.recorder.statistics import (
+    async_add_external_statistics,
+    get_last_statistics,
+)
+from homeassistant.const import UnitOfEnergy
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util, slugify
+from homeassistant.util.unit_conversion import EnergyConverter
+
+from .const import DOMAIN
+from .models import ChargePoint
+from .sessions import ChargingSession, ChargingSessionSync
+
+_LOGGER = logging.getLogger(__name__)
+
+HOUR = 3600
+
+
+def statistic_id(chargepoint_id: str, connector_id: int) -> str:
+    return f"{DOMAIN}:energy_{slugify(f'{chargepoint_id}_{connector_id}')}"
+
+
+def _hourly_energy(
+    sessions: list[ChargingSession], after: float, cutoff: float
+) -> dict[tuple[str, int], dict[float, float]]:
+    """Spread session energy over hour buckets in [after, cutoff)."""
+    buckets: dict[tuple[str, int], dict[float, float]] = defaultdict(
+        lambda: defaultdict(float)
+    )
+    for session in sessions:
+        if session.end is None or session.energy_kwh <= 0:
+            continue
+        duration = max(session.end - session.start, 1.0)
+        rate = session.energy_kwh / duration
+        hour = session.start - session.start % HOUR
+        while hour < session.end:
+            if after <= hour < cutoff:
+                overlap = min(session.end, hour + HOUR) - max(session.start, hour)
+                buckets[(session.chargepoint_id, session.connector_id)][hour] += rate * overlap
+            hour += HOUR
+    return buckets
+
+
+async def async_import_energy_statistics(
+    hass: HomeAssistant,
+    chargepoints: dict[str, ChargePoint],
+    sessions: ChargingSessionSync,
+) -> None:
+    """Import the hours missing since the last import for every connector."""
+    ids = {
+        (cp_id, connector_id): statistic_id(cp_id, connector_id)
+        for cp_id, chargepoint in chargepoints.items()
+        for connector_id in chargepoint.connectors
+    }
+    if not ids:
+        return
+
+    recorder = get_instance(hass)
+    last: dict[str, tuple[float, float]] = {}
+    for stat_id in ids.values():
+        result = await recorder.async_add_executor_job(
+            get_last_statistics, hass, 1, stat_id, True, {"sum"}
+        )
+        if rows := result.get(stat_id):
+            last[stat_id] = (rows[0]["start"], rows[0]["sum"] or 0.0)
+
+    # Nothing is complete while a session is still open, or past the last full hour
+    now = dt_util.utcnow().timestamp()
+    cutoff = now - now % HOUR
+    for session in sessions.open_sessions:
+        cutoff = min(cutoff, session.start - session.start % HOUR)
+
+    # Each connector's missing hours start after its last imported one; a
+    # single read from the earliest of them covers every connector
+    starts = {
+        key: last[stat_id][0] + HOUR if stat_id in last else 0.0
+        for key, stat_id in ids.items()
+    }
+    after = min(starts.values())
+    history = await sessions.async_read_sessions(since=after or None)
+    buckets = _hourly_energy(history, after, cutoff)
+
+    for key, stat_id in ids.items():
+        _, total = last.get(stat_id, (None, 0.0))
+        energies = buckets.get(key, {})
+        hours = sorted(hour for hour in energies if hour >= starts[key])
+        if not hours and stat_id not in last:
+            # Ingen session ännu: en nollrad, så nästa import inte läser
+            # om hela historiken för den här kontakten. Only once the
+            # chargepoint's sessions are synced up to that hour, or sessions
+            # synced later would fall before it and never be imported
+            if (synced := sessions.synced_until(key[0])) is None:
+                continue
+            hours = [min(cutoff, synced - synced % HOUR) - HOUR]
+        if not hours:
+            continue
+        statistics: list[StatisticData] = []
+        for hour in hours:
+            energy = energies.get(hour, 0.0)
+            total += energy
+            statistics.append(
+                StatisticData(
+                    start=dt_util.utc_from_timestamp(hour),
+                    state=round(energy, 3),
+                    sum=round(total, 3),
+                )
+            )
+        cp_id, connector_id = key
+        metadata = StatisticMetaData(
+            mean_type=StatisticMeanType.NONE,
+            has_sum=True,
+            name=f"{chargepoints[cp_id].name} Connector {connector_id} Energy",
+            source=DOMAIN,
+            statistic_id=stat_id,
+            unit_class=EnergyConverter.UNIT_CLASS,
+            unit_of_measurement=UnitOfEnergy.KILO_WATT_HOUR,
+        )
+        async_add_external_statistics(hass, metadata, statistics)
+        _LOGGER.debug("Imported %d hours of energy statistics for %s", len(hours), stat_id)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.util import dt as dt_util
+
+from .const import ATTR_STALE_SINCE
+from .coordinator import ChargeAmpsDataUpdateCoordinator
+from .models import ChargePoint, Connector
+
+
+@callback
+def async_setup_discovery(
+    coordinator: ChargeAmpsDataUpdateCoordinator,
+    entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+    factory: Callable[
+        [list[ChargePoint], list[tuple[ChargePoint, Connector]]], list[Entity]
+    ],
+) -> None:
+    """Add a platform's entities now and for chargepoints/connectors found later.
+
+    factory gets new chargepoints and new (chargepoint, connector) pairs and
+    returns the entities to add for them.
+    """
+
+    @callback
+    def _async_add(
+        chargepoints: list[ChargePoint],
+        connectors: list[tuple[ChargePoint, Connector]],
+    ) -> None:
+        if entities := factory(chargepoints, connectors):
+            async_add_entities(entities)
+
+    _async_add(
+        list(coordinator.data.values()),
+        [
+            (chargepoint, connector)
+            for chargepoint in coordinator.data.values()
+            for connector in chargepoint.connectors.values()
+        ],
+    )
+    entry.async_on_unload(coordinator.async_add_discovery_listener(_async_add))
+
+
+class ChargeAmpsEntity(CoordinatorEntity[ChargeAmpsDataUpdateCoordinator]):
+    """Base entity bound to one chargepoint, and optionally one of its connectors.
+
+    The entity holds direct references to its model objects and subscribes
+    to the coordinator with its (chargepoint, connector, field) change key.
+    """
+
+    def __init__(
+        self,
+        coordinator: ChargeAmpsDataUpdateCoordinator,
+        chargepoint: ChargePoint,
+        connector: Connector | None,
+        field: str,
+    ) -> None:
+        """Initialize the entity."""
+        self.chargepoint_id = chargepoint.id
+        self.connector_id = connector.connector_id if connector else None
+        super().__init__(coordinator, context=(chargepoint.id, self.connector_id, field))
+        self.chargepoint = chargepoint
+        self.connector = connector
+
+    @property
+    def available(self) -> bool:
+        """Return True while the chargepoint/connector is still part of the account."""
+        return (
+            super().available
+            and self.coordinator.data.get(self.chargepoint_id) is self.chargepoint
+            and (
+                self.connector is None
+                or self.chargepoint.connectors.get(self.connector_id) is self.connector
+            )
+        )
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info for HA device registry."""
+        return self.chargepoint.device_info
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Flag values kept from before an eAPI outage."""
+        if (stale_since := self.coordinator.stale_since) is None:
+            return None
+        return {ATTR_STALE_SINCE: dt_util.utc_from_timestamp(stale_since).isoformat()}
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import logging
+from homeassistant.components.light import ColorMode, LightEntity
+
+from .coordinator import ChargeAmpsDataUpdateCoordinator
+from .const import DOMAIN
+from .entity import ChargeAmpsEntity, async_setup_discovery
+from .models import ChargePoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up the downlight of all chargepoints."""
+    coordinator: ChargeAmpsDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    def _entities(chargepoints, connectors):
+        return [ChargePointDownLight(coordinator, chargepoint) for chargepoint in chargepoints]
+
+    async_setup_discovery(coordinator, entry, async_add_entities, _entities)
+
+
+class ChargePointDownLight(ChargeAmpsEntity, LightEntity):
+    """The downlight of a chargepoint."""
+
+    _attr_color_mode = ColorMode.ONOFF
+    _attr_supported_color_modes = {ColorMode.ONOFF}
+
+    def __init__(
+        self,
+        coordinator: ChargeAmpsDataUpdateCoordinator,
+        chargepoint: ChargePoint
+    ) -> None:
+        """Initialize the light."""
+        super().__init__(coordinator, chargepoint, None, "downLight")
+        self._attr_name = f"{chargepoint.name} Downlight"
+
+    @property
+    def unique_id(self) -> str:
+        """Return unique ID."""
+        return f"{self.chargepoint_id}_down_light"
+
+    @property
+    def is_on(self) -> bool | None:
+        """Return True if the downlight is on."""
+        return self.chargepoint.settings.down_light
+
+    async def async_turn_on(self, **kwargs) -> None:
+        """Turn the downlight on."""
+        await self._set_down_light(True)
+
+    async def async_turn_off(self, **kwargs) -> None:
+        """Turn the downlight off."""
+        await self._set_down_light(False)
+
+    async def _set_down_light(self, on: bool) -> None:
+        _LOGGER.debug("Setting chargepoint %s downLight to %s", self.chargepoint_id, on)
+        await self.coordinator.async_write_setting(
+            self.chargepoint_id, None, "downLight", on
+        )
@@ -0,0 +1,163 @@
+"""Recent connector measurements in fixed-size ring buffers.
+
+Each connector keeps its last MEASUREMENT_BUFFER_SIZE samples (time, power,
+current per phase, meter reading) in preallocated arrays, so memory stays
+the same however long Home Assistant runs. Rolling averages, peak current
+and energy integrated from power are computed from the buffer instead of
+from the recorder's history, once per sample, and shared by the sensors
+of the connector.
+"""
+from __future__ import annotations
+
+import math
+from array import array
+from collections.abc import Callable
+
+from .models import ConnectorStatus
+
+# Change key field notified whenever a connector gets a new sample
+MEASUREMENTS_KEY = "measurements"
+
+PHASES = 3
+
+# Columns of a sample
+_TIME, _POWER, _ENERGY = 0, 1, 2
+_CURRENT = 3  # first of PHASES columns
+_COLUMNS = _CURRENT + PHASES
+
+
+class MeasurementBuffer:
+    """Ring buffer of one connector's samples, oldest overwritten first."""
+
+    __slots__ = (
+        "capacity", "_columns", "_next", "_count", "_derived", "session_id", "session_kwh"
+    )
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self._columns = [array("d", bytes(8 * capacity)) for _ in range(_COLUMNS)]
+        self._next = 0
+        self._count = 0
+        # Values derived from the newest sample, by sensor key
+        self._derived: dict[str, float | None] = {}
+        # Energy integrated from power since the current session started
+        self.session_id: int | None = None
+        self.session_kwh = 0.0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, status: ConnectorStatus) -> None:
+        """Add a sample taken from a connector status at timestamp (seconds)."""
+        if self._count and timestamp <= self._latest(_TIME):
+            return
+        if status.session_id != self.session_id:
+            self.session_id = status.session_id
+            self.session_kwh = 0.0
+        elif self._count and status.power is not None:
+            previous_power = self._latest(_POWER)
+            if not math.isnan(previous_power):
+                # Trapets mellan föregående och detta sampel
+                hours = (timestamp - self._latest(_TIME)) / 3600
+                self.session_kwh += (previous_power + status.power) / 2 * hours / 1000
+
+        currents = status.phase_currents or ((status.current,) if status.current is not None else ())
+        row = [
+            timestamp,
+            _value(status.power),
+            _value(status.total_consumption_kwh),
+            *(_value(currents[phase] if phase < len(currents) else None) for phase in range(PHASES)),
+        ]
+        for column, value in zip(self._columns, row):
+            column[self._next] = value
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+        self._derived.clear()
+
+    def derived(
+        self, key: str, compute: Callable[[MeasurementBuffer, float], float | None]
+    ) -> float | None:
+        """Return compute(buffer, time of the newest sample), once per sample."""
+        try:
+            return self._derived[key]
+        except KeyError:
+            value = self._derived[key] = compute(self, self._latest(_TIME))
+            return value
+
+    def _latest(self, column: int) -> float:
+        return self._columns[column][(self._next - 1) % self.capacity]
+
+    def _window(self, seconds: float, now: float) -> list[int]:
+        """Return buffer indexes of samples within the window, oldest first.
+
+        Timestamps only increase, so this walks back from the newest sample
+        and stops at the first one older than the window.
+        """
+        since = now - seconds
+        times = self._columns[_TIME]
+        indexes: list[int] = []
+        index = self._next
+        for _ in range(self._count):
+            index = (index - 1) % self.capacity
+            if times[index] < since:
+                break
+            indexes.append(index)
+        indexes.reverse()
+        return indexes
+
+    def average_power(self, seconds: float, now: float) -> float | None:
+        """Time-weighted average power (W) over the last seconds."""
+        return self._average_power(self._window(seconds, now))
+
+    def _average_power(self, indexes: list[int]) -> float | None:
+        times, power = self._columns[_TIME], self._columns[_POWER]
+        area = span = 0.0
+        previous: int | None = None
+        for index in indexes:
+            if previous is not None and not (math.isnan(power[previous]) or math.isnan(power[index])):
+                dt = times[index] - times[previous]
+                area += (power[previous] + power[index]) / 2 * dt
+                span += dt
+            previous = index
+        if span:
+            return area / span
+        # Ett enda sampel i fönstret
+        if previous is not None and not math.isnan(power[previous]):
+            return power[previous]
+        return None
+
+    def peak_current(self, seconds: float, now: float) -> float | None:
+        """Highest current (A) on any phase over the last seconds."""
+        peak = max(
+            (
+                self._columns[_CURRENT + phase][index]
+                for index in self._window(seconds, now)
+                for phase in range(PHASES)
+            ),
+            key=lambda value: -math.inf if math.isnan(value) else value,
+            default=math.nan,
+        )
+        return None if math.isnan(peak) else peak
+
+    def energy(self, seconds: float, now: float) -> float | None:
+        """Energy (kWh) over the last seconds.
+
+        Taken from the meter readings when both ends have one, otherwise
+        integrated from power.
+        """
+        indexes = self._window(seconds, now)
+        if len(indexes) < 2:
+            return None
+        meter = self._columns[_ENERGY]
+        first, last = meter[indexes[0]], meter[indexes[-1]]
+        if not (math.isnan(first) or math.isnan(last)) and last >= first:
+            return last - first
+        average = self._average_power(indexes)
+        if average is None:
+            return None
+        times = self._columns[_TIME]
+        return average * (times[indexes[-1]] - times[indexes[0]]) / 3600 / 1000
+
+
+def _value(value: float | None) -> float:
+    return math.nan if value is None else float(value)
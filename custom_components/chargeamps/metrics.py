@@ -0,0 +1,157 @@
+"""Lightweight request and refresh-cycle instrumentation.
+
+Counters and fixed-bucket histograms kept in memory, cheap enough to leave
+on in production. Surfaced through diagnostics and the optional diagnostic
+sensors.
+"""
+from __future__ import annotations
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any
+
+# Upper bounds of the latency buckets, in milliseconds
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+def endpoint_label(method: str, path: str) -> str:
+    """Return "METHOD /path" with chargepoint and connector ids templated out."""
+    parts = path.split("/")
+    if len(parts) > 2 and parts[1] == "chargepoints" and parts[2] != "owned":
+        parts[2] = "{chargepoint_id}"
+    if len(parts) > 4 and parts[3] == "connectors":
+        parts[4] = "{connector_id}"
+    return f"{method} {'/'.join(parts)}"
+
+
+@dataclass(slots=True)
+class Histogram:
+    """Fixed-bucket latency histogram; the last bucket is open-ended."""
+
+    buckets: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS_MS) + 1))
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.buckets[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    @property
+    def mean_ms(self) -> float | None:
+        return self.total_ms / self.count if self.count else None
+
+    def percentile_ms(self, pct: float) -> float | None:
+        """Return the upper bound of the bucket holding the pct percentile."""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += hits
+            if seen >= rank:
+                return min(float(bound), self.max_ms)
+        return self.max_ms
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "mean_ms": None if self.mean_ms is None else round(self.mean_ms, 1),
+            "p50_ms": self.percentile_ms(50),
+            "p95_ms": self.percentile_ms(95),
+            "max_ms": round(self.max_ms, 1),
+            "buckets": {
+                **{f"<={bound}": hits for bound, hits in zip(LATENCY_BUCKETS_MS, self.buckets)},
+                f">{LATENCY_BUCKETS_MS[-1]}": self.buckets[-1],
+            },
+        }
+
+
+@dataclass(slots=True)
+class ApiMetrics:
+    """Counters and per-endpoint latency of one ChargeAmpsApi client."""
+
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    rate_limited: int = 0
+    # Requests refused without sending while the circuit breaker was open
+    short_circuited: int = 0
+    # 401 responses that made the client renew its token
+    unauthorized: int = 0
+    token_refreshes: int = 0
+    logins: int = 0
+    # GETs answered by an identical in-flight request or the read cache
+    coalesced: int = 0
+    latency: dict[str, Histogram] = field(default_factory=dict)
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        histogram = self.latency.get(endpoint)
+        if histogram is None:
+            histogram = self.latency[endpoint] = Histogram()
+        histogram.observe(seconds)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "rate_limited": self.rate_limited,
+            "short_circuited": self.short_circuited,
+            "unauthorized": self.unauthorized,
+            "token_refreshes": self.token_refreshes,
+            "logins": self.logins,
+            "coalesced": self.coalesced,
+            "latency": {
+                endpoint: histogram.as_dict()
+                for endpoint, histogram in sorted(self.latency.items())
+            },
+        }
+
+
+@dataclass(slots=True)
+class CoordinatorMetrics:
+    """Timing of refresh cycles and how many entities each one notified."""
+
+    cycles: int = 0
+    failed_cycles: int = 0
+    last_cycle_ms: float | None = None
+    last_fetch_ms: float | None = None
+    last_normalize_ms: float | None = None
+    last_status_ms: float | None = None
+    last_entities_notified: int = 0
+    entities_notified: int = 0
+    cycle: Histogram = field(default_factory=Histogram)
+    normalize: Histogram = field(default_factory=Histogram)
+
+    def record_cycle(
+        self, fetch: float, normalize: float, status: float, total: float
+    ) -> None:
+        self.cycles += 1
+        self.last_fetch_ms = round(fetch * 1000, 2)
+        self.last_normalize_ms = round(normalize * 1000, 2)
+        self.last_status_ms = round(status * 1000, 2)
+        self.last_cycle_ms = round(total * 1000, 2)
+        self.cycle.observe(total)
+        self.normalize.observe(normalize)
+
+    def record_notified(self, count: int) -> None:
+        self.last_entities_notified = count
+        self.entities_notified += count
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "cycles": self.cycles,
+            "failed_cycles": self.failed_cycles,
+            "last_cycle_ms": self.last_cycle_ms,
+            "last_fetch_ms": self.last_fetch_ms,
+            "last_normalize_ms": self.last_normalize_ms,
+            "last_status_ms": self.last_status_ms,
+            "last_entities_notified": self.last_entities_notified,
+            "entities_notified": self.entities_notified,
+            "cycle": self.cycle.as_dict(),
+            "normalize": self.normalize.as_dict(),
+        }
@@ -0,0 +1,251 @@
+"""Data model for Charge Amps chargepoints and connectors.
+
+Objects are updated in place on every refresh, so entities can keep a
+direct reference to the chargepoint or connector they represent. Each
+class maps eAPI (camelCase) keys to attributes in API_FIELDS; those keys
+are also used in entity unique ids and coordinator change keys.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from typing import Any, ClassVar
+
+from homeassistant.helpers.device_registry import DeviceInfo
+
+from .const import DOMAIN
+
+
+def _as_api(section: Any) -> dict[str, Any]:
+    """Return a settings/status object as an eAPI-keyed dict."""
+    return {key: getattr(section, attr) for key, attr in section.API_FIELDS.items()}
+
+
+@dataclass(slots=True)
+class ConnectorSettings:
+    """Writable settings of a connector."""
+
+    API_FIELDS: ClassVar[dict[str, str]] = {
+        "mode": "mode",
+        "rfidLock": "rfid_lock",
+        "cableLock": "cable_lock",
+        "maxCurrent": "max_current",
+    }
+
+    mode: str | None = None
+    rfid_lock: bool | None = None
+    cable_lock: bool | None = None
+    max_current: int | None = None
+
+    @classmethod
+    def from_api(cls, raw: dict[str, Any]) -> ConnectorSettings:
+        return cls(*(raw.get(key) for key in cls.API_FIELDS))
+
+
+@dataclass(slots=True)
+class ConnectorStatus:
+    """Live status and measurements of a connector."""
+
+    API_FIELDS: ClassVar[dict[str, str]] = {
+        "status": "status",
+        "current": "current",
+        "power": "power",
+        "totalConsumptionKwh": "total_consumption_kwh",
+        "sessionId": "session_id",
+    }
+
+    status: str | None = None
+    current: float | None = None
+    power: float | None = None
+    total_consumption_kwh: float | None = None
+    session_id: int | None = None
+    # Current per phase, for the measurement buffer; not an entity value
+    phase_currents: tuple[float, ...] = ()
+
+    @classmethod
+    def from_api(cls, raw: dict[str, Any]) -> ConnectorStatus:
+        """Map a connector status payload to flat sensor values."""
+        measurements = raw.get("measurements") or []
+        currents = [m.get("current") or 0.0 for m in measurements]
+        return cls(
+            phase_currents=tuple(currents),
+            status=raw.get("status"),
+            current=max(currents, default=0.0),
+            power=round(
+                sum((m.get("current") or 0.0) * (m.get("voltage") or 0.0) for m in measurements),
+                1,
+            ),
+            total_consumption_kwh=raw.get("totalConsumptionKwh"),
+            session_id=raw.get("sessionId"),
+        )
+
+
+@dataclass(slots=True)
+class Connector:
+    """A connector on a chargepoint."""
+
+    chargepoint_id: str
+    connector_id: int
+    type: str | None = None
+    connector_user_id: str | None = None
+    settings: ConnectorSettings = field(default_factory=ConnectorSettings)
+    status: ConnectorStatus = field(default_factory=ConnectorStatus)
+
+    def update_from_api(self, raw: dict[str, Any]) -> None:
+        self.type = raw.get("type")
+        self.connector_user_id = raw.get("connectorUserId")
+        self.settings = ConnectorSettings.from_api(raw.get("settings") or {})
+
+    def as_api(self) -> dict[str, Any]:
+        return {
+            "connectorId": self.connector_id,
+            "type": self.type,
+            "connectorUserId": self.connector_user_id,
+            "settings": _as_api(self.settings),
+        }
+
+    def values(self) -> Iterator[tuple[str, Any]]:
+        """Yield (eAPI key, value) for every entity-visible field."""
+        for section in (self.settings, self.status):
+            for key, attr in section.API_FIELDS.items():
+                yield key, getattr(section, attr)
+
+
+@dataclass(slots=True)
+class ChargePointSettings:
+    """Chargepoint-level settings (lights)."""
+
+    API_FIELDS: ClassVar[dict[str, str]] = {
+        "dimmer": "dimmer",
+        "downLight": "down_light",
+    }
+
+    dimmer: str | None = None
+    down_light: bool | None = None
+
+    @classmethod
+    def from_api(cls, raw: dict[str, Any]) -> ChargePointSettings:
+        return cls(*(raw.get(key) for key in cls.API_FIELDS))
+
+    def as_api(self) -> dict[str, Any]:
+        return _as_api(self)
+
+
+@dataclass(slots=True)
+class ChargePoint:
+    """A chargepoint and its connectors."""
+
+    API_FIELDS: ClassVar[dict[str, str]] = {
+        "name": "name",
+        "type": "type",
+        "firmwareVersion": "firmware_version",
+        "hardwareVersion": "hardware_version",
+        "isLoadbalanced": "is_loadbalanced",
+        "ownerReadOnly": "owner_read_only",
+        "ocppVersion": "ocpp_version",
+        "status": "status",
+    }
+
+    id: str
+    name: str | None = None
+    type: str | None = None
+    firmware_version: str | None = None
+    hardware_version: str | None = None
+    is_loadbalanced: bool = False
+    owner_read_only: bool = True
+    ocpp_version: str | None = None
+    status: str | None = None
+    settings: ChargePointSettings = field(default_factory=ChargePointSettings)
+    connectors: dict[int, Connector] = field(default_factory=dict)
+    _device_info: DeviceInfo | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        """Return device info, built once until name or firmware change."""
+        if self._device_info is None:
+            self._device_info = DeviceInfo(
+                identifiers={(DOMAIN, self.id)},
+                name=self.name,
+                manufacturer="Charge Amps",
+                sw_version=self.firmware_version,
+                model=self.type,
+            )
+        return self._device_info
+
+    def update_from_api(self, raw: dict[str, Any]) -> list[dict[str, Any]]:
+        """Update from an owned-chargepoints entry.
+
+        Returns the connector payloads that were skipped for lacking an id.
+        """
+        name = raw.get("name")
+        firmware_version = raw.get("firmwareVersion")
+        model = raw.get("type")
+        if (name, firmware_version, model) != (self.name, self.firmware_version, self.type):
+            self._device_info = None
+        self.name = name
+        self.type = model
+        self.firmware_version = firmware_version
+        self.hardware_version = raw.get("hardwareVersion")
+        self.is_loadbalanced = raw.get("isLoadbalanced", False)
+        self.owner_read_only = raw.get("ownerReadOnly", True)
+        self.ocpp_version = raw.get("ocppVersion")
+        # Owned-chargepoint entries come without settings; those are read separately
+        if raw_settings := raw.get("settings"):
+            self.settings = ChargePointSettings.from_api(raw_settings)
+
+        skipped = []
+        connectors: dict[int, Connector] = {}
+        for raw_connector in raw.get("connectors", []):
+            connector_id = raw_connector.get("connectorId")
+            if connector_id is None:
+                skipped.append(raw_connector)
+                continue
+            connector = self.connectors.get(connector_id)
+            if connector is None:
+                connector = Connector(self.id, connector_id)
+            connector.update_from_api(raw_connector)
+            connectors[connector_id] = connector
+        self.connectors = connectors
+        return skipped
+
+    def as_snapshot(self) -> dict[str, Any]:
+        """Return the chargepoint as an owned-chargepoints entry plus status."""
+        return {
+            "id": self.id,
+            **{
+                key: getattr(self, attr)
+                for key, attr in self.API_FIELDS.items()
+            },
+            "settings": _as_api(self.settings),
+            "connectors": [connector.as_api() for connector in self.connectors.values()],
+            "connectorStatuses": {
+                str(connector_id): _as_api(connector.status)
+                for connector_id, connector in self.connectors.items()
+            },
+        }
+
+    @classmethod
+    def from_snapshot(cls, raw: dict[str, Any]) -> ChargePoint:
+        """Rebuild a chargepoint saved with as_snapshot."""
+        chargepoint = cls(raw["id"])
+        chargepoint.update_from_api(raw)
+        chargepoint.status = raw.get("status")
+        for connector_id, status in raw.get("connectorStatuses", {}).items():
+            connector = chargepoint.connectors.get(int(connector_id))
+            if connector is not None:
+                connector.status = ConnectorStatus(
+                    *(status.get(key) for key in ConnectorStatus.API_FIELDS)
+                )
+        return chargepoint
+
+    def values(self) -> Iterator[tuple[int | None, str, Any]]:
+        """Yield (connector id or None, eAPI key, value) for every field."""
+        for key, attr in self.API_FIELDS.items():
+            yield None, key, getattr(self, attr)
+        for key, attr in self.settings.API_FIELDS.items():
+            yield None, key, getattr(self.settings, attr)
+        for connector_id, connector in self.connectors.items():
+            for key, value in connector.values():
+                yield connector_id, key, value
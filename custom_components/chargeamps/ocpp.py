@@ -0,0 +1,393 @@
+"""Local OCPP 1.6J central system.
+
+Charge Amps chargers can be pointed at a custom OCPP backend. With a port
+set in the integration options, Home Assistant listens for chargers on
+ws://<host>:<port>/<chargepoint id> and takes their status, meter values
+and transactions as they are pushed. Mode and maxCurrent writes go to a
+connected charger as RemoteStartTransaction, RemoteStopTransaction and
+SetChargingProfile.
+
+Pushed values feed the coordinator's model like eAPI values do. The eAPI
+still provides the chargepoint list and settings, and takes over status
+and writes for any chargepoint that is not connected locally.
+
+Only chargepoint ids known to a loaded entry are accepted. There is no
+authentication, so the port belongs on a trusted network. Every idTag is
+accepted too: in local mode the central system does not check RFID tags,
+so anyone at the charger can start a session.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import WSMsgType, web
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .api import ChargeAmpsApiError
+from .const import (
+    DOMAIN,
+    OCPP_CALL_TIMEOUT,
+    OCPP_CHARGING_PROFILE_ID,
+    OCPP_HEARTBEAT_INTERVAL,
+    OCPP_ID_TAG,
+    OCPP_SUBPROTOCOL,
+    STATUS_CHARGING,
+)
+from .transport import json_dumps, json_loads
+
+if TYPE_CHECKING:
+    from .coordinator import ChargeAmpsDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+# Key in hass.data[DOMAIN]: port -> OcppServer
+DATA_OCPP = "ocpp"
+
+# OCPP-J message types
+CALL = 2
+CALLRESULT = 3
+CALLERROR = 4
+
+MODE_OFF = "Off"
+
+# OCPP ChargePointStatus -> eAPI connector status
+CONNECTOR_STATUSES = {
+    "Available": "Available",
+    "Preparing": "Connected",
+    "Charging": "Charging",
+    "SuspendedEV": "Connected",
+    "SuspendedEVSE": "Connected",
+    "Finishing": "Connected",
+    "Reserved": "Available",
+    "Unavailable": "Disabled",
+    "Faulted": "Error",
+}
+
+MEASURAND_ENERGY = "Energy.Active.Import.Register"
+MEASURAND_POWER = "Power.Active.Import"
+MEASURAND_CURRENT = "Current.Import"
+
+
+class OcppError(ChargeAmpsApiError):
+    """A local OCPP call failed or was rejected by the charger."""
+
+
+class OcppCallError(Exception):
+    """Raised by a handler to answer a CALL with a CALLERROR."""
+
+    def __init__(self, code: str, description: str) -> None:
+        super().__init__(description)
+        self.code = code
+
+
+def parse_meter_values(meter_values: list[dict[str, Any]]) -> dict[str, Any]:
+    """Map the latest OCPP sampled values to eAPI connector status keys.
+
+    phaseCurrents is not an eAPI key; the coordinator keeps it for the
+    measurement buffer.
+    """
+    values: dict[str, Any] = {}
+    currents: list[float] = []
+    for sample in meter_values[-1:]:
+        for sampled in sample.get("sampledValue", []):
+            measurand = sampled.get("measurand", MEASURAND_ENERGY)
+            unit = sampled.get("unit")
+            try:
+                value = float(sampled["value"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if measurand == MEASURAND_ENERGY and not sampled.get("phase"):
+                values["totalConsumptionKwh"] = value if unit == "kWh" else value / 1000
+            elif measurand == MEASURAND_POWER and not sampled.get("phase"):
+                values["power"] = value * 1000 if unit == "kW" else value
+            elif measurand == MEASURAND_CURRENT:
+                currents.append(value)
+    if currents:
+        values["current"] = max(currents)
+        values["phaseCurrents"] = currents
+    return values
+
+
+@dataclass(slots=True)
+class OcppConnection:
+    """One connected charger."""
+
+    chargepoint_id: str
+    ws: web.WebSocketResponse
+    server: OcppServer
+    # connectorId -> active transactionId
+    transactions: dict[int, int] = field(default_factory=dict)
+    _pending: dict[str, asyncio.Future[Any]] = field(default_factory=dict)
+
+    # -----------------------------------------------------------------
+    # Central system -> charger
+    # -----------------------------------------------------------------
+
+    async def async_call(self, action: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Send a CALL and return the charger's result payload."""
+        unique_id = uuid.uuid4().hex
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        self._pending[unique_id] = future
+        try:
+            await self.ws.send_str(json_dumps([CALL, unique_id, action, payload]))
+            async with asyncio.timeout(OCPP_CALL_TIMEOUT):
+                return await future
+        except TimeoutError as err:
+            raise OcppError(f"{action} to {self.chargepoint_id} timed out") from err
+        except ConnectionError as err:
+            raise OcppError(f"{action} to {self.chargepoint_id} failed: {err}") from err
+        finally:
+            self._pending.pop(unique_id, None)
+
+    async def _async_call_accepted(self, action: str, payload: dict[str, Any]) -> None:
+        result = await self.async_call(action, payload)
+        if result.get("status") != "Accepted":
+            raise OcppError(f"{action} rejected by {self.chargepoint_id}: {result.get('status')}")
+
+    def handles(self, connector_id: int, key: str, value: Any) -> bool:
+        """Return True if a connector setting can be written over OCPP.
+
+        Off needs the transaction to stop. Without one on record, e.g. after
+        a restart during a session, the eAPI is left to turn the connector off.
+        """
+        if key == "maxCurrent" or (key == "mode" and value == STATUS_CHARGING):
+            return True
+        return key == "mode" and value == MODE_OFF and connector_id in self.transactions
+
+    async def async_set_connector_setting(self, connector_id: int, key: str, value: Any) -> None:
+        """Write a connector's mode or maxCurrent to the charger."""
+        if key == "maxCurrent":
+            await self._async_call_accepted(
+                "SetChargingProfile",
+                {
+                    "connectorId": connector_id,
+                    "csChargingProfiles": {
+                        "chargingProfileId": OCPP_CHARGING_PROFILE_ID,
+                        "stackLevel": 0,
+                        "chargingProfilePurpose": "TxDefaultProfile",
+                        "chargingProfileKind": "Relative",
+                        "chargingSchedule": {
+                            "chargingRateUnit": "A",
+                            "chargingSchedulePeriod": [
+                                {"startPeriod": 0, "limit": float(value)}
+                            ],
+                        },
+                    },
+                },
+            )
+        elif value == STATUS_CHARGING:
+            if connector_id not in self.transactions:
+                await self._async_call_accepted(
+                    "RemoteStartTransaction", {"connectorId": connector_id, "idTag": OCPP_ID_TAG}
+                )
+        elif (transaction_id := self.transactions.get(connector_id)) is not None:
+            await self._async_call_accepted(
+                "RemoteStopTransaction", {"transactionId": transaction_id}
+            )
+        else:
+            raise OcppError(
+                f"No transaction known on {self.chargepoint_id} connector {connector_id} to stop"
+            )
+
+    # -----------------------------------------------------------------
+    # Charger -> central system
+    # -----------------------------------------------------------------
+
+    async def async_run(self) -> None:
+        """Handle messages until the charger disconnects."""
+        async for msg in self.ws:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            try:
+                message = json_loads(msg.data)
+                message_type, unique_id = message[0], message[1]
+            except (ValueError, TypeError, IndexError, KeyError):
+                _LOGGER.debug("Ignoring malformed OCPP message from %s", self.chargepoint_id)
+                continue
+            if message_type == CALL:
+                await self._async_handle_call(unique_id, message[2], message[3])
+            elif (future := self._pending.get(unique_id)) is not None and not future.done():
+                if message_type == CALLRESULT:
+                    future.set_result(message[2])
+                else:
+                    future.set_exception(
+                        OcppError(f"{self.chargepoint_id} answered {message[2]}: {message[3]}")
+                    )
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(OcppError(f"{self.chargepoint_id} disconnected"))
+
+    async def _async_handle_call(self, unique_id: str, action: str, payload: dict[str, Any]) -> None:
+        handler = getattr(self, f"_on_{action}", None)
+        try:
+            if handler is None:
+                raise OcppCallError("NotImplemented", f"{action} is not supported")
+            response = [CALLRESULT, unique_id, handler(payload)]
+        except OcppCallError as err:
+            response = [CALLERROR, unique_id, err.code, str(err), {}]
+        except Exception:  # noqa: BLE001 - the charger gets an error, not a dropped socket
+            _LOGGER.exception("Error handling %s from %s", action, self.chargepoint_id)
+            response = [CALLERROR, unique_id, "InternalError", action, {}]
+        await self.ws.send_str(json_dumps(response))
+
+    def _apply(self, connector_id: int, values: dict[str, Any]) -> None:
+        if connector_id and values:
+            self.server.async_apply_status(self.chargepoint_id, connector_id, values)
+
+    def _on_BootNotification(self, payload: dict[str, Any]) -> dict[str, Any]:
+        _LOGGER.info(
+            "Chargepoint %s booted (%s %s)",
+            self.chargepoint_id, payload.get("chargePointVendor"), payload.get("chargePointModel"),
+        )
+        return {
+            "status": "Accepted",
+            "currentTime": dt_util.utcnow().isoformat(),
+            "interval": OCPP_HEARTBEAT_INTERVAL,
+        }
+
+    def _on_Heartbeat(self, payload: dict[str, Any]) -> dict[str, Any]:
+        return {"currentTime": dt_util.utcnow().isoformat()}
+
+    def _on_Authorize(self, payload: dict[str, Any]) -> dict[str, Any]:
+        # No tag list: every idTag is accepted, RFID cards are not checked locally
+        return {"idTagInfo": {"status": "Accepted"}}
+
+    def _on_StatusNotification(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self._apply(
+            payload.get("connectorId", 0),
+            {"status": CONNECTOR_STATUSES.get(payload.get("status"), "Unknown")},
+        )
+        return {}
+
+    def _on_MeterValues(self, payload: dict[str, Any]) -> dict[str, Any]:
+        self._apply(payload.get("connectorId", 0), parse_meter_values(payload.get("meterValue", [])))
+        return {}
+
+    def _on_StartTransaction(self, payload: dict[str, Any]) -> dict[str, Any]:
+        connector_id = payload["connectorId"]
+        transaction_id = self.server.next_transaction_id()
+        self.transactions[connector_id] = transaction_id
+        values: dict[str, Any] = {"sessionId": transaction_id}
+        if (meter_start := payload.get("meterStart")) is not None:
+            values["totalConsumptionKwh"] = meter_start / 1000
+        self._apply(connector_id, values)
+        return {"transactionId": transaction_id, "idTagInfo": {"status": "Accepted"}}
+
+    def _on_StopTransaction(self, payload: dict[str, Any]) -> dict[str, Any]:
+        transaction_id = payload.get("transactionId")
+        for connector_id, active in list(self.transactions.items()):
+            if active == transaction_id:
+                del self.transactions[connector_id]
+                values: dict[str, Any] = {"sessionId": None, "power": 0.0, "current": 0.0}
+                if (meter_stop := payload.get("meterStop")) is not None:
+                    values["totalConsumptionKwh"] = meter_stop / 1000
+                self._apply(connector_id, values)
+        return {"idTagInfo": {"status": "Accepted"}}
+
+
+class OcppServer:
+    """Websocket endpoint shared by the entries configured with the same port."""
+
+    def __init__(self, hass: HomeAssistant, port: int) -> None:
+        self._hass = hass
+        self.port = port
+        self.coordinators: set[ChargeAmpsDataUpdateCoordinator] = set()
+        self.connections: dict[str, OcppConnection] = {}
+        self._runner: web.AppRunner | None = None
+        self._transaction_id = int(dt_util.utcnow().timestamp())
+
+    def next_transaction_id(self) -> int:
+        self._transaction_id += 1
+        return self._transaction_id
+
+    async def async_start(self) -> None:
+        app = web.Application()
+        app.router.add_get("/{chargepoint_id}", self._async_handle)
+        # Some chargers append their id to a configured base path
+        app.router.add_get("/{prefix:.*}/{chargepoint_id}", self._async_handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, None, self.port).start()
+        except OSError:
+            await self._runner.cleanup()
+            self._runner = None
+            raise
+        _LOGGER.info("Local OCPP central system listening on port %d", self.port)
+
+    async def async_stop(self) -> None:
+        for connection in list(self.connections.values()):
+            await connection.ws.close()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def _coordinators_for(self, cp_id: str) -> list[ChargeAmpsDataUpdateCoordinator]:
+        return [coordinator for coordinator in self.coordinators if cp_id in coordinator.data]
+
+    @callback
+    def async_apply_status(self, cp_id: str, connector_id: int, values: dict[str, Any]) -> None:
+        for coordinator in self._coordinators_for(cp_id):
+            coordinator.async_apply_local_status(cp_id, connector_id, values)
+
+    async def _async_handle(self, request: web.Request) -> web.StreamResponse:
+        cp_id = request.match_info["chargepoint_id"]
+        coordinators = self._coordinators_for(cp_id)
+        if not coordinators:
+            _LOGGER.warning("Rejected OCPP connection from unknown chargepoint %s", cp_id)
+            raise web.HTTPNotFound
+        ws = web.WebSocketResponse(protocols=(OCPP_SUBPROTOCOL,), heartbeat=OCPP_HEARTBEAT_INTERVAL)
+        await ws.prepare(request)
+        if (previous := self.connections.get(cp_id)) is not None:
+            await previous.ws.close()
+        connection = self.connections[cp_id] = OcppConnection(cp_id, ws, self)
+        for coordinator in coordinators:
+            coordinator.async_local_connected(cp_id, connection)
+        _LOGGER.info("Chargepoint %s connected over OCPP", cp_id)
+        try:
+            await connection.async_run()
+        finally:
+            if self.connections.get(cp_id) is connection:
+                del self.connections[cp_id]
+                for coordinator in self._coordinators_for(cp_id):
+                    coordinator.async_local_disconnected(cp_id)
+                _LOGGER.info("Chargepoint %s disconnected, eAPI takes over", cp_id)
+        return ws
+
+
+async def async_acquire_ocpp_server(
+    hass: HomeAssistant, port: int, coordinator: ChargeAmpsDataUpdateCoordinator
+) -> None:
+    """Register a coordinator with the server on port, starting it if needed.
+
+    Raises OSError if the server can't listen on port; nothing is registered then.
+    """
+    servers: dict[int, OcppServer] = hass.data.setdefault(DOMAIN, {}).setdefault(DATA_OCPP, {})
+    if (server := servers.get(port)) is None:
+        server = OcppServer(hass, port)
+        await server.async_start()
+        # Only a listening server is kept, so a failed start can be retried
+        servers[port] = server
+    server.coordinators.add(coordinator)
+    # Chargers that connected before this entry was loaded
+    for cp_id, connection in server.connections.items():
+        if cp_id in coordinator.data:
+            coordinator.async_local_connected(cp_id, connection)
+
+
+async def async_release_ocpp_server(
+    hass: HomeAssistant, port: int, coordinator: ChargeAmpsDataUpdateCoordinator
+) -> None:
+    """Unregister a coordinator; the server stops with its last one."""
+    servers: dict[int, OcppServer] = hass.data.get(DOMAIN, {}).get(DATA_OCPP, {})
+    if (server := servers.get(port)) is None:
+        return
+    server.coordinators.discard(coordinator)
+    if not server.coordinators:
+        del servers[port]
+        await server.async_stop()
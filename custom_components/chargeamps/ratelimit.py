@@ -0,0 +1,170 @@
+"""Client-side rate limiting and retry policies for the Charge Amps eAPI."""
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+
+class TokenBucket:
+    """Token bucket shared by every request of one API client.
+
+    Requests wait for a token in arrival order. A server-side throttle
+    (Retry-After) blocks the whole bucket, so every caller backs off at once.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self._rate = rate
+        self._capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated) * self._rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+    def block_for(self, seconds: float) -> None:
+        """Hold back all requests for the given number of seconds."""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+
+
+class CircuitBreaker:
+    """Stop calling an unreachable eAPI and probe it on an exponential schedule.
+
+    After failure_threshold consecutive failed calls (each counted once,
+    after its own retries) the circuit opens and allow() refuses requests.
+    Once the probe delay has passed, one request is let through as a probe:
+    success closes the circuit, failure doubles the delay up to probe_max.
+    """
+
+    def __init__(self, failure_threshold: int, probe_base: float, probe_max: float) -> None:
+        self._failure_threshold = failure_threshold
+        self._probe_base = probe_base
+        self._probe_max = probe_max
+        self._failures = 0
+        self._probe_delay = 0.0
+        self._next_probe: float | None = None
+        self._probing = False
+        self.opened_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        return self._next_probe is not None
+
+    @property
+    def retry_in(self) -> float:
+        """Seconds until the next probe may be sent; 0 while closed."""
+        if self._next_probe is None:
+            return 0.0
+        return max(0.0, self._next_probe - time.monotonic())
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        if self._next_probe is None:
+            return True
+        now = time.monotonic()
+        if now < self._next_probe:
+            return False
+        # One probe per delay; a probe that never reports back doesn't block the next
+        self._next_probe = now + self._probe_delay
+        self._probing = True
+        return True
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_delay = 0.0
+        self._next_probe = None
+        self._probing = False
+        self.opened_at = None
+
+    def record_failure(self) -> bool:
+        """Count a failure; return True if it opened the circuit."""
+        now = time.monotonic()
+        if self._next_probe is not None:
+            # Late failures of requests sent before the circuit opened don't count
+            if self._probing:
+                self._probing = False
+                self._probe_delay = min(self._probe_max, self._probe_delay * 2)
+                self._next_probe = now + self._probe_delay
+            return False
+        self._failures += 1
+        if self._failures < self._failure_threshold:
+            return False
+        self._probe_delay = self._probe_base
+        self._next_probe = now + self._probe_delay
+        self.opened_at = time.time()
+        return True
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "open": self.is_open,
+            "consecutive_failures": self._failures,
+            "probe_delay": self._probe_delay,
+            "retry_in": round(self.retry_in, 1),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class RequestPolicy:
+    """How often and how long to retry a failed request."""
+
+    max_attempts: int
+    backoff_base: float = 1.0
+    backoff_max: float = 30.0
+    # Don't wait longer than this for a Retry-After; fail instead
+    max_retry_after: float = 60.0
+
+    def backoff(self, attempt: int) -> float:
+        """Return a full-jitter exponential delay for the given retry attempt."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def retry_delay(self, attempt: int, retry_after: float | None) -> float | None:
+        """Return how long to wait before retrying, or None to give up."""
+        if attempt >= self.max_attempts:
+            return None
+        if retry_after is None:
+            return self.backoff(attempt)
+        if retry_after > self.max_retry_after:
+            return None
+        return retry_after
+
+
+# Idempotent reads are retried; writes are never repeated automatically
+READ_POLICY = RequestPolicy(max_attempts=4)
+WRITE_POLICY = RequestPolicy(max_attempts=1)
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,437 @@
+"""Price-aware charging schedules per connector.
+
+A schedule target is a price entity, a departure time and an energy amount.
+The planner picks the cheapest price slots before departure that deliver
+the energy at the maximum current, the last one at a reduced current. The
+engine follows the plan and only writes mode/maxCurrent when the planned
+state changes, never re-sending a state it already asked for.
+
+Plans are recomputed only when their inputs change: the price series, the
+target, or a step boundary (so energy actually delivered is accounted for).
+"""
+from __future__ import annotations
+
+import logging
+import math
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import (
+    async_track_point_in_utc_time,
+    async_track_state_change_event,
+)
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN, STATUS_CHARGING
+
+if TYPE_CHECKING:
+    from .coordinator import ChargeAmpsDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+MODE_OFF = "Off"
+
+# Attribute names price integrations commonly use for their series
+PRICE_ATTRIBUTES = (
+    "raw_today",
+    "raw_tomorrow",
+    "prices_today",
+    "prices_tomorrow",
+    "prices",
+    "forecast",
+)
+_START_KEYS = ("start", "startsAt", "start_time", "time", "from")
+_END_KEYS = ("end", "endsAt", "end_time", "till", "to")
+_PRICE_KEYS = ("value", "price", "total", "price_per_kwh")
+
+HOUR = 3600
+
+# (chargepoint_id, connector_id)
+ConnectorKey = tuple[str, int]
+
+
+@dataclass(slots=True, frozen=True)
+class PriceSlot:
+    start: float
+    end: float
+    price: float
+
+
+@dataclass(slots=True, frozen=True)
+class PlanStep:
+    """Charge at current amps between start and end (epoch seconds)."""
+
+    start: float
+    end: float
+    current: int
+
+
+@dataclass(slots=True)
+class ChargePlan:
+    steps: list[PlanStep]
+    energy_kwh: float
+    cost: float
+    shortfall_kwh: float
+
+    def step_at(self, now: float) -> PlanStep | None:
+        for step in self.steps:
+            if step.start <= now < step.end:
+                return step
+        return None
+
+    def next_boundary(self, now: float) -> float | None:
+        return min(
+            (t for step in self.steps for t in (step.start, step.end) if t > now),
+            default=None,
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "steps": [
+                {
+                    "start": dt_util.utc_from_timestamp(step.start).isoformat(),
+                    "end": dt_util.utc_from_timestamp(step.end).isoformat(),
+                    "current": step.current,
+                }
+                for step in self.steps
+            ],
+            "energy_kwh": round(self.energy_kwh, 3),
+            "cost": round(self.cost, 4),
+            "shortfall_kwh": round(self.shortfall_kwh, 3),
+        }
+
+
+@dataclass(slots=True)
+class ScheduleTarget:
+    """What a connector should have charged, by when, against which prices."""
+
+    price_entity: str
+    price_attribute: str | None
+    departure: float
+    energy_kwh: float
+    # Meter reading when the target was set, or at the first reading after
+    # that if the meter was unknown; progress is measured from it
+    start_kwh: float | None
+    phases: int
+    voltage: float
+    min_current: int
+    max_current: int
+
+    @property
+    def kw_per_amp(self) -> float:
+        return self.phases * self.voltage / 1000
+
+
+def _timestamp(value: Any) -> float | None:
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str):
+        parsed = dt_util.parse_datetime(value)
+    else:
+        return None
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=dt_util.get_default_time_zone())
+    return parsed.timestamp()
+
+
+def _first(item: dict[str, Any], keys: tuple[str, ...]) -> Any:
+    return next((item[key] for key in keys if item.get(key) is not None), None)
+
+
+def parse_price_series(state: State, attribute: str | None = None) -> list[PriceSlot]:
+    """Read price slots from a list-of-dicts attribute of a price sensor."""
+    starts: dict[float, tuple[float | None, float]] = {}
+    for name in (attribute,) if attribute else PRICE_ATTRIBUTES:
+        series = state.attributes.get(name)
+        if not isinstance(series, list):
+            continue
+        for item in series:
+            if not isinstance(item, dict):
+                continue
+            start = _timestamp(_first(item, _START_KEYS))
+            price = _first(item, _PRICE_KEYS)
+            if start is None or price is None:
+                continue
+            try:
+                starts[start] = (_timestamp(_first(item, _END_KEYS)), float(price))
+            except (TypeError, ValueError):
+                continue
+
+    slots = []
+    ordered = sorted(starts)
+    for index, start in enumerate(ordered):
+        end, price = starts[start]
+        if end is None:
+            end = ordered[index + 1] if index + 1 < len(ordered) else start + HOUR
+        if end > start:
+            slots.append(PriceSlot(start, end, price))
+    return slots
+
+
+def plan_charging(
+    slots: list[PriceSlot], now: float, target: ScheduleTarget, remaining_kwh: float
+) -> ChargePlan:
+    """Pick the cheapest slots between now and departure for remaining_kwh."""
+    usable = [
+        PriceSlot(max(slot.start, now), min(slot.end, target.departure), slot.price)
+        for slot in slots
+        if min(slot.end, target.departure) > max(slot.start, now)
+    ]
+    usable.sort(key=lambda slot: (slot.price, slot.start))
+
+    remaining = max(remaining_kwh, 0.0)
+    chosen: list[tuple[PriceSlot, int]] = []
+    energy = cost = 0.0
+    for slot in usable:
+        if remaining <= 0:
+            break
+        kwh_per_amp = (slot.end - slot.start) / HOUR * target.kw_per_amp
+        current = min(target.max_current, math.ceil(remaining / kwh_per_amp))
+        current = max(current, target.min_current)
+        delivered = kwh_per_amp * current
+        chosen.append((slot, current))
+        remaining -= delivered
+        energy += delivered
+        cost += delivered * slot.price
+
+    # Adjacent slots at the same current become one step
+    steps: list[PlanStep] = []
+    for slot, current in sorted(chosen, key=lambda item: item[0].start):
+        if steps and steps[-1].end == slot.start and steps[-1].current == current:
+            steps[-1] = PlanStep(steps[-1].start, slot.end, current)
+        else:
+            steps.append(PlanStep(slot.start, slot.end, current))
+    return ChargePlan(steps, energy, cost, max(remaining, 0.0))
+
+
+def _store_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.schedules"
+
+
+async def async_remove_schedules(hass: HomeAssistant, entry_id: str) -> None:
+    """Remove an entry's stored schedule targets."""
+    await Store(hass, STORAGE_VERSION, _store_key(entry_id)).async_remove()
+
+
+class ChargeScheduler:
+    """Follow charging plans for the connectors of one coordinator."""
+
+    def __init__(
+        self, hass: HomeAssistant, coordinator: ChargeAmpsDataUpdateCoordinator, entry_id: str
+    ) -> None:
+        self._hass = hass
+        self._coordinator = coordinator
+        self._store: Store[dict[str, Any]] = Store(hass, STORAGE_VERSION, _store_key(entry_id))
+        self.targets: dict[ConnectorKey, ScheduleTarget] = {}
+        self.plans: dict[ConnectorKey, ChargePlan] = {}
+        # Plan inputs, so unchanged inputs don't trigger a re-plan
+        self._inputs: dict[ConnectorKey, tuple[Any, ...]] = {}
+        # Parsed price series per (entity, attribute), with the state they came from
+        self._prices: dict[tuple[str, str | None], tuple[State, list[PriceSlot]]] = {}
+        # Last (mode, current) each connector was asked for
+        self._commanded: dict[ConnectorKey, tuple[str, int | None]] = {}
+        self._unsub_prices: CALLBACK_TYPE | None = None
+        self._unsub_timer: CALLBACK_TYPE | None = None
+        self._unsub_coordinator: CALLBACK_TYPE | None = None
+
+    # ---------------------------------------------------------------------
+    # Lifecycle and targets
+    # ---------------------------------------------------------------------
+
+    async def async_load(self) -> None:
+        stored = await self._store.async_load() or {}
+        for raw in stored.get("targets", []):
+            key = (raw.pop("chargepoint_id"), raw.pop("connector_id"))
+            self.targets[key] = ScheduleTarget(**raw)
+        self._async_targets_changed()
+
+    @callback
+    def async_stop(self) -> None:
+        for unsub in (self._unsub_prices, self._unsub_timer, self._unsub_coordinator):
+            if unsub is not None:
+                unsub()
+        self._unsub_prices = self._unsub_timer = self._unsub_coordinator = None
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        return {
+            "targets": [
+                {"chargepoint_id": cp_id, "connector_id": connector_id, **asdict(target)}
+                for (cp_id, connector_id), target in self.targets.items()
+            ]
+        }
+
+    @callback
+    def async_set_target(self, key: ConnectorKey, target: ScheduleTarget) -> ChargePlan | None:
+        """Set or replace a connector's target and return its plan, if prices allow one."""
+        self.targets[key] = target
+        self.plans.pop(key, None)
+        self._inputs.pop(key, None)
+        self._commanded.pop(key, None)
+        self._async_targets_changed()
+        return self.plans.get(key)
+
+    @callback
+    def async_clear_target(self, key: ConnectorKey) -> None:
+        """Stop following a plan; the connector is left as it is."""
+        self.targets.pop(key, None)
+        self.plans.pop(key, None)
+        self._inputs.pop(key, None)
+        self._commanded.pop(key, None)
+        self._async_targets_changed()
+
+    @callback
+    def _async_targets_changed(self) -> None:
+        self._store.async_delay_save(self._data_to_store, 1)
+        self.async_stop()
+        if not self.targets:
+            return
+        self._unsub_prices = async_track_state_change_event(
+            self._hass,
+            list({target.price_entity for target in self.targets.values()}),
+            self._async_price_changed,
+        )
+        # Progress and connector state come with each coordinator update
+        self._unsub_coordinator = self._coordinator.async_add_listener(self._async_evaluate)
+        self._async_evaluate()
+
+    @callback
+    def _async_price_changed(self, event: Event) -> None:
+        self._async_evaluate()
+
+    # ---------------------------------------------------------------------
+    # Planning and following
+    # ---------------------------------------------------------------------
+
+    def _meter_kwh(self, key: ConnectorKey) -> float | None:
+        chargepoint = self._coordinator.data.get(key[0])
+        connector = chargepoint.connectors.get(key[1]) if chargepoint else None
+        return connector.status.total_consumption_kwh if connector is not None else None
+
+    @callback
+    def _async_set_baseline(self, key: ConnectorKey, target: ScheduleTarget) -> None:
+        """Take the first known meter reading as a target's starting point."""
+        if target.start_kwh is None and (meter := self._meter_kwh(key)) is not None:
+            target.start_kwh = meter
+            self._store.async_delay_save(self._data_to_store, 1)
+
+    def _remaining_kwh(self, key: ConnectorKey, target: ScheduleTarget) -> float | None:
+        """Energy still to deliver, or None until there is a baseline."""
+        chargepoint = self._coordinator.data.get(key[0])
+        connector = chargepoint.connectors.get(key[1]) if chargepoint else None
+        if connector is None or target.start_kwh is None:
+            return None
+        meter = connector.status.total_consumption_kwh
+        delivered = meter - target.start_kwh if meter is not None else 0.0
+        return target.energy_kwh - max(delivered, 0.0)
+
+    def _price_slots(self, state: State, attribute: str | None) -> list[PriceSlot]:
+        """Parse a price series once per state change of the price entity."""
+        key = (state.entity_id, attribute)
+        cached = self._prices.get(key)
+        if cached is None or cached[0] is not state:
+            cached = self._prices[key] = (state, parse_price_series(state, attribute))
+        return cached[1]
+
+    @callback
+    def _async_plan(self, key: ConnectorKey, target: ScheduleTarget, now: float) -> ChargePlan | None:
+        """Return the connector's plan, re-planning only if an input changed."""
+        state = self._hass.states.get(target.price_entity)
+        remaining = self._remaining_kwh(key, target)
+        if state is None or remaining is None:
+            return self.plans.get(key)
+        slots = self._price_slots(state, target.price_attribute)
+        plan = self.plans.get(key)
+        # The remaining slots change at each slot boundary, which is also when
+        # the energy actually delivered so far is taken into account
+        inputs = (
+            tuple(slot for slot in slots if slot.end > now and slot.start < target.departure),
+            target,
+        )
+        if plan is not None and self._inputs.get(key) == inputs:
+            return plan
+        if not slots:
+            return plan
+        self._inputs[key] = inputs
+        plan = self.plans[key] = plan_charging(slots, now, target, remaining)
+        _LOGGER.debug(
+            "Planned %s/%s: %d steps, %.2f kWh, shortfall %.2f kWh",
+            key[0], key[1], len(plan.steps), plan.energy_kwh, plan.shortfall_kwh,
+        )
+        return plan
+
+    @callback
+    def _async_evaluate(self) -> None:
+        """Bring every connector with a target in line with its plan."""
+        now = dt_util.utcnow().timestamp()
+        next_wakeup: float | None = None
+        for key, target in list(self.targets.items()):
+            if now >= target.departure:
+                _LOGGER.debug("Schedule for %s/%s ended at departure", *key)
+                self.async_clear_target(key)
+                return
+            self._async_set_baseline(key, target)
+            plan = self._async_plan(key, target, now)
+            if plan is None:
+                continue
+            remaining = self._remaining_kwh(key, target)
+            step = plan.step_at(now)
+            if step is None or (remaining is not None and remaining <= 0):
+                desired: tuple[str, int | None] = (MODE_OFF, None)
+            else:
+                desired = (STATUS_CHARGING, step.current)
+            self._async_apply(key, desired)
+            for wakeup in (plan.next_boundary(now), target.departure):
+                if wakeup is not None and (next_wakeup is None or wakeup < next_wakeup):
+                    next_wakeup = wakeup
+
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if next_wakeup is not None:
+            self._unsub_timer = async_track_point_in_utc_time(
+                self._hass, self._async_wakeup, dt_util.utc_from_timestamp(next_wakeup)
+            )
+
+    @callback
+    def _async_wakeup(self, _now: datetime) -> None:
+        self._unsub_timer = None
+        self._async_evaluate()
+
+    @callback
+    def _async_apply(self, key: ConnectorKey, desired: tuple[str, int | None]) -> None:
+        """Write the planned state, but only on a transition of the plan."""
+        if self._commanded.get(key) == desired:
+            return
+        chargepoint = self._coordinator.data.get(key[0])
+        connector = chargepoint.connectors.get(key[1]) if chargepoint else None
+        if connector is None:
+            return
+        self._commanded[key] = desired
+        mode, current = desired
+        writes = []
+        if current is not None and connector.settings.max_current != current:
+            writes.append(("maxCurrent", current))
+        if connector.settings.mode != mode:
+            writes.append(("mode", mode))
+        for field, value in writes:
+            _LOGGER.debug("Schedule sets %s/%s %s=%s", key[0], key[1], field, value)
+            self._hass.async_create_background_task(
+                self._async_write(key, field, value), f"chargeamps_schedule_{key[0]}_{key[1]}"
+            )
+
+    async def _async_write(self, key: ConnectorKey, field: str, value: Any) -> None:
+        try:
+            await self._coordinator.async_write_setting(key[0], key[1], field, value)
+        except HomeAssistantError as err:
+            _LOGGER.warning("Schedule could not set %s on %s/%s: %s", field, key[0], key[1], err)
+            # Försök igen vid nästa utvärdering
+            self._commanded.pop(key, None)
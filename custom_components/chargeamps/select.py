@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+import logging
+from homeassistant.components.select import SelectEntity
+
+from .coordinator import ChargeAmpsDataUpdateCoordinator
+from .const import DIMMER_OPTIONS, DOMAIN
+from .entity import ChargeAmpsEntity, async_setup_discovery
+from .models import ChargePoint
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, entry, async_add_entities):
+    """Set up select entities for all chargepoints."""
+    coordinator: ChargeAmpsDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
+
+    def _entities(chargepoints, connectors):
+        return [ChargePointDimmerSelect(coordinator, chargepoint) for chargepoint in chargepoints]
+
+    async_setup_discovery(coordinator, entry, async_add_entities, _entities)
+
+
+class ChargePointDimmerSelect(ChargeAmpsEntity, SelectEntity):
+    """Select entity for the dimmer level of the chargepoint lights."""
+
+    _attr_options = DIMMER_OPTIONS
+
+    def __init__(
+        self,
+        coordinator: ChargeAmpsDataUpdateCoordinator,
+        chargepoint: ChargePoint
+    ) -> None:
+        """Initialize select entity."""
+        super().__init__(coordinator, chargepoint, None, "dimmer")
+        self._attr_name = f"{chargepoint.name} Dimmer"
+
+    @property
+    def unique_id(self) -> str:
+        """Return unique ID."""
+        return f"{self.chargepoint_id}_dimmer"
+
+    @property
+    def current_option(self) -> str | None:
+        """Return the dimmer level from the coordinator."""
+        return self.chargepoint.settings.dimmer
+
+    async def async_select_option(self, option: str) -> None:
+        """Set the dimmer level via API and update cache."""
+        _LOGGER.debug("Setting chargepoint %s dimmer to %s", self.chargepoint_id, option)
+        await self.coordinator.async_write_setting(
+            self.chargepoint_id, None, "dimmer", option
+        )
@@ -1,64 +1,222 @@
 from __future__ import annotations
 
 import logging
-from homeassistant.components.sensor import SensorEntity
+from collections.abc import Callable
+from typing import Any
+
+from homeassistant.components.sensor import (
+    SensorDeviceClass,
+    SensorEntity,
+    SensorStateClass,
+)
+from homeassistant.const import (
+    EntityCategory,
+    UnitOfElectricCurrent,
+    UnitOfEnergy,
+    UnitOfPower,
+    UnitOfTime,
+)
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceEntryType, DeviceInfo
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 
 from .coordinator import ChargeAmpsDataUpdateCoordinator
 from .const import DOMAIN
+from .entity import ChargeAmpsEntity, async_setup_discovery
+from .measurements import MEASUREMENTS_KEY, MeasurementBuffer
+from .models import ChargePoint, Connector, ConnectorSettings, ConnectorStatus
 
 _LOGGER = logging.getLogger(__name__)
 
 SENSOR_TYPES = [
     "firmwareVersion",
     "hardwareVersion",
-    "dimmer",
-    "downLight",
     "isLoadbalanced",
     "ownerReadOnly",
     "ocppVersion",
+    "status",
 ]
 
+# Live connector values: key -> (unit, device class, state class)
+CONNECTOR_STATUS_SENSOR_TYPES = {
+    "status": (None, None, None),
+    "current": (
+        UnitOfElectricCurrent.AMPERE,
+        SensorDeviceClass.CURRENT,
+        SensorStateClass.MEASUREMENT,
+    ),
+    "power": (UnitOfPower.WATT, SensorDeviceClass.POWER, SensorStateClass.MEASUREMENT),
+    "totalConsumptionKwh": (
+        UnitOfEnergy.KILO_WATT_HOUR,
+        SensorDeviceClass.ENERGY,
+        SensorStateClass.TOTAL_INCREASING,
+    ),
+}
+
+# Computed from a connector's measurement buffer:
+# key -> (name, unit, device class, state class, value, smallest change written)
+DERIVED_SENSOR_TYPES: dict[
+    str,
+    tuple[
+        str,
+        str,
+        SensorDeviceClass,
+        SensorStateClass | None,
+        Callable[[MeasurementBuffer, float], float | None],
+        float,
+    ],
+] = {
+    "power_average_5m": (
+        "average power 5 min",
+        UnitOfPower.WATT,
+        SensorDeviceClass.POWER,
+        SensorStateClass.MEASUREMENT,
+        lambda b, now: b.average_power(300, now),
+        25.0,
+    ),
+    "power_average_15m": (
+        "average power 15 min",
+        UnitOfPower.WATT,
+        SensorDeviceClass.POWER,
+        SensorStateClass.MEASUREMENT,
+        lambda b, now: b.average_power(900, now),
+        25.0,
+    ),
+    "peak_current_15m": (
+        "peak current 15 min",
+        UnitOfElectricCurrent.AMPERE,
+        SensorDeviceClass.CURRENT,
+        SensorStateClass.MEASUREMENT,
+        lambda b, now: b.peak_current(900, now),
+        0.5,
+    ),
+    "energy_15m": (
+        "energy 15 min",
+        UnitOfEnergy.KILO_WATT_HOUR,
+        SensorDeviceClass.ENERGY,
+        None,
+        lambda b, now: b.energy(900, now),
+        0.01,
+    ),
+    "session_energy": (
+        "session energy (integrated)",
+        UnitOfEnergy.KILO_WATT_HOUR,
+        SensorDeviceClass.ENERGY,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda b, now: b.session_kwh,
+        0.01,
+    ),
+}
+
+# Instrumentation, disabled by default: key -> (name, unit, state class, value)
+DIAGNOSTIC_SENSOR_TYPES: dict[
+    str,
+    tuple[str, str | None, SensorStateClass, Callable[[ChargeAmpsDataUpdateCoordinator], Any]],
+] = {
+    "refresh_duration": (
+        "Refresh duration",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda c: c.metrics.last_cycle_ms,
+    ),
+    "normalize_duration": (
+        "Normalization duration",
+        UnitOfTime.MILLISECONDS,
+        SensorStateClass.MEASUREMENT,
+        lambda c: c.metrics.last_normalize_ms,
+    ),
+    "entities_notified": (
+        "Entities notified",
+        None,
+        SensorStateClass.MEASUREMENT,
+        lambda c: c.metrics.last_entities_notified,
+    ),
+    "api_requests": (
+        "API requests",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.api.metrics.requests,
+    ),
+    "api_retries": (
+        "API retries",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.api.metrics.retries,
+    ),
+    "api_rate_limited": (
+        "API rate limited",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.api.metrics.rate_limited,
+    ),
+    "api_token_refreshes": (
+        "API token refreshes",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.api.metrics.token_refreshes,
+    ),
+    "api_logins": (
+        "API logins",
+        None,
+        SensorStateClass.TOTAL_INCREASING,
+        lambda c: c.api.metrics.logins,
+    ),
+}
+
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up sensors for all chargepoints and connectors."""
     coordinator: ChargeAmpsDataUpdateCoordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = []
 
-    for cp_id, cp_data in coordinator.data.items():
+    def _entities(chargepoints, connectors):
+        entities = []
+
         # Chargepoint-level sensors
-        for sensor_type in SENSOR_TYPES:
-            if sensor_type in cp_data:
-                entities.append(
-                    ChargePointSensor(coordinator, cp_id, sensor_type)
-                )
+        for chargepoint in chargepoints:
+            for sensor_type in SENSOR_TYPES:
+                if sensor_type in ChargePoint.API_FIELDS:
+                    entities.append(
+                        ChargePointSensor(coordinator, chargepoint, sensor_type)
+                    )
 
         # Connector-level sensors
-        for connector_id, connector_data in cp_data["connectors"].items():
-            connector_settings = connector_data.get("settings", {})
-            for key in connector_settings:
+        for chargepoint, connector in connectors:
+            for key in ConnectorSettings.API_FIELDS:
+                entities.append(
+                    ConnectorSensor(coordinator, chargepoint, connector, key)
+                )
+            for key in CONNECTOR_STATUS_SENSOR_TYPES:
                 entities.append(
-                    ConnectorSensor(coordinator, cp_id, connector_id, key)
+                    ConnectorStatusSensor(coordinator, chargepoint, connector, key)
+                )
+            for key in DERIVED_SENSOR_TYPES:
+                entities.append(
+                    ConnectorDerivedSensor(coordinator, chargepoint, connector, key)
                 )
 
-    _LOGGER.debug("Adding %d Charge Amps sensors", len(entities))
-    async_add_entities(entities)
+        _LOGGER.debug("Adding %d Charge Amps sensors", len(entities))
+        return entities
 
+    async_setup_discovery(coordinator, entry, async_add_entities, _entities)
+    async_add_entities(
+        DiagnosticSensor(coordinator, entry, key) for key in DIAGNOSTIC_SENSOR_TYPES
+    )
 
-class ChargePointSensor(CoordinatorEntity, SensorEntity):
+
+class ChargePointSensor(ChargeAmpsEntity, SensorEntity):
     """Sensor for a chargepoint attribute."""
 
     def __init__(
         self,
         coordinator: ChargeAmpsDataUpdateCoordinator,
-        chargepoint_id: str,
+        chargepoint: ChargePoint,
         attr_name: str
     ) -> None:
         """Initialize the sensor."""
-        super().__init__(coordinator)
-        self.chargepoint_id = chargepoint_id
+        super().__init__(coordinator, chargepoint, None, attr_name)
         self.attr_name = attr_name
-        self._attr_name = f"{coordinator.data[chargepoint_id]['name']} {attr_name}"
+        self._field = ChargePoint.API_FIELDS[attr_name]
+        self._attr_name = f"{chargepoint.name} {attr_name}"
         _LOGGER.debug("Created ChargePointSensor: %s", self._attr_name)
 
     @property
@@ -71,37 +229,24 @@ class ChargePointSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def native_value(self):
-        cp_data = self.coordinator.data.get(self.chargepoint_id, {})
-        return cp_data.get(self.attr_name)
+        return getattr(self.chargepoint, self._field)
 
-    @property
-    def device_info(self) -> dict[str, str]:
-        cp = self.coordinator.data.get(self.chargepoint_id, {})
-        return {
-            "identifiers": {(DOMAIN, self.chargepoint_id)},
-            "name": cp.get("name"),
-            "manufacturer": "Charge Amps",
-            "sw_version": cp.get("firmwareVersion"),
-            "model": cp.get("type"),
-        }
-
-
-class ConnectorSensor(CoordinatorEntity, SensorEntity):
+
+class ConnectorSensor(ChargeAmpsEntity, SensorEntity):
     """Sensor for a connector setting."""
 
     def __init__(
         self,
         coordinator: ChargeAmpsDataUpdateCoordinator,
-        chargepoint_id: str,
-        connector_id: int,
+        chargepoint: ChargePoint,
+        connector: Connector,
         attr_name: str
     ) -> None:
         """Initialize the connector sensor."""
-        super().__init__(coordinator)
-        self.chargepoint_id = chargepoint_id
-        self.connector_id = connector_id
+        super().__init__(coordinator, chargepoint, connector, attr_name)
         self.attr_name = attr_name
-        self._attr_name = f"{coordinator.data[chargepoint_id]['name']} Connector {connector_id} {attr_name}"
+        self._field = ConnectorSettings.API_FIELDS[attr_name]
+        self._attr_name = f"{chargepoint.name} Connector {self.connector_id} {attr_name}"
         _LOGGER.debug("Created ConnectorSensor: %s", self._attr_name)
 
     @property
@@ -114,17 +259,143 @@ class ConnectorSensor(CoordinatorEntity, SensorEntity):
 
     @property
     def native_value(self):
-        cp_data = self.coordinator.data.get(self.chargepoint_id, {})
-        connector_data = cp_data.get("connectors", {}).get(self.connector_id, {})
-        return connector_data.get("settings", {}).get(self.attr_name)
+        return getattr(self.connector.settings, self._field)
+
+
+class ConnectorStatusSensor(ChargeAmpsEntity, SensorEntity):
+    """Sensor for a live connector status value."""
+
+    def __init__(
+        self,
+        coordinator: ChargeAmpsDataUpdateCoordinator,
+        chargepoint: ChargePoint,
+        connector: Connector,
+        attr_name: str
+    ) -> None:
+        """Initialize the connector status sensor."""
+        super().__init__(coordinator, chargepoint, connector, attr_name)
+        self.attr_name = attr_name
+        self._field = ConnectorStatus.API_FIELDS[attr_name]
+        self._attr_name = f"{chargepoint.name} Connector {self.connector_id} {attr_name}"
+        (
+            self._attr_native_unit_of_measurement,
+            self._attr_device_class,
+            self._attr_state_class,
+        ) = CONNECTOR_STATUS_SENSOR_TYPES[attr_name]
+        _LOGGER.debug("Created ConnectorStatusSensor: %s", self._attr_name)
+
+    @property
+    def unique_id(self) -> str:
+        return f"{self.chargepoint_id}_{self.connector_id}_status_{self.attr_name}"
+
+    @property
+    def name(self) -> str:
+        return self._attr_name
+
+    @property
+    def native_value(self):
+        return getattr(self.connector.status, self._field)
+
+
+class ConnectorDerivedSensor(ChargeAmpsEntity, SensorEntity):
+    """Sensor computed from a connector's recent measurements.
+
+    The value is computed once per new sample, as of that sample, and only
+    written, and so recorded, when it moved by at least the type's smallest
+    change.
+    """
+
+    def __init__(
+        self,
+        coordinator: ChargeAmpsDataUpdateCoordinator,
+        chargepoint: ChargePoint,
+        connector: Connector,
+        attr_name: str
+    ) -> None:
+        """Initialize the derived sensor."""
+        super().__init__(coordinator, chargepoint, connector, MEASUREMENTS_KEY)
+        self.attr_name = attr_name
+        (
+            name,
+            self._attr_native_unit_of_measurement,
+            self._attr_device_class,
+            self._attr_state_class,
+            self._compute,
+            self._min_change,
+        ) = DERIVED_SENSOR_TYPES[attr_name]
+        self._attr_name = f"{chargepoint.name} Connector {self.connector_id} {name}"
+        self._value: float | None = None
+        self._written_available: bool | None = None
+
+    @property
+    def unique_id(self) -> str:
+        return f"{self.chargepoint_id}_{self.connector_id}_derived_{self.attr_name}"
+
+    @property
+    def name(self) -> str:
+        return self._attr_name
+
+    def _current(self) -> float | None:
+        buffer = self.coordinator.measurements.get((self.chargepoint_id, self.connector_id))
+        if buffer is None or not len(buffer):
+            return None
+        value = buffer.derived(self.attr_name, self._compute)
+        return None if value is None else round(value, 3)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self._value = self._current()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        value = self._current()
+        available = self.available
+        if available == self._written_available and (
+            value == self._value
+            or (
+                value is not None
+                and self._value is not None
+                and abs(value - self._value) < self._min_change
+            )
+        ):
+            return
+        self._value = value
+        self._written_available = available
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self):
+        return self._value
+
+
+class DiagnosticSensor(CoordinatorEntity[ChargeAmpsDataUpdateCoordinator], SensorEntity):
+    """Request and refresh-cycle instrumentation of one config entry."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self, coordinator: ChargeAmpsDataUpdateCoordinator, entry, key: str
+    ) -> None:
+        """Initialize the diagnostic sensor."""
+        super().__init__(coordinator)
+        name, unit, state_class, self._value = DIAGNOSTIC_SENSOR_TYPES[key]
+        self._attr_name = f"Charge Amps {name}"
+        self._attr_unique_id = f"{entry.entry_id}_diagnostics_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_state_class = state_class
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry.entry_id)},
+            name=f"Charge Amps {entry.title}",
+            manufacturer="Charge Amps",
+            entry_type=DeviceEntryType.SERVICE,
+        )
+
+    @property
+    def available(self) -> bool:
+        # Mätvärdena är mest intressanta just när uppdateringar misslyckas
+        return True
 
     @property
-    def device_info(self) -> dict[str, str]:
-        cp = self.coordinator.data.get(self.chargepoint_id, {})
-        return {
-            "identifiers": {(DOMAIN, self.chargepoint_id)},
-            "name": cp.get("name"),
-            "manufacturer": "Charge Amps",
-            "sw_version": cp.get("firmwareVersion"),
-            "model": cp.get("type"),
-        }
+    def native_value(self):
+        return self._value(self.coordinator)
@@ -0,0 +1,186 @@
+"""Services for the Charge Amps integration."""
+from __future__ import annotations
+
+import voluptuous as vol
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+from homeassistant.util import dt as dt_util
+
+from .budget import async_apply_current_budget
+from .const import (
+    ATTR_BUDGET,
+    ATTR_CHARGEPOINT_ID,
+    ATTR_CHARGEPOINT_IDS,
+    ATTR_CONFIG_ENTRY_ID,
+    ATTR_CONNECTOR_ID,
+    ATTR_DEPARTURE,
+    ATTR_ENERGY,
+    ATTR_IDLE_CURRENT,
+    ATTR_MAX_CURRENT,
+    ATTR_MIN_CURRENT,
+    ATTR_PHASES,
+    ATTR_PRICE_ATTRIBUTE,
+    ATTR_PRICE_ENTITY,
+    ATTR_VOLTAGE,
+    CONNECTOR_MAX_CURRENT,
+    CONNECTOR_MIN_CURRENT,
+    DEFAULT_PHASES,
+    DEFAULT_VOLTAGE,
+    DOMAIN,
+    SERVICE_CLEAR_CHARGING_SCHEDULE,
+    SERVICE_SET_CHARGING_SCHEDULE,
+    SERVICE_SET_SITE_CURRENT_BUDGET,
+)
+from .coordinator import ChargeAmpsDataUpdateCoordinator
+from .schedule import ScheduleTarget
+
+_AMPS = vol.All(vol.Coerce(int), vol.Range(min=0, max=CONNECTOR_MAX_CURRENT))
+
+SET_SITE_CURRENT_BUDGET_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_BUDGET): vol.All(vol.Coerce(float), vol.Range(min=0)),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_CHARGEPOINT_IDS): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_MIN_CURRENT, default=CONNECTOR_MIN_CURRENT): _AMPS,
+        vol.Optional(ATTR_MAX_CURRENT, default=CONNECTOR_MAX_CURRENT): _AMPS,
+        vol.Optional(ATTR_IDLE_CURRENT): _AMPS,
+    }
+)
+
+_CONNECTOR_SCHEMA = {
+    vol.Required(ATTR_CHARGEPOINT_ID): cv.string,
+    vol.Optional(ATTR_CONNECTOR_ID, default=1): vol.Coerce(int),
+}
+
+SET_CHARGING_SCHEDULE_SCHEMA = vol.Schema(
+    {
+        **_CONNECTOR_SCHEMA,
+        vol.Required(ATTR_PRICE_ENTITY): cv.entity_id,
+        vol.Optional(ATTR_PRICE_ATTRIBUTE): cv.string,
+        vol.Required(ATTR_DEPARTURE): cv.datetime,
+        vol.Required(ATTR_ENERGY): vol.All(vol.Coerce(float), vol.Range(min=0, min_included=False)),
+        vol.Optional(ATTR_PHASES, default=DEFAULT_PHASES): vol.All(
+            vol.Coerce(int), vol.In([1, 3])
+        ),
+        vol.Optional(ATTR_VOLTAGE, default=DEFAULT_VOLTAGE): vol.All(
+            vol.Coerce(float), vol.Range(min=100, max=400)
+        ),
+        vol.Optional(ATTR_MIN_CURRENT, default=CONNECTOR_MIN_CURRENT): _AMPS,
+        vol.Optional(ATTR_MAX_CURRENT, default=CONNECTOR_MAX_CURRENT): _AMPS,
+    }
+)
+
+CLEAR_CHARGING_SCHEDULE_SCHEMA = vol.Schema(_CONNECTOR_SCHEMA)
+
+
+@callback
+def _coordinators(hass: HomeAssistant, entry_id: str | None) -> list[ChargeAmpsDataUpdateCoordinator]:
+    coordinators = [
+        coordinator
+        for coordinator in hass.data.get(DOMAIN, {}).values()
+        if isinstance(coordinator, ChargeAmpsDataUpdateCoordinator)
+        and (entry_id is None or coordinator.entry_id == entry_id)
+    ]
+    if not coordinators:
+        raise ServiceValidationError(
+            f"No loaded Charge Amps entry{f' {entry_id}' if entry_id else ''}"
+        )
+    return coordinators
+
+
+@callback
+def _connector_coordinator(hass: HomeAssistant, data: dict) -> ChargeAmpsDataUpdateCoordinator:
+    """Return the coordinator of the entry that has the service call's connector."""
+    cp_id, connector_id = data[ATTR_CHARGEPOINT_ID], data[ATTR_CONNECTOR_ID]
+    for coordinator in _coordinators(hass, None):
+        chargepoint = coordinator.data.get(cp_id)
+        if chargepoint is not None and connector_id in chargepoint.connectors:
+            return coordinator
+    raise ServiceValidationError(f"Unknown connector {cp_id}/{connector_id}")
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def _async_set_site_current_budget(call: ServiceCall) -> ServiceResponse:
+        data = call.data
+        if data[ATTR_MIN_CURRENT] > data[ATTR_MAX_CURRENT]:
+            raise ServiceValidationError("min_current is above max_current")
+        coordinators = _coordinators(hass, data.get(ATTR_CONFIG_ENTRY_ID))
+        return await async_apply_current_budget(
+            coordinators,
+            data[ATTR_BUDGET],
+            min_current=data[ATTR_MIN_CURRENT],
+            max_current=data[ATTR_MAX_CURRENT],
+            idle_current=data.get(ATTR_IDLE_CURRENT),
+            chargepoint_ids=set(data.get(ATTR_CHARGEPOINT_IDS, [])),
+            # The strictest limit configured on the entries involved
+            max_concurrent=min(
+                coordinator.max_concurrent_requests for coordinator in coordinators
+            ),
+        )
+
+    async def _async_set_charging_schedule(call: ServiceCall) -> ServiceResponse:
+        data = call.data
+        if data[ATTR_MIN_CURRENT] > data[ATTR_MAX_CURRENT]:
+            raise ServiceValidationError("min_current is above max_current")
+        departure = data[ATTR_DEPARTURE]
+        if departure.tzinfo is None:
+            departure = departure.replace(tzinfo=dt_util.get_default_time_zone())
+        if departure <= dt_util.utcnow():
+            raise ServiceValidationError("departure is in the past")
+        if hass.states.get(data[ATTR_PRICE_ENTITY]) is None:
+            raise ServiceValidationError(f"Unknown price entity {data[ATTR_PRICE_ENTITY]}")
+        coordinator = _connector_coordinator(hass, data)
+        key = (data[ATTR_CHARGEPOINT_ID], data[ATTR_CONNECTOR_ID])
+        connector = coordinator.data[key[0]].connectors[key[1]]
+        target = ScheduleTarget(
+            price_entity=data[ATTR_PRICE_ENTITY],
+            price_attribute=data.get(ATTR_PRICE_ATTRIBUTE),
+            departure=departure.timestamp(),
+            energy_kwh=data[ATTR_ENERGY],
+            # Unknown until the connector reports a meter reading
+            start_kwh=connector.status.total_consumption_kwh,
+            phases=data[ATTR_PHASES],
+            voltage=data[ATTR_VOLTAGE],
+            min_current=data[ATTR_MIN_CURRENT],
+            max_current=data[ATTR_MAX_CURRENT],
+        )
+        plan = coordinator.scheduler.async_set_target(key, target)
+        # Without prices yet the plan is made when the price entity updates
+        return plan.as_dict() if plan is not None else {"steps": []}
+
+    async def _async_clear_charging_schedule(call: ServiceCall) -> None:
+        coordinator = _connector_coordinator(hass, call.data)
+        coordinator.scheduler.async_clear_target(
+            (call.data[ATTR_CHARGEPOINT_ID], call.data[ATTR_CONNECTOR_ID])
+        )
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_CHARGING_SCHEDULE,
+        _async_set_charging_schedule,
+        schema=SET_CHARGING_SCHEDULE_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_CLEAR_CHARGING_SCHEDULE,
+        _async_clear_charging_schedule,
+        schema=CLEAR_CHARGING_SCHEDULE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_SITE_CURRENT_BUDGET,
+        _async_set_site_current_budget,
+        schema=SET_SITE_CURRENT_BUDGET_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
@@ -0,0 +1,267 @@
+"""Incremental charging-session sync with a local on-disk history.
+
+Closed sessions are appended to a CSV file next to HA's other storage
+files, one compact row per session. The file is read back as a stream, so
+years of history never need to be held in memory at once. A Store keeps the
+per-chargepoint high-water mark (end time of the newest closed session),
+the ids of the sessions stored within SYNC_OVERLAP of it and the sessions
+that were still open at the last sync. Each sync therefore only asks the
+eAPI for sessions from that point on, less the overlap; sessions in the
+overlap that are already stored are recognised by id.
+"""
+from __future__ import annotations
+
+import asyncio
+import csv
+import logging
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import STORAGE_DIR, Store
+from homeassistant.util import dt as dt_util
+
+from .api import ChargeAmpsApi, ChargeAmpsApiError
+from .const import DOMAIN, SESSION_HISTORY_START
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Largest time window asked for in one request during a (back)fill
+SYNC_WINDOW = timedelta(days=90)
+# Re-read this much before the high-water mark to catch late arrivals
+SYNC_OVERLAP = timedelta(hours=1)
+
+
+def _parse_time(value: str | None) -> float | None:
+    """Parse an eAPI timestamp (UTC, often without offset) to epoch seconds."""
+    if not value:
+        return None
+    parsed = dt_util.parse_datetime(value)
+    if parsed is None:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def _format_time(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+
+@dataclass(slots=True, frozen=True)
+class ChargingSession:
+    """A charging session; end is None while it is still open."""
+
+    id: int
+    chargepoint_id: str
+    connector_id: int
+    start: float
+    end: float | None
+    energy_kwh: float
+
+    @classmethod
+    def from_api(cls, chargepoint_id: str, raw: dict[str, Any]) -> ChargingSession | None:
+        start = _parse_time(raw.get("startTime"))
+        if raw.get("id") is None or start is None:
+            return None
+        return cls(
+            id=int(raw["id"]),
+            chargepoint_id=chargepoint_id,
+            connector_id=int(raw.get("connectorId") or 1),
+            start=start,
+            end=_parse_time(raw.get("endTime")),
+            energy_kwh=float(raw.get("totalConsumptionKwh") or 0.0),
+        )
+
+    def to_row(self) -> list[Any]:
+        return [
+            self.id,
+            self.chargepoint_id,
+            self.connector_id,
+            int(self.start),
+            "" if self.end is None else int(self.end),
+            round(self.energy_kwh, 3),
+        ]
+
+    @classmethod
+    def from_row(cls, row: list[str]) -> ChargingSession:
+        return cls(
+            id=int(row[0]),
+            chargepoint_id=row[1],
+            connector_id=int(row[2]),
+            start=float(row[3]),
+            end=float(row[4]) if row[4] else None,
+            energy_kwh=float(row[5]),
+        )
+
+
+def _append_rows(path: str, sessions: list[ChargingSession]) -> None:
+    with open(path, "a", newline="", encoding="utf-8") as file:
+        csv.writer(file).writerows(session.to_row() for session in sessions)
+
+
+def _read_rows(
+    path: str, since: float | None, chargepoint_id: str | None
+) -> list[ChargingSession]:
+    """Stream the history file and keep only the matching sessions."""
+    if not os.path.exists(path):
+        return []
+    sessions = []
+    with open(path, newline="", encoding="utf-8") as file:
+        for row in csv.reader(file):
+            if chargepoint_id is not None and row[1] != chargepoint_id:
+                continue
+            session = ChargingSession.from_row(row)
+            if since is not None and (session.end or session.start) < since:
+                continue
+            sessions.append(session)
+    return sessions
+
+
+def _store_key(entry_id: str) -> str:
+    return f"{DOMAIN}.{entry_id}.sessions"
+
+
+def _history_path(hass: HomeAssistant, entry_id: str) -> str:
+    return hass.config.path(STORAGE_DIR, f"{DOMAIN}.{entry_id}.sessions.csv")
+
+
+async def async_remove_history(hass: HomeAssistant, entry_id: str) -> None:
+    """Delete the stored session history and sync state of an entry."""
+    await Store(hass, STORAGE_VERSION, _store_key(entry_id)).async_remove()
+    path = _history_path(hass, entry_id)
+    if os.path.exists(path):
+        await hass.async_add_executor_job(os.remove, path)
+
+
+class ChargingSessionSync:
+    """Fetch new and still-open charging sessions and persist them."""
+
+    def __init__(self, hass: HomeAssistant, api: ChargeAmpsApi, entry_id: str) -> None:
+        self._hass = hass
+        self._api = api
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, _store_key(entry_id)
+        )
+        self.path = _history_path(hass, entry_id)
+        # chargepoint_id -> {"last_end", "recent": [[id, end]], "open": {id: row},
+        #                    "synced_until"}
+        self._state: dict[str, dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+
+    async def async_load(self) -> None:
+        self._state = await self._store.async_load() or {}
+
+    @property
+    def open_sessions(self) -> list[ChargingSession]:
+        """Sessions that were still running at the last sync."""
+        return [
+            ChargingSession.from_row(row)
+            for state in self._state.values()
+            for row in state.get("open", {}).values()
+        ]
+
+    def high_water_mark(self, chargepoint_id: str) -> float | None:
+        """Return the end time of the newest closed session on record."""
+        return self._state.get(chargepoint_id, {}).get("last_end")
+
+    def synced_until(self, chargepoint_id: str) -> float | None:
+        """Return when the last complete sync of a chargepoint reached up to.
+
+        None until a sync, including any backfill, has finished without error.
+        """
+        return self._state.get(chargepoint_id, {}).get("synced_until")
+
+    async def async_read_sessions(
+        self, since: float | None = None, chargepoint_id: str | None = None
+    ) -> list[ChargingSession]:
+        """Read closed sessions that ended at or after since from disk."""
+        return await self._hass.async_add_executor_job(
+            _read_rows, self.path, since, chargepoint_id
+        )
+
+    async def async_sync(self, chargepoint_ids: list[str]) -> int:
+        """Sync every chargepoint; return the number of newly closed sessions."""
+        async with self._lock:
+            added = 0
+            for cp_id in chargepoint_ids:
+                try:
+                    added += await self._async_sync_chargepoint(cp_id)
+                except ChargeAmpsApiError as err:
+                    _LOGGER.warning(
+                        "Could not sync charging sessions for %s: %s", cp_id, err
+                    )
+            return added
+
+    async def _async_sync_chargepoint(self, cp_id: str) -> int:
+        state = self._state.setdefault(cp_id, {"last_end": None, "recent": [], "open": {}})
+        open_rows: dict[str, list[Any]] = state["open"]
+        last_end: float | None = state["last_end"]
+        overlap = SYNC_OVERLAP.total_seconds()
+        # Stored sessions that ended within the overlap, id -> end
+        recent: dict[int, float] = {
+            session_id: end for session_id, end in state.get("recent", [])
+        }
+        # Före overlap-fönstret sparades bara id:n som slutade på last_end
+        for session_id in state.pop("last_ids", []):
+            recent.setdefault(session_id, last_end)
+
+        window_start = last_end if last_end is not None else _parse_time(SESSION_HISTORY_START)
+        window_start = min([window_start, *(row[3] for row in open_rows.values())])
+        window_start -= overlap
+        now = dt_util.utcnow().timestamp()
+
+        added = 0
+        still_open: dict[str, list[Any]] = {}
+        while window_start < now:
+            window_end = min(now, window_start + SYNC_WINDOW.total_seconds())
+            raw_sessions = await self._api.get_charging_sessions(
+                cp_id, _format_time(window_start), _format_time(window_end)
+            )
+
+            closed: list[ChargingSession] = []
+            for raw in raw_sessions or []:
+                session = ChargingSession.from_api(cp_id, raw)
+                if session is None:
+                    continue
+                if session.end is None:
+                    still_open[str(session.id)] = session.to_row()
+                    continue
+                if session.id in recent:
+                    continue
+                # Windows reaching back to an open session's start return
+                # sessions stored by earlier syncs, before the overlap
+                if last_end is not None and session.end < last_end - overlap:
+                    continue
+                closed.append(session)
+
+            if closed:
+                closed.sort(key=lambda session: session.end)
+                await self._hass.async_add_executor_job(_append_rows, self.path, closed)
+                newest = closed[-1].end
+                if last_end is None or newest > last_end:
+                    last_end = newest
+                recent.update((session.id, session.end) for session in closed)
+                recent = {
+                    session_id: end
+                    for session_id, end in recent.items()
+                    if end >= last_end - overlap
+                }
+                added += len(closed)
+
+            # Persist progress per window so an interrupted backfill resumes here
+            state["last_end"] = last_end
+            state["recent"] = sorted(recent.items())
+            await self._store.async_save(self._state)
+            window_start = window_end
+
+        state["open"] = still_open
+        state["synced_until"] = now
+        await self._store.async_save(self._state)
+        if added:
+            _LOGGER.debug("Stored %d new charging sessions for %s", added, cp_id)
+        return added
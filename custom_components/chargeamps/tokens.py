@@ -0,0 +1,106 @@
+"""Persisted eAPI tokens, so restarts and reloads don't log in again.
+
+Access and refresh tokens are stored per account (email), encrypted with
+Fernet (AES-128-CBC with HMAC-SHA256). The key is generated on first use
+and kept in its own storage file, so the token file alone (a copied file,
+a partial backup, a pasted log) does not reveal usable tokens. Anyone who
+can read both files, i.e. all of .storage, can decrypt them; the password
+in the config entry is no better protected, so this is about not leaving
+long-lived tokens in plain sight rather than a secret store.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any
+
+from cryptography.fernet import Fernet, InvalidToken
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, TOKEN_SAVE_DELAY
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+
+# Key in hass.data[DOMAIN]
+DATA_TOKENS = "tokens"
+
+
+def _account(email: str) -> str:
+    return email.strip().lower()
+
+
+class TokenStore:
+    """Encrypted access/refresh tokens of every account."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.tokens", private=True
+        )
+        self._key_store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.token_key", private=True
+        )
+        self._fernet: Fernet | None = None
+        self._load_lock = asyncio.Lock()
+        # account -> encrypted token pair
+        self._tokens: dict[str, str] = {}
+
+    async def async_load(self) -> None:
+        """Load the key and tokens once; a new key is made on first use."""
+        async with self._load_lock:
+            if self._fernet is None:
+                await self._async_load()
+
+    async def _async_load(self) -> None:
+        key_data = await self._key_store.async_load()
+        if key_data is None:
+            key_data = {"key": Fernet.generate_key().decode()}
+            await self._key_store.async_save(key_data)
+        self._fernet = Fernet(key_data["key"].encode())
+        self._tokens = ((await self._store.async_load()) or {}).get("accounts", {})
+
+    def get(self, email: str) -> tuple[str | None, str] | None:
+        """Return the (access, refresh) tokens stored for an account."""
+        encrypted = self._tokens.get(_account(email))
+        if encrypted is None or self._fernet is None:
+            return None
+        try:
+            access_token, _, refresh_token = (
+                self._fernet.decrypt(encrypted.encode()).decode().partition("\n")
+            )
+        except InvalidToken:
+            # Nyckeln har bytts eller filen är trasig; logga in på nytt
+            _LOGGER.warning("Stored Charge Amps tokens could not be decrypted, ignoring them")
+            return None
+        if not refresh_token:
+            return None
+        return access_token or None, refresh_token
+
+    @callback
+    def async_set(self, email: str, access_token: str, refresh_token: str | None) -> None:
+        if self._fernet is None or not refresh_token:
+            return
+        self._tokens[_account(email)] = self._fernet.encrypt(
+            f"{access_token}\n{refresh_token}".encode()
+        ).decode()
+        self._store.async_delay_save(self._data_to_store, TOKEN_SAVE_DELAY)
+
+    @callback
+    def async_remove(self, email: str) -> None:
+        if self._tokens.pop(_account(email), None) is not None:
+            self._store.async_delay_save(self._data_to_store, TOKEN_SAVE_DELAY)
+
+    @callback
+    def _data_to_store(self) -> dict[str, Any]:
+        return {"accounts": self._tokens}
+
+
+async def async_get_token_store(hass: HomeAssistant) -> TokenStore:
+    """Return the loaded token store, loading it on first use."""
+    data = hass.data.setdefault(DOMAIN, {})
+    if (store := data.get(DATA_TOKENS)) is None:
+        store = data[DATA_TOKENS] = TokenStore(hass)
+    await store.async_load()
+    return store
@@ -0,0 +1,66 @@
+"""Dedicated HTTP transport and JSON decoding for the Charge Amps eAPI.
+
+Each account gets its own ClientSession on a TCPConnector tuned for one
+host: a small keep-alive pool, cached DNS and compressed responses. JSON is
+decoded with orjson when it is installed (it ships with Home Assistant) and
+with the standard library otherwise. Large bodies are decoded in an executor
+so a big fleet's owned-chargepoints payload does not block the event loop.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from aiohttp import ClientResponse, ClientSession, ClientTimeout, TCPConnector
+from homeassistant.util.ssl import get_default_context
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ships with Home Assistant
+    orjson = None
+
+from .const import (
+    JSON_EXECUTOR_THRESHOLD,
+    TRANSPORT_DNS_CACHE_TTL,
+    TRANSPORT_KEEPALIVE_TIMEOUT,
+    TRANSPORT_POOL_SIZE,
+)
+
+if orjson is not None:
+    json_loads = orjson.loads
+
+    def json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+else:
+    json_loads = json.loads
+    json_dumps = json.dumps
+
+
+def create_session() -> ClientSession:
+    """Return a ClientSession for the eAPI; the caller closes it."""
+    connector = TCPConnector(
+        limit=TRANSPORT_POOL_SIZE,
+        limit_per_host=TRANSPORT_POOL_SIZE,
+        ttl_dns_cache=TRANSPORT_DNS_CACHE_TTL,
+        keepalive_timeout=TRANSPORT_KEEPALIVE_TIMEOUT,
+        ssl=get_default_context(),
+    )
+    return ClientSession(
+        connector=connector,
+        headers={"Accept": "application/json", "Accept-Encoding": "gzip, deflate"},
+        # Per-request timeouts are set by the API client
+        timeout=ClientTimeout(total=None),
+        json_serialize=json_dumps,
+    )
+
+
+async def read_json(resp: ClientResponse) -> Any:
+    """Read and decode a JSON response body, off the loop if it is large."""
+    body = await resp.read()
+    if not body:
+        return None
+    if len(body) >= JSON_EXECUTOR_THRESHOLD:
+        return await asyncio.get_running_loop().run_in_executor(None, json_loads, body)
+    return json_loads(body)
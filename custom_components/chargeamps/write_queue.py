@@ -0,0 +1,102 @@
+"""Debounced, coalescing writes for Charge Amps settings resources."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _PendingWrite:
+    """Fields waiting to be written to one resource."""
+
+    __slots__ = ("fields", "future", "handle", "deadline")
+
+    def __init__(self, future: asyncio.Future[Any], deadline: float) -> None:
+        self.fields: dict[str, Any] = {}
+        self.future = future
+        self.handle: asyncio.TimerHandle | None = None
+        self.deadline = deadline
+
+
+def _consume_exception(future: asyncio.Future[Any]) -> None:
+    # Callers may have been cancelled; don't warn about unretrieved errors
+    if not future.cancelled():
+        future.exception()
+
+
+class CoalescingWriteQueue:
+    """Merge writes to the same resource into one request.
+
+    Every write to a key restarts a short debounce timer, capped at max_delay
+    after the first write of the batch. When the timer fires, the merged
+    fields are sent in one request and every caller of the batch gets its
+    result. Later values for a field replace earlier ones. Batches for the
+    same key are sent in order, one at a time.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str, dict[str, Any]], Awaitable[Any]],
+        delay: float,
+        max_delay: float,
+    ) -> None:
+        self._send = send
+        self._delay = delay
+        self._max_delay = max_delay
+        self._pending: dict[str, _PendingWrite] = {}
+        self._inflight: dict[str, asyncio.Task[None]] = {}
+
+    async def async_write(self, key: str, fields: dict[str, Any]) -> Any:
+        """Queue fields for key and wait for the merged request to finish."""
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(key)
+        if pending is None:
+            future = loop.create_future()
+            future.add_done_callback(_consume_exception)
+            pending = self._pending[key] = _PendingWrite(
+                future, loop.time() + self._max_delay
+            )
+        else:
+            pending.handle.cancel()
+
+        pending.fields.update(fields)
+        when = min(loop.time() + self._delay, pending.deadline)
+        pending.handle = loop.call_at(when, self._flush, key)
+        return await asyncio.shield(pending.future)
+
+    def _flush(self, key: str) -> None:
+        pending = self._pending.pop(key)
+        previous = self._inflight.get(key)
+        task = asyncio.get_running_loop().create_task(
+            self._async_send(key, pending, previous)
+        )
+        self._inflight[key] = task
+        task.add_done_callback(
+            lambda done: self._inflight.pop(key, None)
+            if self._inflight.get(key) is done
+            else None
+        )
+
+    async def _async_send(
+        self,
+        key: str,
+        pending: _PendingWrite,
+        previous: asyncio.Task[None] | None,
+    ) -> None:
+        try:
+            if previous is not None:
+                # Keep batches for the same resource in order
+                await asyncio.wait([previous])
+            _LOGGER.debug("Charge Amps: writing %s to %s", pending.fields, key)
+            result = await self._send(key, pending.fields)
+        except asyncio.CancelledError:
+            # The callers wait on the future, not on this task
+            pending.future.cancel()
+            raise
+        except Exception as err:  # noqa: BLE001 - handed to the callers
+            pending.future.set_exception(err)
+        else:
+            pending.future.set_result(result)
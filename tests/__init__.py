@@ -0,0 +1 @@
+"""Tests for the Charge Amps integration."""
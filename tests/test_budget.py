@@ -0,0 +1,41 @@
+"""Tests for splitting a site current budget between connectors."""
+from __future__ import annotations
+
+from custom_components.chargeamps.budget import allocate_current
+
+
+def test_equal_share_is_capped_at_max_current() -> None:
+    assert allocate_current(40, ["a", "b"], 6, 16) == {"a": 16, "b": 16}
+
+
+def test_leftover_amps_go_to_the_first_connectors() -> None:
+    assert allocate_current(20, ["a", "b", "c"], 6, 16) == {"a": 7, "b": 7, "c": 6}
+
+
+def test_connectors_beyond_the_budget_get_zero() -> None:
+    assert allocate_current(13, ["a", "b", "c"], 6, 16) == {"a": 7, "b": 6, "c": 0}
+
+
+def test_budget_below_min_current_serves_nobody() -> None:
+    assert allocate_current(5, ["a", "b"], 6, 16) == {"a": 0, "b": 0}
+
+
+def test_negative_and_fractional_budgets() -> None:
+    assert allocate_current(-10, ["a"], 6, 16) == {"a": 0}
+    assert allocate_current(12.9, ["a", "b"], 6, 16) == {"a": 6, "b": 6}
+
+
+def test_zero_min_current_serves_everyone() -> None:
+    assert allocate_current(5, ["a", "b", "c"], 0, 16) == {"a": 2, "b": 2, "c": 1}
+
+
+def test_no_connectors() -> None:
+    assert allocate_current(32, [], 6, 16) == {}
+
+
+def test_allocation_never_exceeds_the_budget() -> None:
+    keys = list(range(7))
+    for budget in range(0, 120):
+        allocation = allocate_current(budget, keys, 6, 16)
+        assert sum(allocation.values()) <= budget
+        assert all(amps == 0 or 6 <= amps <= 16 for amps in allocation.values())
@@ -0,0 +1,126 @@
+"""Tests for the per-connector measurement ring buffer."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.chargeamps.measurements import MeasurementBuffer
+from custom_components.chargeamps.models import ConnectorStatus
+
+
+def _status(
+    power: float | None = None,
+    meter: float | None = None,
+    currents: tuple[float, ...] = (),
+    session_id: int | None = 1,
+) -> ConnectorStatus:
+    return ConnectorStatus(
+        power=power,
+        total_consumption_kwh=meter,
+        phase_currents=currents,
+        session_id=session_id,
+    )
+
+
+def _filled(capacity: int, samples: int) -> MeasurementBuffer:
+    """A buffer with a sample per minute: power 1000*t W, meter t kWh, t A."""
+    buffer = MeasurementBuffer(capacity)
+    for t in range(samples):
+        buffer.append(t * 60.0, _status(1000.0 * t, float(t), (t, t, t)))
+    return buffer
+
+
+def test_capacity_is_bounded() -> None:
+    buffer = _filled(5, 12)
+    assert len(buffer) == 5
+    # Only the newest five samples (t = 7..11) are left
+    assert buffer.peak_current(10_000, 660.0) == 11
+    assert buffer.energy(10_000, 660.0) == pytest.approx(4.0)
+
+
+def test_window_selects_recent_samples_after_wrapping() -> None:
+    buffer = _filled(5, 10)
+    now = 540.0
+    # Samples at 420, 480 and 540 s, oldest first, across the wrap point
+    times = [buffer._columns[0][index] for index in buffer._window(120, now)]  # noqa: SLF001
+    assert times == [420.0, 480.0, 540.0]
+    assert buffer._window(0, now + 1) == []  # noqa: SLF001
+
+
+def test_older_or_equal_timestamps_are_ignored() -> None:
+    buffer = _filled(5, 3)
+    buffer.append(120.0, _status(99_999.0))
+    buffer.append(30.0, _status(99_999.0))
+    assert len(buffer) == 3
+    assert buffer.average_power(60, 120.0) == pytest.approx(1500.0)
+
+
+def test_average_power_is_time_weighted() -> None:
+    buffer = MeasurementBuffer(10)
+    buffer.append(0.0, _status(0.0))
+    buffer.append(60.0, _status(1200.0))
+    buffer.append(240.0, _status(1200.0))
+    # 60 s ramping to 1200 W, then 180 s at 1200 W
+    assert buffer.average_power(300, 240.0) == pytest.approx((600 * 60 + 1200 * 180) / 240)
+
+
+def test_average_power_with_one_sample_or_none() -> None:
+    buffer = MeasurementBuffer(10)
+    assert buffer.average_power(300, 0.0) is None
+    buffer.append(0.0, _status(500.0))
+    assert buffer.average_power(300, 0.0) == 500.0
+    buffer.append(60.0, _status(None))
+    assert buffer.average_power(30, 60.0) is None
+
+
+def test_peak_current_over_all_phases() -> None:
+    buffer = MeasurementBuffer(10)
+    buffer.append(0.0, _status(currents=(16.0, 2.0, 3.0)))
+    buffer.append(60.0, _status(currents=(4.0, 9.0)))
+    assert buffer.peak_current(120, 60.0) == 16.0
+    assert buffer.peak_current(30, 60.0) == 9.0
+
+
+def test_peak_current_without_currents() -> None:
+    buffer = MeasurementBuffer(10)
+    buffer.append(0.0, _status(1000.0))
+    assert buffer.peak_current(60, 0.0) is None
+
+
+def test_energy_from_meter_readings() -> None:
+    buffer = _filled(20, 10)
+    assert buffer.energy(180, 540.0) == pytest.approx(3.0)
+    assert buffer.energy(30, 540.0) is None
+
+
+def test_energy_falls_back_to_integrated_power() -> None:
+    buffer = MeasurementBuffer(10)
+    buffer.append(0.0, _status(3600.0))
+    buffer.append(3600.0, _status(3600.0))
+    assert buffer.energy(7200, 3600.0) == pytest.approx(3.6)
+
+
+def test_session_energy_resets_with_the_session() -> None:
+    buffer = MeasurementBuffer(10)
+    buffer.append(0.0, _status(1000.0, session_id=1))
+    buffer.append(1800.0, _status(3000.0, session_id=1))
+    assert buffer.session_kwh == pytest.approx(1.0)
+    buffer.append(3600.0, _status(3000.0, session_id=2))
+    assert buffer.session_id == 2
+    assert buffer.session_kwh == 0.0
+
+
+def test_derived_values_are_computed_once_per_sample() -> None:
+    buffer = _filled(10, 3)
+    calls: list[float] = []
+
+    def compute(buf: MeasurementBuffer, now: float) -> float | None:
+        calls.append(now)
+        return buf.average_power(60, now)
+
+    assert buffer.derived("avg", compute) == pytest.approx(1500.0)
+    assert buffer.derived("avg", compute) == pytest.approx(1500.0)
+    # Computed as of the newest sample
+    assert calls == [120.0]
+    buffer.append(180.0, _status(3000.0))
+    assert buffer.derived("avg", compute) == pytest.approx(2500.0)
+    assert calls == [120.0, 180.0]
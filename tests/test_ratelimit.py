@@ -0,0 +1,128 @@
+"""Tests for the token bucket, circuit breaker and retry policies."""
+from __future__ import annotations
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from custom_components.chargeamps.ratelimit import (
+    CircuitBreaker,
+    RequestPolicy,
+    TokenBucket,
+    parse_retry_after,
+)
+
+
+def test_bucket_allows_a_burst_then_paces() -> None:
+    async def run() -> list[float]:
+        bucket = TokenBucket(rate=50.0, capacity=3)
+        start = time.monotonic()
+        times = []
+        for _ in range(5):
+            await bucket.acquire()
+            times.append(time.monotonic() - start)
+        return times
+
+    times = asyncio.run(run())
+    # Three from the burst right away, then one every 20 ms
+    assert times[2] < 0.01
+    assert times[3] >= 0.015
+    assert times[4] >= 0.035
+
+
+def test_bucket_block_holds_back_every_request() -> None:
+    async def run() -> float:
+        bucket = TokenBucket(rate=1000.0, capacity=10)
+        bucket.block_for(0.05)
+        start = time.monotonic()
+        await asyncio.gather(bucket.acquire(), bucket.acquire())
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.045
+
+
+def test_backoff_is_full_jitter_and_capped() -> None:
+    policy = RequestPolicy(max_attempts=10, backoff_base=1.0, backoff_max=5.0)
+    for attempt in range(1, 8):
+        for _ in range(50):
+            assert 0 <= policy.backoff(attempt) <= min(5.0, 2**attempt)
+
+
+def test_retry_delay_gives_up_after_max_attempts() -> None:
+    policy = RequestPolicy(max_attempts=3)
+    assert policy.retry_delay(1, None) is not None
+    assert policy.retry_delay(2, None) is not None
+    assert policy.retry_delay(3, None) is None
+
+
+def test_retry_delay_follows_retry_after() -> None:
+    policy = RequestPolicy(max_attempts=3, max_retry_after=60.0)
+    assert policy.retry_delay(1, 7.0) == 7.0
+    # Too long a wait fails the call instead
+    assert policy.retry_delay(1, 120.0) is None
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(None, None), ("", None), ("5", 5.0), ("-3", 0.0), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value: str | None, expected: float | None) -> None:
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date() -> None:
+    when = datetime.now(timezone.utc) + timedelta(seconds=30)
+    assert 25 <= parse_retry_after(format_datetime(when, usegmt=True)) <= 30
+    past = datetime.now(timezone.utc) - timedelta(minutes=5)
+    assert parse_retry_after(format_datetime(past, usegmt=True)) == 0.0
+
+
+def test_breaker_opens_after_threshold_failures() -> None:
+    breaker = CircuitBreaker(failure_threshold=3, probe_base=30, probe_max=900)
+    assert not breaker.record_failure()
+    assert not breaker.record_failure()
+    assert breaker.record_failure()
+    assert breaker.is_open
+    assert not breaker.allow()
+    assert 0 < breaker.retry_in <= 30
+
+
+def test_breaker_success_resets_the_count() -> None:
+    breaker = CircuitBreaker(failure_threshold=2, probe_base=30, probe_max=900)
+    breaker.record_failure()
+    breaker.record_success()
+    assert not breaker.record_failure()
+    assert not breaker.is_open
+
+
+def test_breaker_probe_doubles_delay_on_failure() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, probe_base=0.01, probe_max=0.03)
+    assert breaker.record_failure()
+    time.sleep(0.015)
+    assert breaker.allow()
+    # Only one probe per delay
+    assert not breaker.allow()
+    breaker.record_failure()
+    assert 0.015 < breaker.retry_in <= 0.02
+    time.sleep(0.025)
+    assert breaker.allow()
+    breaker.record_failure()
+    # Capped at probe_max
+    assert breaker.retry_in <= 0.03
+    time.sleep(0.035)
+    assert breaker.allow()
+    breaker.record_success()
+    assert not breaker.is_open
+    assert breaker.allow()
+
+
+def test_breaker_ignores_late_failures_while_open() -> None:
+    breaker = CircuitBreaker(failure_threshold=1, probe_base=30, probe_max=900)
+    breaker.record_failure()
+    retry_in = breaker.retry_in
+    # A request sent before the circuit opened, failing afterwards
+    assert not breaker.record_failure()
+    assert breaker.retry_in <= retry_in
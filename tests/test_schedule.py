@@ -0,0 +1,182 @@
+"""Tests for price parsing and charge planning."""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+
+import pytest
+from homeassistant.core import State
+
+from custom_components.chargeamps.schedule import (
+    PlanStep,
+    PriceSlot,
+    ScheduleTarget,
+    parse_price_series,
+    plan_charging,
+)
+
+HOUR = 3600
+T0 = 1_700_000_000 - 1_700_000_000 % HOUR
+
+
+def _target(departure: float, energy_kwh: float, **overrides) -> ScheduleTarget:
+    values = {
+        "price_entity": "sensor.price",
+        "price_attribute": None,
+        "departure": departure,
+        "energy_kwh": energy_kwh,
+        "start_kwh": 0.0,
+        "phases": 3,
+        "voltage": 230.0,
+        "min_current": 6,
+        "max_current": 16,
+    }
+    values.update(overrides)
+    return ScheduleTarget(**values)
+
+
+def _slots(prices: list[float]) -> list[PriceSlot]:
+    return [
+        PriceSlot(T0 + index * HOUR, T0 + (index + 1) * HOUR, price)
+        for index, price in enumerate(prices)
+    ]
+
+
+def test_plan_uses_the_cheapest_slots() -> None:
+    target = _target(T0 + 6 * HOUR, 30)
+    plan = plan_charging(_slots([5, 1, 3, 2, 4, 6]), T0, target, 30)
+    # 11.04 kWh per hour at 16 A on three phases; the last slot at a reduced current
+    assert plan.steps == [
+        PlanStep(T0 + HOUR, T0 + 2 * HOUR, 16),
+        PlanStep(T0 + 2 * HOUR, T0 + 3 * HOUR, 12),
+        PlanStep(T0 + 3 * HOUR, T0 + 4 * HOUR, 16),
+    ]
+    assert plan.energy_kwh == pytest.approx(30.36)
+    assert plan.cost == pytest.approx(11.04 * 1 + 8.28 * 3 + 11.04 * 2)
+    assert plan.shortfall_kwh == 0
+
+
+def test_adjacent_slots_at_one_current_merge() -> None:
+    target = _target(T0 + 4 * HOUR, 22)
+    plan = plan_charging(_slots([5, 1, 1, 6]), T0, target, 22)
+    assert plan.steps == [PlanStep(T0 + HOUR, T0 + 3 * HOUR, 16)]
+
+
+def test_shortfall_when_departure_is_too_close() -> None:
+    target = _target(T0 + 2 * HOUR, 30)
+    plan = plan_charging(_slots([1, 2, 3, 4]), T0, target, 30)
+    assert [step.current for step in plan.steps] == [16]
+    assert plan.steps[0].end == T0 + 2 * HOUR
+    assert plan.shortfall_kwh == pytest.approx(30 - 22.08)
+
+
+def test_slots_are_clipped_to_now_and_departure() -> None:
+    target = _target(T0 + HOUR + 900, 100)
+    plan = plan_charging(_slots([1, 2, 3]), T0 + 1800, target, 100)
+    assert plan.steps == [PlanStep(T0 + 1800, T0 + HOUR + 900, 16)]
+    assert plan.energy_kwh == pytest.approx(11.04 * 0.75)
+
+
+def test_min_current_is_respected() -> None:
+    target = _target(T0 + 2 * HOUR, 1)
+    plan = plan_charging(_slots([1, 2]), T0, target, 1)
+    assert plan.steps == [PlanStep(T0, T0 + HOUR, 6)]
+
+
+def test_nothing_to_plan_when_target_is_met() -> None:
+    target = _target(T0 + 2 * HOUR, 10)
+    plan = plan_charging(_slots([1, 2]), T0, target, -1)
+    assert plan.steps == []
+    assert plan.shortfall_kwh == 0
+
+
+def test_step_at_and_next_boundary() -> None:
+    target = _target(T0 + 6 * HOUR, 30)
+    plan = plan_charging(_slots([5, 1, 3, 2, 4, 6]), T0, target, 30)
+    assert plan.step_at(T0) is None
+    assert plan.step_at(T0 + HOUR).current == 16
+    assert plan.step_at(T0 + 2 * HOUR + 1).current == 12
+    assert plan.next_boundary(T0) == T0 + HOUR
+    assert plan.next_boundary(T0 + HOUR) == T0 + 2 * HOUR
+    assert plan.next_boundary(T0 + 4 * HOUR) is None
+
+
+def _iso(offset_hours: float) -> str:
+    return datetime.fromtimestamp(T0 + offset_hours * HOUR, timezone.utc).isoformat()
+
+
+def test_parse_price_series_with_start_and_end() -> None:
+    state = State(
+        "sensor.price",
+        "1.0",
+        {
+            "raw_today": [
+                {"start": _iso(1), "end": _iso(2), "value": 2.5},
+                {"start": _iso(0), "end": _iso(1), "value": "1.5"},
+            ]
+        },
+    )
+    assert parse_price_series(state) == [
+        PriceSlot(T0, T0 + HOUR, 1.5),
+        PriceSlot(T0 + HOUR, T0 + 2 * HOUR, 2.5),
+    ]
+
+
+def test_parse_price_series_infers_missing_ends() -> None:
+    state = State(
+        "sensor.price",
+        "1.0",
+        {
+            "prices": [
+                {"startsAt": _iso(0), "total": 1.0},
+                {"startsAt": _iso(0.25), "total": 2.0},
+                {"startsAt": _iso(0.5), "total": 3.0},
+            ]
+        },
+    )
+    assert parse_price_series(state) == [
+        PriceSlot(T0, T0 + 900, 1.0),
+        PriceSlot(T0 + 900, T0 + 1800, 2.0),
+        PriceSlot(T0 + 1800, T0 + 1800 + HOUR, 3.0),
+    ]
+
+
+def test_parse_price_series_merges_today_and_tomorrow() -> None:
+    state = State(
+        "sensor.price",
+        "1.0",
+        {
+            "raw_today": [{"start": _iso(0), "end": _iso(1), "value": 1.0}],
+            "raw_tomorrow": [{"start": _iso(24), "end": _iso(25), "value": 2.0}],
+        },
+    )
+    assert [slot.price for slot in parse_price_series(state)] == [1.0, 2.0]
+
+
+def test_parse_price_series_skips_malformed_items() -> None:
+    state = State(
+        "sensor.price",
+        "1.0",
+        {
+            "raw_today": [
+                "not a dict",
+                {"start": "not a time", "value": 1.0},
+                {"start": _iso(0)},
+                {"start": _iso(1), "value": "expensive"},
+                {"start": _iso(2), "end": _iso(3), "value": 4.0},
+            ]
+        },
+    )
+    assert parse_price_series(state) == [PriceSlot(T0 + 2 * HOUR, T0 + 3 * HOUR, 4.0)]
+
+
+def test_parse_price_series_reads_only_the_given_attribute() -> None:
+    state = State(
+        "sensor.price",
+        "1.0",
+        {
+            "raw_today": [{"start": _iso(0), "end": _iso(1), "value": 1.0}],
+            "custom": [{"start": _iso(5), "end": _iso(6), "price": 9.0}],
+        },
+    )
+    assert parse_price_series(state, "custom") == [PriceSlot(T0 + 5 * HOUR, T0 + 6 * HOUR, 9.0)]
+    assert parse_price_series(state, "missing") == []
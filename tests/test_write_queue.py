@@ -0,0 +1,123 @@
+"""Tests for the coalescing settings write queue."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pytest
+
+from custom_components.chargeamps.write_queue import CoalescingWriteQueue
+
+DELAY = 0.01
+
+
+class Recorder:
+    """A send function that records its calls and can be held or failed."""
+
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, dict[str, Any]]] = []
+        self.release = asyncio.Event()
+        self.release.set()
+        self.error: Exception | None = None
+
+    async def __call__(self, key: str, fields: dict[str, Any]) -> Any:
+        self.calls.append((key, dict(fields)))
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return len(self.calls)
+
+
+def test_writes_to_one_key_are_merged() -> None:
+    async def run() -> None:
+        send = Recorder()
+        queue = CoalescingWriteQueue(send, DELAY, 1.0)
+        results = await asyncio.gather(
+            queue.async_write("a", {"mode": "On"}),
+            queue.async_write("a", {"maxCurrent": 10}),
+            queue.async_write("a", {"maxCurrent": 16}),
+        )
+        assert send.calls == [("a", {"mode": "On", "maxCurrent": 16})]
+        assert results == [1, 1, 1]
+
+    asyncio.run(run())
+
+
+def test_keys_are_written_separately() -> None:
+    async def run() -> None:
+        send = Recorder()
+        queue = CoalescingWriteQueue(send, DELAY, 1.0)
+        await asyncio.gather(
+            queue.async_write("a", {"mode": "On"}),
+            queue.async_write("b", {"mode": "Off"}),
+        )
+        assert sorted(send.calls) == [("a", {"mode": "On"}), ("b", {"mode": "Off"})]
+
+    asyncio.run(run())
+
+
+def test_max_delay_caps_the_debounce() -> None:
+    async def run() -> None:
+        send = Recorder()
+        queue = CoalescingWriteQueue(send, 0.05, 0.08)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        callers = [asyncio.ensure_future(queue.async_write("a", {"maxCurrent": 6}))]
+        # Each write restarts the 50 ms debounce, which alone would end at 110 ms
+        for current in (8, 10):
+            await asyncio.sleep(0.03)
+            callers.append(asyncio.ensure_future(queue.async_write("a", {"maxCurrent": current})))
+        assert await asyncio.gather(*callers) == [1, 1, 1]
+        assert loop.time() - start < 0.1
+        assert send.calls == [("a", {"maxCurrent": 10})]
+
+    asyncio.run(run())
+
+
+def test_errors_reach_every_caller() -> None:
+    async def run() -> None:
+        send = Recorder()
+        send.error = RuntimeError("boom")
+        queue = CoalescingWriteQueue(send, DELAY, 1.0)
+        results = await asyncio.gather(
+            queue.async_write("a", {"mode": "On"}),
+            queue.async_write("a", {"maxCurrent": 10}),
+            return_exceptions=True,
+        )
+        assert [type(result) for result in results] == [RuntimeError, RuntimeError]
+        assert len(send.calls) == 1
+
+    asyncio.run(run())
+
+
+def test_batches_for_a_key_are_sent_in_order() -> None:
+    async def run() -> None:
+        send = Recorder()
+        send.release.clear()
+        queue = CoalescingWriteQueue(send, DELAY, 1.0)
+        first = asyncio.ensure_future(queue.async_write("a", {"maxCurrent": 10}))
+        await asyncio.sleep(DELAY * 3)
+        # The first batch is in flight; the second must wait for it
+        second = asyncio.ensure_future(queue.async_write("a", {"maxCurrent": 16}))
+        await asyncio.sleep(DELAY * 3)
+        assert send.calls == [("a", {"maxCurrent": 10})]
+        send.release.set()
+        assert await first == 1
+        assert await second == 2
+        assert send.calls[1] == ("a", {"maxCurrent": 16})
+
+    asyncio.run(run())
+
+
+def test_cancelled_send_cancels_its_callers() -> None:
+    async def run() -> None:
+        send = Recorder()
+        send.release.clear()
+        queue = CoalescingWriteQueue(send, DELAY, 1.0)
+        caller = asyncio.ensure_future(queue.async_write("a", {"mode": "On"}))
+        await asyncio.sleep(DELAY * 3)
+        queue._inflight["a"].cancel()  # noqa: SLF001
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, 1.0)
+
+    asyncio.run(run())